@@ -1,19 +1,85 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from SmartPlayer import SmartPlayer
-from ProxyPlayer import ProxyPlayer
+from AsyncProxyPlayer import AsyncProxyPlayer
 from Referee import Referee
-from CustomExceptions import InvalidCommand, IllegalResponse
-import socket
+from Strategies import BaseStrategy, OffloadedStrategy
+from CustomExceptions import InvalidCommand, IllegalResponse, ContractViolation
+import asyncio
+import threading
 import random
 
 
 class BaseAdmin(ABC):
+    """
+    Accepts and registers remote players on an `asyncio` event loop, run by a thread of the Admin's own from
+    construction until `close()`. Connections are accepted as they come, and each remote player is registered
+    concurrently with the others, so a player who connects but never sends its name holds up nobody: it is given
+    `registration_timeout` seconds, after which it is disconnected and a `fallback_player` takes its place, as for
+    a player who sends something other than a name. The remote players are `AsyncProxyPlayer`s on the same loop.
 
-    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer):
+    With `offload_processes` set, the strategies of the local players search in worker processes (see
+    `OffloadedStrategy`), so that the games' threads only wait on remote players and worker processes, and the
+    searches of concurrent games run on as many cores.
+    """
+
+    DEFAULT_REGISTRATION_TIMEOUT = 10
+
+    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer, max_concurrent_games=None,
+                 registration_timeout=DEFAULT_REGISTRATION_TIMEOUT, offload_processes=None):
+        """
+        :param str host: the host to accept remote players on.
+        :param int port: the port to accept remote players on.
+        :param int num_remote_players: the number of remote players to accept.
+        :param type fallback_player: the class of the local players substituted in for missing or broken remote players.
+        :param int max_concurrent_games: the most games to play at the same time (see `_play_games()`), or `None` for
+        no limit.
+        :param float registration_timeout: the number of seconds a remote player has to register once connected.
+        :param int offload_processes: the number of worker processes to run the local players' strategies in, or
+        `None` to run them in the games' threads.
+        """
+        if max_concurrent_games is not None and (not isinstance(max_concurrent_games, int) or max_concurrent_games < 1):
+            raise ContractViolation("max_concurrent_games must be a positive integer! Given: {}"
+                                    .format(max_concurrent_games))
+        if isinstance(registration_timeout, bool) or not isinstance(registration_timeout, (int, float)) \
+                or registration_timeout <= 0:
+            raise ContractViolation("registration_timeout must be a positive number! Given: {}"
+                                    .format(registration_timeout))
+        if offload_processes is not None and (not isinstance(offload_processes, int) or offload_processes < 1):
+            raise ContractViolation("offload_processes must be a positive integer! Given: {}".format(offload_processes))
         self.num_remote_players = num_remote_players
-        self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.s.bind((host, port))
         self.fallback_player = fallback_player
+        self.max_concurrent_games = max_concurrent_games
+        self.registration_timeout = registration_timeout
+        self.offload_processes = offload_processes
+        self.remote_players = [None] * num_remote_players  # registered players (or fallbacks) in order of connection
+        self.connections = []  # the AsyncProxyPlayers that registered
+        self.num_connected = 0
+        self.num_registered = 0
+        self.registered = None
+        self.server = None
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.loop_thread.start()
+        try:
+            self.server = self._run(self._start_server(host, port))
+        except OSError:
+            self.close()
+            raise
+
+    def close(self):
+        """
+        Stops accepting remote players, closes the connections to them and stops the event loop. Does nothing if
+        already closed.
+
+        :rtype: void
+        """
+        if self.loop.is_closed():
+            return
+        self._run(self._close_connections())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.loop_thread.join()
+        self.loop.close()
 
     @abstractmethod
     def _populate_players(self):
@@ -27,6 +93,96 @@ class BaseAdmin(ABC):
     def print_rankings(self):
         pass
 
+    def _accept_players(self):
+        """
+        Waits until `self.num_remote_players` remote players have connected and either registered or been replaced by
+        a `fallback_player`, then stops accepting.
+
+        :return: `list` of the registered players, in the order they connected.
+        :rtype: list
+        """
+        self._run(self._wait_for_registrations())
+        return list(self.remote_players)
+
+    def _create_fallback_player(self):
+        """
+        :return: a registered `fallback_player`, whose strategy is offloaded to worker processes if
+        `self.offload_processes` is set and the player has a strategy.
+        :rtype: PlayerInterface
+        """
+        player = self.fallback_player()
+        if self.offload_processes is not None and isinstance(getattr(player, "strategy", None), BaseStrategy):
+            player.strategy = OffloadedStrategy(player.strategy, self.offload_processes)
+        player.register()
+        return player
+
+    def _run(self, coroutine):
+        """
+        Runs a coroutine on the event loop, from another thread, and waits for it.
+
+        :return: the result of the coroutine.
+        :rtype: any
+        """
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def _start_server(self, host, port):
+        self.registered = asyncio.Event()
+        if self.num_remote_players == 0:
+            self.registered.set()
+        return await asyncio.start_server(self._register_player, host, port, backlog=max(self.num_remote_players, 1))
+
+    async def _wait_for_registrations(self):
+        await self.registered.wait()
+        self.server.close()
+
+    async def _close_connections(self):
+        if self.server is not None:
+            self.server.close()
+        for player in self.connections:
+            player.close()
+
+    async def _register_player(self, reader, writer):
+        """
+        Runs on the event loop for each connection: registers the remote player, or replaces it with a
+        `fallback_player` if it doesn't send a name within `self.registration_timeout` seconds.
+
+        :param asyncio.StreamReader reader: the reading end of the connection.
+        :param asyncio.StreamWriter writer: the writing end of the connection.
+        :rtype: void
+        """
+        if self.num_connected == self.num_remote_players:  # every place is taken
+            writer.close()
+            return
+        index = self.num_connected
+        self.num_connected += 1
+        player = AsyncProxyPlayer(reader, writer, self.loop)
+        try:
+            await asyncio.wait_for(player.register_async(), self.registration_timeout)
+            self.connections.append(player)
+        except (InvalidCommand, IllegalResponse, asyncio.TimeoutError):
+            player.close()
+            player = self._create_fallback_player()
+        self.remote_players[index] = player
+        self.num_registered += 1
+        if self.num_registered == self.num_remote_players:
+            self.registered.set()
+
+    def _play_games(self, referees):
+        """
+        Plays the games of the given referees at the same time, each on a worker thread, at most
+        `self.max_concurrent_games` at once. Games spend most of their time waiting on remote players, so they overlap
+        well on threads. No player may be in two of the games.
+
+        :param list referees: instances of `Referee` that haven't played their game yet.
+        :return: the results of `Referee.play_game()`, in the order of the referees.
+        :rtype: list
+        """
+        if not referees:
+            return []
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_games or len(referees)) as executor:
+            futures = [executor.submit(referee.play_game) for referee in referees]
+            return [future.result() for future in futures]
+
     def _players_not_power_of_2(self):
         if self.num_remote_players == 1:
             return True
@@ -35,24 +191,16 @@ class BaseAdmin(ABC):
 
 class SingleEliminationAdmin(BaseAdmin):
 
-    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer):
-        super().__init__(host, port, num_remote_players, fallback_player)
+    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer, max_concurrent_games=None,
+                 registration_timeout=BaseAdmin.DEFAULT_REGISTRATION_TIMEOUT, offload_processes=None):
+        super().__init__(host, port, num_remote_players, fallback_player, max_concurrent_games, registration_timeout,
+                         offload_processes)
         self.players = {}
         self.stage = 1
         self._populate_players()
 
     def _populate_players(self):
-        self.s.listen(self.num_remote_players)
-        while len(self.players) < self.num_remote_players:
-            conn, addr = self.s.accept()
-            player = ProxyPlayer(conn)
-
-            try:
-                player.register()
-            except (InvalidCommand, IllegalResponse):
-                conn.close()
-                player = self.fallback_player()
-                player.register()
+        for player in self._accept_players():
             self.players[player] = None
 
         if self._players_not_power_of_2():
@@ -63,8 +211,7 @@ class SingleEliminationAdmin(BaseAdmin):
                 num = num >> 1
                 count = count + 1
             for i in range((1 << count) - self.num_remote_players):
-                local_player = self.fallback_player()
-                local_player.register()
+                local_player = self._create_fallback_player()
                 self.players[local_player] = None
 
     def run_tournament(self):
@@ -75,15 +222,17 @@ class SingleEliminationAdmin(BaseAdmin):
         # while there is no tournament winner
         while len(active_players) > 1:
             print("We're at stage {}!".format(self.stage))  # debug
-            # TODO: refactor to be concurrent
-            # assign opponents, instantiate referees, make play_game() calls, record results
+            # assign opponents, instantiate referees, play the stage's games concurrently, record results
+            referees = []
             for i in range(len(active_players) // 2):
                 player1, player2 = active_players[i], active_players[len(active_players)-1-i]
                 if random.random() < 0.5:
-                    referee = Referee(player1, player2)
+                    referees.append(Referee(player1, player2))
                 else:
-                    referee = Referee(player2, player1)
-                winner, loser_cheated = referee.play_game()
+                    referees.append(Referee(player2, player1))
+            results = self._play_games(referees)
+            for i, (winner, loser_cheated) in enumerate(results):
+                player1, player2 = active_players[i], active_players[len(active_players)-1-i]
                 loser = player2 if winner is player1 else player1
                 loser_idx = len(active_players)-1-i if winner is player1 else i
 
@@ -99,7 +248,7 @@ class SingleEliminationAdmin(BaseAdmin):
 
         self.players[winner] = self.stage
 
-        self.s.close()  # cleanup
+        self.close()  # cleanup
 
     def print_rankings(self):
         print("\nFinal Standings:\n----------------------")
@@ -111,23 +260,15 @@ class SingleEliminationAdmin(BaseAdmin):
 
 class RoundRobinAdmin(BaseAdmin):
 
-    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer):
-        super().__init__(host, port, num_remote_players, fallback_player)
+    def __init__(self, host, port, num_remote_players, fallback_player=SmartPlayer, max_concurrent_games=None,
+                 registration_timeout=BaseAdmin.DEFAULT_REGISTRATION_TIMEOUT, offload_processes=None):
+        super().__init__(host, port, num_remote_players, fallback_player, max_concurrent_games, registration_timeout,
+                         offload_processes)
         self.players = {}
         self._populate_players()
 
     def _populate_players(self):
-        self.s.listen(self.num_remote_players)
-        while len(self.players) < self.num_remote_players:
-            conn, addr = self.s.accept()
-            player = ProxyPlayer(conn)
-
-            try:
-                player.register()
-            except (InvalidCommand, IllegalResponse):
-                conn.close()
-                player = self.fallback_player()
-                player.register()
+        for player in self._accept_players():
             self.players[player] = []
 
         if self._players_not_power_of_2():
@@ -138,21 +279,25 @@ class RoundRobinAdmin(BaseAdmin):
                 num = num >> 1
                 count = count + 1
             for i in range((1 << count) - self.num_remote_players):
-                local_player = self.fallback_player()
-                local_player.register()
+                local_player = self._create_fallback_player()
                 self.players[local_player] = []
 
     def run_tournament(self):
         active_players = list(self.players.keys())
         cheaters = set()
-        for i in range(len(active_players)):
-            for j in range(i+1, len(active_players)):
+        for round_pairs in self._schedule_rounds(len(active_players)):
+            referees = []
+            for i, j in round_pairs:
                 player1, player2 = active_players[i], active_players[j]
                 if random.random() < 0.5:
-                    referee = Referee(player1, player2)
+                    referees.append(Referee(player1, player2))
                 else:
-                    referee = Referee(player2, player1)
-                winner, loser_cheated = referee.play_game()
+                    referees.append(Referee(player2, player1))
+            # no player is in two games of a round, so its games are played at once and their results recorded in
+            # schedule order after the round. Substitutes for cheaters join from the next round.
+            results = self._play_games(referees)
+            for (i, j), (winner, loser_cheated) in zip(round_pairs, results):
+                player1, player2 = active_players[i], active_players[j]
                 loser = player2 if winner is player1 else player1
                 loser_idx = j if winner is player1 else i
                 self.players[winner].append(loser)
@@ -163,12 +308,32 @@ class RoundRobinAdmin(BaseAdmin):
                         if past_opponent not in cheaters:
                             self.players[past_opponent].append(loser)
                     self.players[loser] = []
-                    sub_player = self.fallback_player()
-                    sub_player.register()
+                    sub_player = self._create_fallback_player()
                     active_players[loser_idx] = sub_player
                     self.players[sub_player] = []
 
-        self.s.close()  # cleanup
+        self.close()  # cleanup
+
+    @staticmethod
+    def _schedule_rounds(num_players):
+        """
+        Arranges the games between every pair of players into rounds with the circle method: the players are laid out
+        in a circle, the i-th from the start playing the i-th from the end, and every player but the first moves one
+        place along after each round. Each pair meets once, and no player plays twice in a round. An odd number of
+        players is padded with an empty place, and whoever is paired with it sits the round out.
+
+        :param int num_players: the number of players.
+        :return: `list` of rounds, each a `list` of (i, j) pairs of the indices of the players who play each other,
+        with i < j. There are `num_players` - 1 rounds for an even number of players, else `num_players`.
+        :rtype: list
+        """
+        circle = list(range(num_players)) + ([None] if num_players % 2 else [])
+        rounds = []
+        for _ in range(len(circle) - 1):
+            pairs = [(circle[k], circle[-1 - k]) for k in range(len(circle) // 2)]
+            rounds.append([(min(pair), max(pair)) for pair in pairs if None not in pair])
+            circle = [circle[0], circle[-1]] + circle[1:-1]
+        return rounds
 
     def print_rankings(self):
         print("\nFinal Standings:\n----------------------")
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import threading
+from ProxyPlayer import ProxyPlayer
+from CustomExceptions import ContractViolation, IllegalResponse
+
+
+class AsyncProxyPlayer(ProxyPlayer):
+    """
+    A `ProxyPlayer` connected through `asyncio` streams on an event loop run by another thread (see `BaseAdmin`), so
+    that one thread can talk to many remote players at once.
+
+    `register_async()` registers the player from the event loop, where the Admin can give it a deadline with
+    `asyncio.wait_for()`. The other methods of `PlayerInterface` are called by referees from their own threads: each
+    runs its message exchange on the event loop and blocks until the response arrives, and checks it as `ProxyPlayer`
+    does.
+    """
+
+    def __init__(self, reader, writer, loop):
+        """
+        :param asyncio.StreamReader reader: the reading end of the connection to the remote player.
+        :param asyncio.StreamWriter writer: the writing end of the connection to the remote player.
+        :param asyncio.AbstractEventLoop loop: the event loop the streams belong to, run by another thread.
+        """
+        super().__init__(None)
+        self.reader = reader
+        self.writer = writer
+        self.loop = loop
+
+    async def register_async(self):
+        """
+        Same as `register()`, but as a coroutine to run on the event loop.
+
+        :return: the name of the player
+        :rtype: str
+        """
+        response = await self._exchange(["Register"])
+        return self._set_name(response)
+
+    def close(self):
+        """
+        Closes the connection to the remote player. Must be called on the event loop.
+
+        :rtype: void
+        """
+        self.writer.close()
+
+    def _send_message_and_recv_response(self, message):
+        """
+        Runs the exchange of `message` and its response on the event loop, and waits for it.
+
+        CONTRACT:
+         - must not be called from the thread running the event loop, which would wait for itself.
+
+        :param any message: an object that can be converted to json via json.dumps() .
+        :return: an object that can be converted to json via json.dumps()
+        :rtype: any
+        """
+        if getattr(self.loop, "_thread_id", None) == threading.get_ident():
+            raise ContractViolation("AsyncProxyPlayer can't wait for a response on its own event loop!")
+        return asyncio.run_coroutine_threadsafe(self._exchange(message), self.loop).result()
+
+    async def _exchange(self, message):
+        """
+        :param any message: an object that can be converted to json via json.dumps() .
+        :return: the response of the remote player, one line of JSON.
+        :rtype: any
+        """
+        self.writer.write(bytes(json.dumps(message) + "\n", "utf-8"))
+        try:
+            await self.writer.drain()
+            response = str(await self.reader.readline(), "utf-8")
+        except (ConnectionError, ValueError) as e:  # a line too long for the stream, or not utf-8
+            raise IllegalResponse("Couldn't read response: {}".format(e))
+        if not response:
+            raise IllegalResponse("Response was empty!")
+        try:
+            return json.loads(response)
+        except ValueError:
+            raise IllegalResponse("Response was not JSON! Received: {}".format(response))
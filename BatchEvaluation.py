@@ -0,0 +1,161 @@
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from Board import Board
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional, the strategies score one board at a time without it
+    np = None
+
+
+class BatchEvaluator:
+    """
+    Scores every child of a board at once, with NumPy array operations, so that the last ply of a search doesn't make,
+    score and unmake each play in Python. The scores are the same as those of `SmartStrategy._score_board_helper` and
+    `GreedyStrategy._score_board`, computed from the same heights.
+
+    NumPy is optional: `is_available()` is `False` if it isn't installed, and the strategies then score the children one
+    at a time.
+
+    Definitions:
+
+    children
+        The boards after each of a list of plays on a board, in the order of the plays.
+
+    heights
+        `numpy.ndarray` of shape (number of children, num_rows * num_cols): the height of every cell of each child,
+        indexed by cell index (as defined in the documentation of `Board`).
+
+    worker cells
+        `numpy.ndarray` of shape (number of children, 4): the cell index of every worker of each child, in the order of
+        `RuleChecker.WORKERS`.
+
+    scores
+        `numpy.ndarray` of shape (number of children, 2): the score of the workers of each color of each child, in the
+        order of `RuleChecker.COLORS`.
+    """
+
+    _ADJACENCY_MATRICES = {}  # key-value pair of (num_rows, num_cols) : adjacency matrix
+    _NEIGHBOR_TABLES = {}  # key-value pair of (num_rows, num_cols) : neighbor table
+
+    @staticmethod
+    def is_available():
+        """
+        :return: `True` if NumPy is installed, else `False`.
+        :rtype: bool
+        """
+        return np is not None
+
+    @staticmethod
+    def get_children(board, codes):
+        """
+        Computes the children (as defined above) of a board from its heights and worker cells and the plays, without
+        making the plays on the board.
+
+        :param Board board: an instance of Board (refer to documentation of Board class), with every worker on it.
+        :param list codes: play codes (as defined in the documentation of `PlayCode`) of legal plays on the board.
+        :return: the heights and worker cells (as defined above) of the children.
+        :rtype: tuple
+        """
+        num_rows, num_cols = board.get_dimensions()
+        parent_heights = np.array([board.get_cell_height(row, col) for row in range(num_rows) for col in range(num_cols)],
+                                  dtype=np.int64)
+        parent_worker_cells = np.array([row * num_cols + col for row, col, height
+                                        in map(board.get_worker_position, RuleChecker.WORKERS)], dtype=np.int64)
+
+        codes = np.array(codes, dtype=np.int64)
+        children = np.arange(len(codes))
+        workers = codes >> PlayCode.WORKER_SHIFT & PlayCode.WORKER_MASK
+        neighbors = BatchEvaluator.get_neighbor_table(num_rows, num_cols)
+        to_cells = neighbors[parent_worker_cells[workers], codes >> PlayCode.MOVE_SHIFT & PlayCode.DIRECTION_MASK]
+        worker_cells = np.tile(parent_worker_cells, (len(codes), 1))
+        worker_cells[children, workers] = to_cells
+
+        heights = np.tile(parent_heights, (len(codes), 1))
+        builds = (codes & PlayCode.WIN_FLAG) == 0  # winning plays don't build
+        heights[children[builds], neighbors[to_cells[builds], codes[builds] & PlayCode.DIRECTION_MASK]] += 1
+        return heights, worker_cells
+
+    @staticmethod
+    def get_smart_scores(heights, worker_cells, dimensions):
+        """
+        Scores the workers of each color of each child as `SmartStrategy._score_board_helper` does: 16 points per
+        level a worker stands on, and for each cell adjacent to it, 3 points per level of a building that isn't domed,
+        less the worker's height, and -1 if the cell has a worker on it.
+
+        :param numpy.ndarray heights: the heights (as defined above) of the children.
+        :param numpy.ndarray worker_cells: the worker cells (as defined above) of the children.
+        :param tuple dimensions: the dimensions of the board, in format (num_rows, num_cols).
+        :return: the scores (as defined above) of the children.
+        :rtype: numpy.ndarray
+        """
+        adjacency = BatchEvaluator.get_adjacency_matrix(*dimensions)
+        children = np.arange(len(heights))[:, None]
+        buildings = (heights > 0) & (heights < RuleChecker.MAX_HEIGHT)
+        occupied = np.zeros_like(heights)
+        occupied[children, worker_cells] = 1
+        building_sums = (heights * buildings) @ adjacency
+        building_counts = buildings @ adjacency
+        num_workers = occupied @ adjacency
+        worker_heights = heights[children, worker_cells]
+        worker_scores = (worker_heights * 16 + building_sums[children, worker_cells] * 3
+                         - worker_heights * building_counts[children, worker_cells] - num_workers[children, worker_cells])
+        return worker_scores.reshape(len(heights), len(RuleChecker.COLORS), -1).sum(axis=2).astype(np.int64)
+
+    @staticmethod
+    def get_greedy_scores(heights, worker_cells, dimensions):
+        """
+        Scores the workers of each color of each child as `GreedyStrategy._score_board` does: 5 points per level a
+        worker stands on, and 1 per level of each cell adjacent to it.
+
+        :param numpy.ndarray heights: the heights (as defined above) of the children.
+        :param numpy.ndarray worker_cells: the worker cells (as defined above) of the children.
+        :param tuple dimensions: the dimensions of the board, in format (num_rows, num_cols).
+        :return: the scores (as defined above) of the children.
+        :rtype: numpy.ndarray
+        """
+        adjacency = BatchEvaluator.get_adjacency_matrix(*dimensions)
+        children = np.arange(len(heights))[:, None]
+        height_sums = heights @ adjacency
+        worker_scores = heights[children, worker_cells] * 5 + height_sums[children, worker_cells]
+        return worker_scores.reshape(len(heights), len(RuleChecker.COLORS), -1).sum(axis=2).astype(np.int64)
+
+    @staticmethod
+    def get_adjacency_matrix(num_rows, num_cols):
+        """
+        Returns the adjacency matrix of boards of the given dimensions, building it on first use.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: `numpy.ndarray` of shape (num_rows * num_cols, num_rows * num_cols), with a 1 at [i, j] if the cells
+        with cell indices i and j are adjacent, else 0. Multiplying heights by it sums the heights around each cell.
+        :rtype: numpy.ndarray
+        """
+        key = (num_rows, num_cols)
+        if key not in BatchEvaluator._ADJACENCY_MATRICES:
+            # floats, so that the products run on BLAS; the sums of heights stay exact integers
+            matrix = np.zeros((num_rows * num_cols, num_rows * num_cols), dtype=np.float64)
+            for index, cell_adjacency in enumerate(Board.get_adjacency_table(num_rows, num_cols)):
+                for adj_cell in cell_adjacency:
+                    if adj_cell.in_bounds:
+                        matrix[index, adj_cell.index] = 1
+            BatchEvaluator._ADJACENCY_MATRICES[key] = matrix
+        return BatchEvaluator._ADJACENCY_MATRICES[key]
+
+    @staticmethod
+    def get_neighbor_table(num_rows, num_cols):
+        """
+        Returns the cell index of the cell adjacent to each cell in each direction, on boards of the given dimensions,
+        building it on first use.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: `numpy.ndarray` of shape (num_rows * num_cols, 8), indexed by cell index and the index of the direction
+        in `RuleChecker.DIRECTIONS`, holding -1 for cells out of bounds.
+        :rtype: numpy.ndarray
+        """
+        key = (num_rows, num_cols)
+        if key not in BatchEvaluator._NEIGHBOR_TABLES:
+            BatchEvaluator._NEIGHBOR_TABLES[key] = np.array(
+                [[adj_cell.index for adj_cell in cell_adjacency]
+                 for cell_adjacency in Board.get_adjacency_table(num_rows, num_cols)], dtype=np.int64)
+        return BatchEvaluator._NEIGHBOR_TABLES[key]
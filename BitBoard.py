@@ -0,0 +1,602 @@
+import json
+import random
+from Board import Board
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from CustomExceptions import ContractViolation, IllegalPlay
+
+
+class BitBoard(Board):
+    """
+    A drop-in replacement for `Board` that stores the board state in packed bitmasks rather than nested lists.
+
+    The public API is the same as `Board`, so `Referee`, `Player` and the strategies can use either implementation.
+    Boards are still passed in and handed out in the list format defined in the documentation of `Board`.
+
+    Definitions:
+
+    cell index
+        `int` in range [0, num_rows * num_cols). The cell at position (row, col) has cell index `row * num_cols + col`,
+        and is represented by the bit `1 << cell index` in every mask.
+
+    level mask
+        `int` bitmask. `self.levels[k]` has the bit of a cell set if that cell's height is at least `k + 1`, so the
+        height of a cell is the number of level masks its bit is set in.
+
+    occupancy mask
+        `int` bitmask with the bit of every cell containing a worker set.
+
+    neighbor mask
+        `int` bitmask. `self.neighbor_masks[index]` has the bit of every cell adjacent to the cell with that index set.
+        One list of neighbor masks is built per board size and shared by every board of that size.
+
+    """
+
+    NUM_LEVELS = 4
+    _NEIGHBOR_MASKS = {}  # key-value pair of (num_rows, num_cols) : neighbor masks
+
+    def __init__(self):
+        """
+        Constructor. Initializes an empty board of the default dimensions.
+        """
+        self.rows, self.cols = 0, 0
+        self.levels = [0] * BitBoard.NUM_LEVELS
+        self.occupied = 0
+        self.worker_cells = {}  # key-value pair of worker : cell index
+        self.adjacency = None
+        self.neighbor_masks = None
+        self.zobrist = None
+        self.side_to_move = 0
+        self.zobrist_key = 0
+        self.undo_stack = []
+        self._snapshot = None
+        self.set_board(self._create_empty_board())
+
+    @property
+    def board(self):
+        """
+        A board (as defined in the documentation of `Board`) built from the current masks. Mutating the returned list
+        does not change the state of the BitBoard.
+
+        :rtype: list
+        """
+        return self.extract_board()
+
+    @board.setter
+    def board(self, board_obj):
+        self.set_board(board_obj)
+
+    def get_dimensions(self):
+        """
+        :return: The dimensions of the board in format (num_rows, num_cols)
+        :rtype: tuple
+        """
+        return self.rows, self.cols
+
+    def set_board(self, board_obj):
+        """
+        Packs the passed in board into the level and occupancy masks.
+
+        :param list board_obj: a board (as defined in the documentation of `Board`), or a `BoardSnapshot` of one.
+        :return: No value returned.
+        :rtype: void.
+        """
+        if not board_obj or not board_obj[0]:
+            raise ContractViolation("Cannot set an empty board!")
+        self.rows, self.cols = len(board_obj), len(board_obj[0])
+        self.adjacency = Board.get_adjacency_table(self.rows, self.cols)
+        self.neighbor_masks = BitBoard.get_neighbor_masks(self.rows, self.cols)
+        self.zobrist = Board.get_zobrist_table(self.rows, self.cols)
+        self.levels = [0] * BitBoard.NUM_LEVELS
+        self.occupied = 0
+        self.worker_cells = {}
+        self.side_to_move = 0
+        self.zobrist_key = 0
+        self.undo_stack = []
+        self._snapshot = None
+        heights = []
+        for r, row in enumerate(board_obj):
+            for c, cell in enumerate(row):
+                index = r * self.cols + c
+                if isinstance(cell, (list, tuple)):
+                    height, worker = cell
+                    self.occupied |= 1 << index
+                    self.worker_cells[worker] = index
+                    if RuleChecker.is_valid_worker(worker):
+                        self.zobrist_key ^= self.zobrist.workers[index][RuleChecker.WORKER_INDICES[worker]]
+                else:
+                    height = cell
+                heights.append(height)
+                self._set_cell_height(index, height)
+                if 0 <= height <= RuleChecker.MAX_HEIGHT:
+                    self.zobrist_key ^= self.zobrist.heights[index][height]
+        self._init_neighbor_sums(heights)
+
+    def neighboring_cell_exists(self, worker, direction):
+        """
+        Checks if the cell adjacent to the worker's position in the specified direction exists.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: `True` if cell adjacent in the specified direction exists, else `False`.
+        :rtype: bool
+        """
+        return self._get_adj_index(worker, direction) >= 0
+
+    def get_height(self, worker, direction):
+        """
+        Returns the height of the cell adjacent to the worker's position in the specified direction.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: the height of the adjacent cell, or `None` if the adjacent cell doesn't exist.
+        :rtype: int, void
+        """
+        index = self._get_adj_index(worker, direction)
+        if index >= 0:
+            return self._get_cell_height(index)
+
+    def is_occupied(self, worker, direction):
+        """
+        Checks if the cell adjacent to the worker's position in the specified direction is occupied.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: `True` if the adjacent cell exists and is occupied, `False` if it is unoccupied, `None` if it doesn't
+        exist.
+        :rtype: bool, void
+        """
+        index = self._get_adj_index(worker, direction)
+        if index >= 0:
+            return bool(self.occupied >> index & 1)
+
+    def build(self, worker, direction):
+        """
+        Increases the height of the cell adjacent to the worker's position in the specified direction by 1.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: No value returned.
+        :rtype: void
+        """
+        index = self._get_adj_index(worker, direction)
+        height = self._get_cell_height(index)
+        self.zobrist_key ^= self.zobrist.heights[index][height] ^ self.zobrist.heights[index][height + 1]
+        self._snapshot = None
+        self._set_cell_height(index, height + 1)
+        self.neighbor_sums += self.neighbor_sum_deltas[index][height]
+
+    def undo_build(self, worker, direction):
+        """
+        Decreases the height of the cell adjacent to the worker's position in the specified direction by 1.
+
+        Note: should not be used outside the `Strategy` component.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: No value returned.
+        :rtype: void
+        """
+        index = self._get_adj_index(worker, direction)
+        height = self._get_cell_height(index)
+        self.zobrist_key ^= self.zobrist.heights[index][height] ^ self.zobrist.heights[index][height - 1]
+        self._snapshot = None
+        self._set_cell_height(index, height - 1)
+        self.neighbor_sums -= self.neighbor_sum_deltas[index][height - 1]
+
+    def move(self, worker, direction):
+        """
+        Moves the specified worker from it's cell to the cell adjacent to the worker's existing position in the
+        specified direction.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: No value returned.
+        :rtype: void
+        """
+        index = self._get_adj_index(worker, direction)
+        worker_index = RuleChecker.WORKER_INDICES[worker]
+        self.zobrist_key ^= (self.zobrist.workers[self.worker_cells[worker]][worker_index]
+                             ^ self.zobrist.workers[index][worker_index] ^ self.zobrist.side)
+        self.side_to_move ^= 1
+        self._snapshot = None
+        self.occupied ^= (1 << self.worker_cells[worker]) | (1 << index)
+        self.worker_cells[worker] = index
+
+    def _apply_play(self, worker, move_dir_index, build_dir_index):
+        """
+        Moves the worker and builds, recording the worker's previous cell index and the built cell's previous height
+        on the undo stack. See `Board.make_play`.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param int move_dir_index: the index in `RuleChecker.DIRECTIONS` of the direction to move.
+        :param int build_dir_index: the index in `RuleChecker.DIRECTIONS` of the direction to build, or `None`.
+        :rtype: void
+        """
+        from_index = self.worker_cells[worker]
+        self._snapshot = None
+        to_index = self.adjacency[from_index][move_dir_index].index
+        worker_keys = self.zobrist.workers
+        worker_index = RuleChecker.WORKER_INDICES[worker]
+
+        key = self.zobrist_key
+        self.occupied ^= (1 << from_index) | (1 << to_index)
+        self.worker_cells[worker] = to_index
+        self.zobrist_key ^= worker_keys[from_index][worker_index] ^ worker_keys[to_index][worker_index]
+        self.zobrist_key ^= self.zobrist.side
+        self.side_to_move ^= 1
+
+        build_index, build_height = -1, 0
+        if build_dir_index is not None:
+            build_index = self.adjacency[to_index][build_dir_index].index
+            build_height = self._get_cell_height(build_index)
+            self.levels[build_height] |= 1 << build_index
+            height_keys = self.zobrist.heights[build_index]
+            self.zobrist_key ^= height_keys[build_height] ^ height_keys[build_height + 1]
+            self.neighbor_sums += self.neighbor_sum_deltas[build_index][build_height]
+        self.undo_stack.append((worker, from_index, to_index, build_index, build_height, key))
+
+    def generate_play_codes(self, color):
+        """
+        Returns the play codes of every legal play for the workers of the given color, computing the cells each worker
+        can move to, and then build on, from the level and occupancy masks. See `Board.generate_play_codes`.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: a `list` of play codes (as defined in the documentation of `PlayCode`).
+        :rtype: list
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        codes = []
+        levels = self.levels
+        domes = levels[BitBoard.NUM_LEVELS - 1]
+        for worker in (color + "1", color + "2"):
+            if worker not in self.worker_cells:
+                raise ContractViolation("Worker does not exist in worker_dictionary!")
+            from_index = self.worker_cells[worker]
+            worker_height = self._get_cell_height(from_index)
+            # workers can't move onto other workers, domes, or cells more than one level higher than their own
+            move_blocked = self.occupied | domes
+            if worker_height + 1 < BitBoard.NUM_LEVELS:
+                move_blocked |= levels[worker_height + 1]
+            build_blocked = (self.occupied ^ 1 << from_index) | domes
+            worker_code = RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+            for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+                if not to_cell.in_bounds or move_blocked >> to_cell.index & 1:
+                    continue
+                move_code = worker_code | move_dir_index << PlayCode.MOVE_SHIFT
+                if levels[2] >> to_cell.index & 1:  # moving up to height 3 wins
+                    codes.append(move_code | PlayCode.WIN_FLAG)
+                    continue
+                for build_dir_index, build_cell in enumerate(self.adjacency[to_cell.index]):
+                    if build_cell.in_bounds and not build_blocked >> build_cell.index & 1:
+                        codes.append(move_code | build_dir_index)
+        return codes
+
+    def _iter_worker_play_codes(self, worker, winning):
+        """
+        Yields the play codes of the worker's winning plays, or of its other plays, computing the cells it can move to
+        and build on from the masks. See `Board._iter_worker_play_codes`.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param bool winning: `True` to yield only the worker's winning plays, `False` to yield only the others.
+        :return: an iterator over play codes (as defined in the documentation of `PlayCode`).
+        :rtype: iterator
+        """
+        levels = self.levels
+        domes = levels[BitBoard.NUM_LEVELS - 1]
+        from_index = self.worker_cells[worker]
+        worker_height = self._get_cell_height(from_index)
+        worker_code = RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+        if winning:
+            if worker_height < 2:
+                return
+            targets = self.neighbor_masks[from_index] & levels[2] & ~(self.occupied | domes)
+            for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+                if to_cell.in_bounds and targets >> to_cell.index & 1:
+                    yield worker_code | move_dir_index << PlayCode.MOVE_SHIFT | PlayCode.WIN_FLAG
+            return
+        # workers can't move onto other workers, domes, or cells more than one level higher than their own, and
+        # moving onto height 3 was yielded as a win
+        move_blocked = self.occupied | domes | levels[min(worker_height + 1, 2)]
+        build_blocked = (self.occupied ^ 1 << from_index) | domes
+        for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+            if not to_cell.in_bounds or move_blocked >> to_cell.index & 1:
+                continue
+            move_code = worker_code | move_dir_index << PlayCode.MOVE_SHIFT
+            for build_dir_index, build_cell in enumerate(self.adjacency[to_cell.index]):
+                if build_cell.in_bounds and not build_blocked >> build_cell.index & 1:
+                    yield move_code | build_dir_index
+
+    def has_winning_move(self, color):
+        """
+        Checks if a worker of the given color stands at height 2 next to an unoccupied cell of height 3, using the
+        neighbor masks (as defined above). See `Board.has_winning_move`.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: `True` if the color has a winning move, else `False`.
+        :rtype: bool
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        levels = self.levels
+        climbable = levels[2] & ~(self.occupied | levels[BitBoard.NUM_LEVELS - 1])
+        for worker in (color + "1", color + "2"):
+            if worker not in self.worker_cells:
+                raise ContractViolation("Worker does not exist in worker_dictionary!")
+            from_index = self.worker_cells[worker]
+            if levels[1] >> from_index & 1 and self.neighbor_masks[from_index] & climbable:
+                return True
+        return False
+
+    def random_play_code(self, color):
+        """
+        Picks a random legal play that doesn't win for the workers of the given color, computing the cells the worker
+        can move to and build on from the masks. See `Board.random_play_code`.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: the play code (as defined in the documentation of `PlayCode`) of the play, or `None` if neither worker
+        can make a play that doesn't win.
+        :rtype: int, None
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        levels = self.levels
+        domes = levels[BitBoard.NUM_LEVELS - 1]
+        workers = [color + "1", color + "2"]
+        random.shuffle(workers)
+        for worker in workers:
+            if worker not in self.worker_cells:
+                raise ContractViolation("Worker does not exist in worker_dictionary!")
+            from_index = self.worker_cells[worker]
+            # as in `_iter_worker_play_codes`, but moving onto height 3 wins so it is blocked too
+            move_blocked = self.occupied | domes | levels[min(self._get_cell_height(from_index) + 1, 2)]
+            adjacency = self.adjacency[from_index]
+            moves = [move_dir_index for move_dir_index, to_cell in enumerate(adjacency)
+                     if to_cell.in_bounds and not move_blocked >> to_cell.index & 1]
+            if not moves:
+                continue
+            move_dir_index = random.choice(moves)
+            build_blocked = (self.occupied ^ 1 << from_index) | domes
+            builds = [build_dir_index for build_dir_index, build_cell
+                      in enumerate(self.adjacency[adjacency[move_dir_index].index])
+                      if build_cell.in_bounds and not build_blocked >> build_cell.index & 1]
+            return (RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+                    | move_dir_index << PlayCode.MOVE_SHIFT | random.choice(builds))
+        return None
+
+    def unmake(self):
+        """
+        Undoes the last play applied with `make_play()`. See `Board.unmake`.
+
+        :rtype: void
+        """
+        if not self.undo_stack:
+            raise ContractViolation("No play to unmake!")
+        worker, from_index, to_index, build_index, build_height, key = self.undo_stack.pop()
+        self._snapshot = None
+        if build_index >= 0:
+            self.levels[build_height] &= ~(1 << build_index)
+            self.neighbor_sums -= self.neighbor_sum_deltas[build_index][build_height]
+        self.occupied ^= (1 << from_index) | (1 << to_index)
+        self.worker_cells[worker] = from_index
+        self.zobrist_key = key
+        self.side_to_move ^= 1
+
+    def get_adjacent_cell(self, worker, direction):
+        """
+        Looks up the cell adjacent to the worker's position in the specified direction in the adjacency table.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: the `AdjacentCell` (as defined in the documentation of `Board`) adjacent to the worker.
+        :rtype: AdjacentCell
+        """
+        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
+            raise ContractViolation("Invalid (or no) worker / direction provided.")
+        if worker not in self.worker_cells:
+            raise ContractViolation("Worker does not exist in worker_dictionary!")
+        return self._get_adjacent_cell_unchecked(worker, direction)
+
+    def _get_adjacent_cell_unchecked(self, worker, direction):
+        """
+        Fast path of `get_adjacent_cell()` without contract checks. See `Board.FAST_PATH_METHODS`.
+        """
+        return self.adjacency[self.worker_cells[worker]][RuleChecker.DIRECTION_INDICES[direction]]
+
+    def worker_exists(self, worker):
+        return worker in self.worker_cells
+
+    def get_worker_position(self, worker):
+        """
+        Returns the position of the given worker and the height at that position as one tuple of the form
+        `(row, col, height)`.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :return: the position of the given worker and the height at that position.
+        :rtype: tuple of ints
+        """
+        if not RuleChecker.is_valid_worker(worker):
+            raise ContractViolation("Invalid worker provided: {}".format(worker))
+        if worker not in self.worker_cells:
+            raise ContractViolation("Worker does not exist in worker_dictionary!")
+        return self._get_worker_position_unchecked(worker)
+
+    def _get_worker_position_unchecked(self, worker):
+        """
+        Fast path of `get_worker_position()` without contract checks. See `Board.FAST_PATH_METHODS`.
+        """
+        index = self.worker_cells[worker]
+        row, col = divmod(index, self.cols)
+        return row, col, self._get_cell_height(index)
+
+    def get_neighbor_sums(self, worker):
+        """
+        See `Board.get_neighbor_sums`. The workers adjacent to the worker are counted from the occupancy mask.
+
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :return: `tuple` of (the worker's height, the neighbor sums of the worker's cell, the number of workers on the
+        cells adjacent to it).
+        :rtype: tuple of ints
+        """
+        self.get_worker_position(worker)
+        return self._get_neighbor_sums_unchecked(worker)
+
+    def _get_neighbor_sums_unchecked(self, worker):
+        """
+        Fast path of `get_neighbor_sums()` without contract checks. See `Board.FAST_PATH_METHODS`.
+        """
+        index = self.worker_cells[worker]
+        return (self._get_cell_height(index),
+                self.neighbor_sums >> index * Board.NEIGHBOR_SUM_BITS & Board.NEIGHBOR_SUMS_MASK,
+                bin(self.neighbor_masks[index] & self.occupied).count("1"))
+
+    def get_cell_height(self, row, col):
+        """
+
+        :param int row:
+        :param int col:
+        :return:
+        :rtype: int
+        """
+        index = row * self.cols + col
+        levels = self.levels
+        if not levels[0] >> index & 1:
+            return 0
+        return 1 + (levels[1] >> index & 1) + (levels[2] >> index & 1) + (levels[3] >> index & 1)
+
+    def get_cell_worker(self, row, col):
+        """
+
+        :param int row:
+        :param int col:
+        :return:
+        :rtype: string or None
+        """
+        if self.has_worker(row, col):
+            index = row * self.cols + col
+            for worker, worker_index in self.worker_cells.items():
+                if worker_index == index:
+                    return worker
+        return None
+
+    def has_worker(self, row, col):
+        """
+        Returns whether a cell has a worker present in it or not.
+
+        :param int row: `row` in a position (as defined in the documentation of `Board`).
+        :param int col: `col` in a position (as defined in the documentation of `Board`).
+        :return: `True` if the cell's bit is set in the occupancy mask, `False` otherwise.
+        :rtype: bool
+        """
+        return bool(self.occupied >> (row * self.cols + col) & 1)
+
+    def place_worker(self, row, col, worker):
+        """
+        Places a worker at the cell at position (row, col)
+
+        :param int row: `row` in a position (as defined in the documentation of `Board`).
+        :param int col: `col` in a position (as defined in the documentation of `Board`).
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :rtype: void
+        """
+        if not RuleChecker.is_valid_worker(worker):
+            raise ContractViolation("Invalid worker provided: {}".format(worker))
+        if self.has_worker(row, col):
+            raise IllegalPlay("Cannot place worker in occupied cell!")
+        index = row * self.cols + col
+        self.occupied |= 1 << index
+        self.worker_cells[worker] = index
+        self.zobrist_key ^= self.zobrist.workers[index][RuleChecker.WORKER_INDICES[worker]]
+        self._snapshot = None
+
+    def extract_json_board(self):
+        """
+        Returns a JSON representation of the current board state.
+
+        :return: json array
+        :rtype: string
+        """
+        return json.dumps(self.extract_board())
+
+    def extract_board(self):
+        """
+        Returns a board (as defined in the documentation of `Board`) built from the current masks.
+
+        :return: board list
+        :rtype: list
+        """
+        cell_workers = {index: worker for worker, index in self.worker_cells.items()}
+        board = []
+        for r in range(self.rows):
+            row = []
+            for c in range(self.cols):
+                index = r * self.cols + c
+                height = self._get_cell_height(index)
+                row.append([height, cell_workers[index]] if index in cell_workers else height)
+            board.append(row)
+        return board
+
+    def __str__(self):
+        result = ""
+        for row in self.extract_board():
+            result += str(row) + '\n'
+        return result
+
+    def _get_cell_height(self, index):
+        """
+        :param int index: a cell index (as defined above).
+        :return: the height of the cell, i.e. the number of level masks the cell's bit is set in.
+        :rtype: int
+        """
+        height = 0
+        for level in self.levels:
+            if not level >> index & 1:
+                break
+            height += 1
+        return height
+
+    def _set_cell_height(self, index, height):
+        """
+        :param int index: a cell index (as defined above).
+        :param int height: the height (as defined in the documentation of `Board`) to give the cell.
+        :rtype: void
+        """
+        bit = 1 << index
+        for k in range(BitBoard.NUM_LEVELS):
+            if k < height:
+                self.levels[k] |= bit
+            else:
+                self.levels[k] &= ~bit
+
+    def _get_adj_index(self, worker, direction):
+        """
+        :param string worker: a worker (as defined in the documentation of `Board`).
+        :param string direction: a direction (as defined in the documentation of `Board`).
+        :return: the cell index (as defined above) adjacent to the worker in the specified direction, or -1 if the
+        adjacent cell doesn't exist.
+        :rtype: int
+        """
+        return self.get_adjacent_cell(worker, direction).index
+
+    @staticmethod
+    def get_neighbor_masks(num_rows, num_cols):
+        """
+        Returns the neighbor masks (as defined above) for boards of the given dimensions, building them on first use.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: a `list` of neighbor masks, indexed by cell index.
+        :rtype: list
+        """
+        key = (num_rows, num_cols)
+        if key not in BitBoard._NEIGHBOR_MASKS:
+            masks = []
+            for cell_adjacency in Board.get_adjacency_table(num_rows, num_cols):
+                mask = 0
+                for adj_cell in cell_adjacency:
+                    if adj_cell.in_bounds:
+                        mask |= 1 << adj_cell.index
+                masks.append(mask)
+            BitBoard._NEIGHBOR_MASKS[key] = masks
+        return BitBoard._NEIGHBOR_MASKS[key]
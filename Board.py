@@ -1,11 +1,48 @@
 import json
+import random
+from collections import namedtuple
 from RuleChecker import RuleChecker
+from PlayCode import PlayCode
 from CustomExceptions import ContractViolation, IllegalPlay
 from copy import deepcopy
 
 
 # TODO: how do we feel about a helper function to return the len of worker_positions, for use in RuleChecker functions
 
+AdjacentCell = namedtuple("AdjacentCell", ["row", "col", "index", "in_bounds", "opposite"])
+ZobristTable = namedtuple("ZobristTable", ["heights", "workers", "side"])
+
+
+class BoardSnapshot(tuple):
+    """
+    An immutable, hashable copy of a board (as defined in the documentation of `Board`): a `tuple` of rows, each a
+    `tuple` of cells, where a cell containing a worker is a `tuple` of (height, worker) rather than a `list`.
+
+    A snapshot serializes to the same JSON as the board it was taken from, and is accepted wherever a board is (by
+    `Board.set_board` and the `RuleChecker` board checks), so it can be handed out without copying.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def from_board(board_obj):
+        """
+        :param list board_obj: a board (as defined in the documentation of `Board`), or a snapshot of one.
+        :return: a snapshot of the given board.
+        :rtype: BoardSnapshot
+        """
+        if isinstance(board_obj, BoardSnapshot):
+            return board_obj
+        return BoardSnapshot(tuple(tuple(cell) if isinstance(cell, (list, tuple)) else cell for cell in row)
+                             for row in board_obj)
+
+    def to_list(self):
+        """
+        :return: a mutable board (as defined in the documentation of `Board`) equal to this snapshot.
+        :rtype: list
+        """
+        return [[list(cell) if isinstance(cell, tuple) else cell for cell in row] for row in self]
+
 
 class Board:
     """
@@ -52,9 +89,51 @@ class Board:
          - "SE": position + (1, 1)
          - "SW": position + (1, -1)
 
+    cell index
+        `int`. The cell at position (row, col) has cell index `row * num_cols + col`.
+
+    adjacency table
+        `list`, indexed by cell index, of `tuple`s indexed by the index of a direction in `RuleChecker.DIRECTIONS`, of
+        `AdjacentCell`s. An `AdjacentCell` holds the position (`row`, `col`) and cell `index` of the adjacent cell,
+        whether that position is `in_bounds`, and the index of the `opposite` direction. One adjacency table is built
+        per board size and shared by every board of that size.
+
+    side to move
+        `int` index into `RuleChecker.COLORS` of the color whose turn it is. Every `move` passes the turn to the other
+        color, so undoing a play by moving back returns the turn.
+
+    hash
+        `int`. A 64-bit Zobrist key of the board: the XOR of one random key per (cell index, height) for every cell
+        above height 0, one per (cell index, worker) for every worker on the board and one for side to move if it is
+        `RuleChecker.COLORS[1]`. It is updated incrementally by `place_worker`, `move`, `build` and `undo_build`.
+
+    neighbor sums
+        `int`. Three sums over the cells adjacent to a cell, packed into `NEIGHBOR_SUM_BITS` bits: the sum of their
+        heights (bits 0-7), the sum of the heights of those with a building that isn't domed, i.e. of height 1 to 3
+        (from bit `BUILDING_SUM_SHIFT`), and the number of those (from bit `BUILDING_COUNT_SHIFT`). `self.neighbor_sums`
+        packs the neighbor sums of every cell, those of the cell with cell index i from bit i * `NEIGHBOR_SUM_BITS`, so
+        that a build updates them all with one addition (see `get_neighbor_sum_deltas`). They let the strategies'
+        heuristics score a worker without looking at the cells around it. See `get_neighbor_sums`.
+
     """
 
     DEFAULT_DIMENSIONS = (5, 5)
+    DIRECTION_OFFSETS = ((-1, 0), (-1, 1), (0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1))  # in DIRECTIONS order
+    OPPOSITE_DIRECTION_INDICES = (4, 5, 6, 7, 0, 1, 2, 3)  # in DIRECTIONS order
+    _ADJACENCY_TABLES = {}  # key-value pair of (num_rows, num_cols) : adjacency table
+    _ZOBRIST_TABLES = {}  # key-value pair of (num_rows, num_cols) : zobrist table
+    _NEIGHBOR_SUM_DELTAS = {}  # key-value pair of (num_rows, num_cols) : neighbor sum deltas
+    _ZOBRIST_SEED = 20181120
+    # Methods with an unchecked fast path named `_<method>_unchecked`, which `ProductionMode` wires in at startup.
+    FAST_PATH_METHODS = ("get_worker_position", "get_adjacent_cell", "make_play", "make_play_code", "get_neighbor_sums")
+    NEIGHBOR_SUM_BITS = 24
+    NEIGHBOR_SUMS_MASK = (1 << NEIGHBOR_SUM_BITS) - 1
+    SUM_MASK = 0xff
+    BUILDING_SUM_SHIFT = 8
+    BUILDING_COUNT_SHIFT = 16
+    # what building on a cell of height 0, 1, 2 or 3 adds to the neighbor sums of each cell adjacent to it
+    BUILD_DELTAS = (1 + (1 << BUILDING_SUM_SHIFT) + (1 << BUILDING_COUNT_SHIFT), 1 + (1 << BUILDING_SUM_SHIFT),
+                    1 + (1 << BUILDING_SUM_SHIFT), 1 - (3 << BUILDING_SUM_SHIFT) - (1 << BUILDING_COUNT_SHIFT))
 
     def __init__(self):
         """
@@ -63,6 +142,14 @@ class Board:
         """
         self.board = self._create_empty_board()
         self.worker_positions = {}  # key-value pair of worker : position
+        self.adjacency = Board.get_adjacency_table(*Board.DEFAULT_DIMENSIONS)
+        self.zobrist = Board.get_zobrist_table(*Board.DEFAULT_DIMENSIONS)
+        self.neighbor_sum_deltas = Board.get_neighbor_sum_deltas(*Board.DEFAULT_DIMENSIONS)
+        self.neighbor_sums = 0
+        self.side_to_move = 0
+        self.zobrist_key = 0
+        self.undo_stack = []  # one entry per play made with make_play(), see make_play()
+        self._snapshot = None  # cached BoardSnapshot of the current state, see get_snapshot()
 
     def get_dimensions(self):
         """
@@ -78,19 +165,346 @@ class Board:
 
     def set_board(self, board_obj):
         """
-        Assigns the passed in board to the `board` member variable.
+        Assigns the passed in board to the `board` member variable. A `BoardSnapshot` is copied into a mutable board
+        first, since snapshots are immutable.
 
-        :param list board_obj: a board (as defined above).
+        :param list board_obj: a board (as defined above), or a `BoardSnapshot` of one.
         :return: No value returned.
         :rtype: void.
         """
         # TODO: use is_valid_board or leave it to board owner
+        if isinstance(board_obj, tuple):
+            board_obj = BoardSnapshot.from_board(board_obj).to_list()
         self.board = board_obj
+        self._snapshot = None
+        self.adjacency = Board.get_adjacency_table(len(board_obj), len(board_obj[0]))
+        self.zobrist = Board.get_zobrist_table(len(board_obj), len(board_obj[0]))
+        self.side_to_move = 0
+        self.zobrist_key = 0
+        self.undo_stack = []
+        heights = []
         for r, row in enumerate(self.board):
             for c, cell in enumerate(row):
+                index = r * len(row) + c
                 if isinstance(cell, list):
-                    worker = cell[1]
-                    self.worker_positions[worker] = (r, c, cell[0])
+                    height, worker = cell
+                    self.worker_positions[worker] = (r, c, height)
+                    if RuleChecker.is_valid_worker(worker):
+                        self.zobrist_key ^= self.zobrist.workers[index][RuleChecker.WORKER_INDICES[worker]]
+                else:
+                    height = cell
+                heights.append(height)
+                if isinstance(height, int) and 0 <= height <= RuleChecker.MAX_HEIGHT:  # boards aren't validated here
+                    self.zobrist_key ^= self.zobrist.heights[index][height]
+        self._init_neighbor_sums(heights)
+
+    def set_side_to_move(self, color):
+        """
+        Sets the side to move (as defined above) to the given color, updating the hash.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :rtype: void
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color provided: {}".format(color))
+        if RuleChecker.COLORS.index(color) != self.side_to_move:
+            self.side_to_move ^= 1
+            self.zobrist_key ^= self.zobrist.side
+
+    def hash(self):
+        """
+        :return: the hash (as defined above) of the board, including the side to move.
+        :rtype: int
+        """
+        return self.zobrist_key
+
+    def make_play(self, play):
+        """
+        Applies a play (a move followed by an optional build) and records what it changed on the undo stack, so that
+        `unmake()` can restore the board without re-deriving the previous state.
+
+        CONTRACT:
+         - `play` must be a legal play on this board (see `RuleChecker.is_legal_play`).
+
+        :param list play: `[worker, [move_dir, build_dir]]` or `[worker, [move_dir]]`. See `worker` and `direction`.
+        :rtype: void
+        """
+        worker, directions = play
+        if not all(RuleChecker.is_valid_direction(direction) for direction in directions):
+            raise ContractViolation("Invalid (or no) directions provided: {}".format(directions))
+        self.get_worker_position(worker)
+        self._make_play_unchecked(play)
+
+    def _make_play_unchecked(self, play):
+        """
+        Fast path of `make_play()` without contract checks. See `FAST_PATH_METHODS`.
+        """
+        worker, directions = play
+        build_dir_index = RuleChecker.DIRECTION_INDICES[directions[1]] if len(directions) == 2 else None
+        self._apply_play(worker, RuleChecker.DIRECTION_INDICES[directions[0]], build_dir_index)
+
+    def make_play_code(self, code):
+        """
+        Applies a play given as a play code (as defined in the documentation of `PlayCode`). See `make_play()`.
+
+        CONTRACT:
+         - `code` must be a legal play on this board, e.g. one returned by `generate_play_codes()`.
+
+        :param int code: a play code.
+        :rtype: void
+        """
+        if not isinstance(code, int) or not 0 <= code < 2 * PlayCode.WIN_FLAG:
+            raise ContractViolation("Invalid play code provided: {}".format(code))
+        self.get_worker_position(PlayCode.get_worker(code))
+        self._make_play_code_unchecked(code)
+
+    def _make_play_code_unchecked(self, code):
+        """
+        Fast path of `make_play_code()` without contract checks. See `FAST_PATH_METHODS`.
+        """
+        build_dir_index = None if code & PlayCode.WIN_FLAG else code & PlayCode.DIRECTION_MASK
+        self._apply_play(RuleChecker.WORKERS[code >> PlayCode.WORKER_SHIFT & PlayCode.WORKER_MASK],
+                         code >> PlayCode.MOVE_SHIFT & PlayCode.DIRECTION_MASK, build_dir_index)
+
+    def _apply_play(self, worker, move_dir_index, build_dir_index):
+        """
+        Moves the worker and builds, pushing what changed onto the undo stack. See `make_play()`.
+
+        :param string worker: a worker (as defined above).
+        :param int move_dir_index: the index in `RuleChecker.DIRECTIONS` of the direction to move.
+        :param int build_dir_index: the index in `RuleChecker.DIRECTIONS` of the direction to build, or `None`.
+        :rtype: void
+        """
+        worker_row, worker_col, worker_height = self.worker_positions[worker]
+        self._snapshot = None
+        num_cols = len(self.board[0])
+        from_index = worker_row * num_cols + worker_col
+        to_cell = self.adjacency[from_index][move_dir_index]
+        to_height = self.board[to_cell.row][to_cell.col]
+        worker_keys = self.zobrist.workers
+        worker_index = RuleChecker.WORKER_INDICES[worker]
+
+        key = self.zobrist_key
+        self.board[worker_row][worker_col] = worker_height
+        self.board[to_cell.row][to_cell.col] = [to_height, worker]
+        self.worker_positions[worker] = (to_cell.row, to_cell.col, to_height)
+        self.zobrist_key ^= worker_keys[from_index][worker_index] ^ worker_keys[to_cell.index][worker_index]
+        self.zobrist_key ^= self.zobrist.side
+        self.side_to_move ^= 1
+
+        build_cell, build_height = None, None
+        if build_dir_index is not None:
+            build_cell = self.adjacency[to_cell.index][build_dir_index]
+            build_height = self.board[build_cell.row][build_cell.col]
+            height_keys = self.zobrist.heights[build_cell.index]
+            self.board[build_cell.row][build_cell.col] = build_height + 1
+            self.zobrist_key ^= height_keys[build_height] ^ height_keys[build_height + 1]
+            self.neighbor_sums += self.neighbor_sum_deltas[build_cell.index][build_height]
+        self.undo_stack.append((worker, worker_row, worker_col, worker_height, to_cell, to_height, build_cell,
+                                build_height, key))
+
+    def generate_play_codes(self, color):
+        """
+        Returns the play codes (as defined in the documentation of `PlayCode`) of every legal play for the workers of
+        the given color, in the same order as `BaseStrategy.get_legal_plays` lists them. Moves and builds are checked
+        against the cells in the adjacency table (as defined above), without moving the worker on the board.
+
+        CONTRACT:
+         - both workers of the given color must be on the board.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: a `list` of play codes.
+        :rtype: list
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        codes = []
+        board = self.board
+        num_cols = len(board[0])
+        for worker in (color + "1", color + "2"):
+            worker_row, worker_col, worker_height = self.get_worker_position(worker)
+            from_index = worker_row * num_cols + worker_col
+            worker_code = RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+            for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+                if not to_cell.in_bounds:
+                    continue
+                to_height = board[to_cell.row][to_cell.col]
+                if isinstance(to_height, list) or to_height == 4 or to_height - worker_height > 1:
+                    continue
+                move_code = worker_code | move_dir_index << PlayCode.MOVE_SHIFT
+                if to_height == 3:
+                    codes.append(move_code | PlayCode.WIN_FLAG)
+                    continue
+                for build_dir_index, build_cell in enumerate(self.adjacency[to_cell.index]):
+                    if not build_cell.in_bounds:
+                        continue
+                    # the cell the worker moved out of is always free to build on
+                    build_height = board[build_cell.row][build_cell.col]
+                    if build_cell.index == from_index or not (isinstance(build_height, list) or build_height == 4):
+                        codes.append(move_code | build_dir_index)
+        return codes
+
+    def iter_play_codes(self, color):
+        """
+        Lazily yields the play codes of every legal play for the workers of the given color, winning plays first, so
+        that callers looking for a win, or for any play at all, can stop after the first few codes.
+
+        The board may be changed between codes, as long as it is restored (e.g. with `unmake()`) before the next one.
+
+        CONTRACT:
+         - both workers of the given color must be on the board.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: an iterator over play codes (as defined in the documentation of `PlayCode`).
+        :rtype: iterator
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        for worker in (color + "1", color + "2"):
+            self.get_worker_position(worker)
+        return self._iter_play_codes(color)
+
+    def _iter_play_codes(self, color):
+        """
+        Generator behind `iter_play_codes()`, split out so that its contract is checked when it is called rather than
+        on the first `next()`.
+        """
+        workers = (color + "1", color + "2")
+        for worker in workers:
+            for code in self._iter_worker_play_codes(worker, True):
+                yield code
+        for worker in workers:
+            for code in self._iter_worker_play_codes(worker, False):
+                yield code
+
+    def _iter_worker_play_codes(self, worker, winning):
+        """
+        :param string worker: a worker (as defined above).
+        :param bool winning: `True` to yield only the worker's winning plays, `False` to yield only the others.
+        :return: an iterator over the play codes of the worker's legal plays.
+        :rtype: iterator
+        """
+        board = self.board
+        num_cols = len(board[0])
+        worker_row, worker_col, worker_height = self.worker_positions[worker]
+        if winning and worker_height < 2:
+            return
+        from_index = worker_row * num_cols + worker_col
+        worker_code = RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+        for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+            if not to_cell.in_bounds:
+                continue
+            to_height = board[to_cell.row][to_cell.col]
+            if isinstance(to_height, list) or to_height == 4 or to_height - worker_height > 1:
+                continue
+            move_code = worker_code | move_dir_index << PlayCode.MOVE_SHIFT
+            if to_height == 3:
+                if winning:
+                    yield move_code | PlayCode.WIN_FLAG
+                continue
+            if winning:
+                continue
+            for build_dir_index, build_cell in enumerate(self.adjacency[to_cell.index]):
+                if not build_cell.in_bounds:
+                    continue
+                build_height = board[build_cell.row][build_cell.col]
+                if build_cell.index == from_index or not (isinstance(build_height, list) or build_height == 4):
+                    yield move_code | build_dir_index
+
+    def has_winning_move(self, color):
+        """
+        Checks if a worker of the given color can win by moving, i.e. if it stands at height 2 or more next to an
+        unoccupied cell of height 3. Only those climbs are looked at, no plays are generated.
+
+        CONTRACT:
+         - both workers of the given color must be on the board.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: `True` if the color has a winning move, else `False`.
+        :rtype: bool
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        board = self.board
+        num_cols = len(board[0])
+        for worker in (color + "1", color + "2"):
+            worker_row, worker_col, worker_height = self.get_worker_position(worker)
+            if worker_height < 2:
+                continue
+            for adj_cell in self.adjacency[worker_row * num_cols + worker_col]:
+                if adj_cell.in_bounds and board[adj_cell.row][adj_cell.col] == 3:  # occupied cells are lists
+                    return True
+        return False
+
+    def random_play_code(self, color):
+        """
+        Picks a random legal play that doesn't win for the workers of the given color, without generating the others:
+        a random worker with a move is picked, then a random cell it can move to, then a random cell to build on from
+        there. Plays are not all equally likely, but every play that doesn't win can be picked. Meant for random
+        playouts, which should look for a win with `has_winning_move()` first.
+
+        CONTRACT:
+         - both workers of the given color must be on the board.
+
+        :param string color: a color (as defined in the documentation of `RuleChecker`).
+        :return: the play code (as defined in the documentation of `PlayCode`) of the play, or `None` if neither worker
+        can make a play that doesn't win.
+        :rtype: int, None
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        board = self.board
+        num_cols = len(board[0])
+        workers = [color + "1", color + "2"]
+        random.shuffle(workers)
+        for worker in workers:
+            worker_row, worker_col, worker_height = self.get_worker_position(worker)
+            from_index = worker_row * num_cols + worker_col
+            moves = []
+            for move_dir_index, to_cell in enumerate(self.adjacency[from_index]):
+                if not to_cell.in_bounds:
+                    continue
+                to_height = board[to_cell.row][to_cell.col]
+                if not isinstance(to_height, list) and to_height < 3 and to_height - worker_height <= 1:
+                    moves.append(move_dir_index)
+            if not moves:
+                continue
+            move_dir_index = random.choice(moves)
+            to_cell = self.adjacency[from_index][move_dir_index]
+            # the worker can always build on the cell it moved out of, so every move has a build
+            builds = []
+            for build_dir_index, build_cell in enumerate(self.adjacency[to_cell.index]):
+                if not build_cell.in_bounds:
+                    continue
+                build_height = board[build_cell.row][build_cell.col]
+                if build_cell.index == from_index or not (isinstance(build_height, list) or build_height == 4):
+                    builds.append(build_dir_index)
+            return (RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+                    | move_dir_index << PlayCode.MOVE_SHIFT | random.choice(builds))
+        return None
+
+    def unmake(self):
+        """
+        Undoes the last play applied with `make_play()`, restoring the saved cells, worker position and hash.
+
+        CONTRACT:
+         - `make_play()` must have been called more times than `unmake()` since the board was last set.
+
+        :rtype: void
+        """
+        if not self.undo_stack:
+            raise ContractViolation("No play to unmake!")
+        (worker, worker_row, worker_col, worker_height, to_cell, to_height, build_cell, build_height,
+         key) = self.undo_stack.pop()
+        self._snapshot = None
+        if build_cell is not None:
+            self.board[build_cell.row][build_cell.col] = build_height
+            self.neighbor_sums -= self.neighbor_sum_deltas[build_cell.index][build_height]
+        self.board[to_cell.row][to_cell.col] = to_height
+        self.board[worker_row][worker_col] = [worker_height, worker]
+        self.worker_positions[worker] = (worker_row, worker_col, worker_height)
+        self.zobrist_key = key
+        self.side_to_move ^= 1
 
     def neighboring_cell_exists(self, worker, direction):
         """
@@ -103,11 +517,7 @@ class Board:
         :return: `True` if cell adjacent in the specified direction exists, else `False`.
         :rtype: bool
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
-        worker_row, worker_col, worker_height = self.get_worker_position(worker)
-        adj_cell_row, adj_cell_col = Board._get_adj_cell(worker_row, worker_col, direction)
-        return 0 <= adj_cell_row < len(self.board) and 0 <= adj_cell_col < len(self.board[0])
+        return self.get_adjacent_cell(worker, direction).in_bounds
 
     def get_height(self, worker, direction):
         """
@@ -118,12 +528,9 @@ class Board:
         :return: the height of the cell adjacent to the worker's position in the specified direction.
         :rtype: int
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
-        if self.neighboring_cell_exists(worker, direction):
-            worker_row, worker_col, worker_height = self.get_worker_position(worker)
-            adj_cell_row, adj_cell_col = Board._get_adj_cell(worker_row, worker_col, direction)
-            cell = self.board[adj_cell_row][adj_cell_col]
+        adj_cell = self.get_adjacent_cell(worker, direction)
+        if adj_cell.in_bounds:
+            cell = self.board[adj_cell.row][adj_cell.col]
             if isinstance(cell, list):
                 return cell[0]
             else:
@@ -141,12 +548,9 @@ class Board:
         `False`, if cell is unoccupied. Behaviour unspecified if cell adjacent cell doesn't exist.
         :rtype: bool, void
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
-        if self.neighboring_cell_exists(worker, direction):
-            worker_row, worker_col, cell_height = self.get_worker_position(worker)
-            adj_cell_row, adj_cell_col = self._get_adj_cell(worker_row, worker_col, direction)
-            return self.has_worker(adj_cell_row, adj_cell_col)
+        adj_cell = self.get_adjacent_cell(worker, direction)
+        if adj_cell.in_bounds:
+            return self.has_worker(adj_cell.row, adj_cell.col)
 
     def build(self, worker, direction):
         """
@@ -161,11 +565,13 @@ class Board:
         :return: a board (as specified above) edited to reflect the build. Nothing if move is invalid.
         :rtype: list, void
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
-        worker_row, worker_col, worker_height = self.get_worker_position(worker)
-        adj_cell_row, adj_cell_col = self._get_adj_cell(worker_row, worker_col, direction)
-        self.board[adj_cell_row][adj_cell_col] += 1
+        adj_cell = self.get_adjacent_cell(worker, direction)
+        height_keys = self.zobrist.heights[adj_cell.index]
+        height = self.board[adj_cell.row][adj_cell.col]
+        self.zobrist_key ^= height_keys[height] ^ height_keys[height + 1]
+        self._snapshot = None
+        self.board[adj_cell.row][adj_cell.col] += 1
+        self.neighbor_sums += self.neighbor_sum_deltas[adj_cell.index][height]
         return self.board
 
     def undo_build(self, worker, direction):
@@ -183,11 +589,13 @@ class Board:
         :return: a board (as specified above) edited to reflect the undoing of the build. Nothing if move is invalid.
         :rtype: list, void
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
-        worker_row, worker_col, worker_height = self.get_worker_position(worker)
-        adj_cell_row, adj_cell_col = self._get_adj_cell(worker_row, worker_col, direction)
-        self.board[adj_cell_row][adj_cell_col] -= 1
+        adj_cell = self.get_adjacent_cell(worker, direction)
+        height_keys = self.zobrist.heights[adj_cell.index]
+        height = self.board[adj_cell.row][adj_cell.col]
+        self.zobrist_key ^= height_keys[height] ^ height_keys[height - 1]
+        self._snapshot = None
+        self.board[adj_cell.row][adj_cell.col] -= 1
+        self.neighbor_sums -= self.neighbor_sum_deltas[adj_cell.index][height - 1]
         return self.board
 
     def move(self, worker, direction):
@@ -208,16 +616,41 @@ class Board:
         :return: a board (as specified above) edited to reflect the build. Nothing if move is invalid.
         :rtype: list, void
         """
-        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
-            raise ContractViolation("Invalid (or no) worker / direction provided.")
         worker_row, worker_col, worker_height = self.get_worker_position(worker)
-        adj_cell_row, adj_cell_col = self._get_adj_cell(worker_row, worker_col, direction)
+        adj_cell = self.get_adjacent_cell(worker, direction)
+        adj_cell_row, adj_cell_col = adj_cell.row, adj_cell.col
         adj_cell_height = self.board[adj_cell_row][adj_cell_col]
         self.board[adj_cell_row][adj_cell_col] = [adj_cell_height, worker]
         self.board[worker_row][worker_col] = worker_height
         self.worker_positions[worker] = (adj_cell_row, adj_cell_col, adj_cell_height)
+        worker_index = RuleChecker.WORKER_INDICES[worker]
+        self.zobrist_key ^= (self.zobrist.workers[worker_row * len(self.board[0]) + worker_col][worker_index]
+                             ^ self.zobrist.workers[adj_cell.index][worker_index] ^ self.zobrist.side)
+        self.side_to_move ^= 1
+        self._snapshot = None
         return self.board
 
+    def get_adjacent_cell(self, worker, direction):
+        """
+        Looks up the cell adjacent to the worker's position in the specified direction in the adjacency table.
+
+        :param string worker: a worker (as defined above).
+        :param string direction: a direction (as defined above).
+        :return: the `AdjacentCell` (as defined above) adjacent to the worker in the specified direction.
+        :rtype: AdjacentCell
+        """
+        if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
+            raise ContractViolation("Invalid (or no) worker / direction provided.")
+        self.get_worker_position(worker)
+        return self._get_adjacent_cell_unchecked(worker, direction)
+
+    def _get_adjacent_cell_unchecked(self, worker, direction):
+        """
+        Fast path of `get_adjacent_cell()` without contract checks. See `FAST_PATH_METHODS`.
+        """
+        worker_row, worker_col, worker_height = self.worker_positions[worker]
+        return self.adjacency[worker_row * len(self.board[0]) + worker_col][RuleChecker.DIRECTION_INDICES[direction]]
+
     def worker_exists(self, worker):
         if worker in self.worker_positions:
             return True
@@ -241,6 +674,50 @@ class Board:
         else:
             raise ContractViolation("Worker does not exist in worker_dictionary!")
 
+    def _get_worker_position_unchecked(self, worker):
+        """
+        Fast path of `get_worker_position()` without contract checks. See `FAST_PATH_METHODS`.
+        """
+        return self.worker_positions[worker]
+
+    def get_neighbor_sums(self, worker):
+        """
+        Returns what the strategies' heuristics need to know about the cells around a worker, without looking at them.
+
+        :param string worker: a worker (as defined above).
+        :return: `tuple` of (the worker's height, the neighbor sums (as defined above) of the worker's cell, the number
+        of workers on the cells adjacent to it).
+        :rtype: tuple of ints
+        """
+        self.get_worker_position(worker)
+        return self._get_neighbor_sums_unchecked(worker)
+
+    def _get_neighbor_sums_unchecked(self, worker):
+        """
+        Fast path of `get_neighbor_sums()` without contract checks. See `FAST_PATH_METHODS`.
+        """
+        worker_row, worker_col, worker_height = self.worker_positions[worker]
+        index = worker_row * len(self.board[0]) + worker_col
+        board = self.board
+        num_workers = sum(1 for adj_cell in self.adjacency[index]
+                          if adj_cell.in_bounds and isinstance(board[adj_cell.row][adj_cell.col], list))
+        return (worker_height, self.neighbor_sums >> index * Board.NEIGHBOR_SUM_BITS & Board.NEIGHBOR_SUMS_MASK,
+                num_workers)
+
+    def _init_neighbor_sums(self, heights):
+        """
+        Computes the neighbor sums (as defined above) of every cell from scratch.
+
+        :param list heights: the height of every cell, indexed by cell index.
+        :rtype: void
+        """
+        self.neighbor_sum_deltas = Board.get_neighbor_sum_deltas(*self.get_dimensions())
+        self.neighbor_sums = 0
+        for index, height in enumerate(heights):
+            if isinstance(height, int) and 0 <= height <= RuleChecker.MAX_HEIGHT:  # boards aren't validated here
+                # as if the cell was built up from height 0
+                self.neighbor_sums += sum(self.neighbor_sum_deltas[index][:height])
+
     def get_cell_height(self, row, col):
         """
 
@@ -292,6 +769,8 @@ class Board:
         height = self.board[row][col]
         self.board[row][col] = [height, worker]
         self.worker_positions[worker] = (row, col, height)
+        self.zobrist_key ^= self.zobrist.workers[row * len(self.board[0]) + col][RuleChecker.WORKER_INDICES[worker]]
+        self._snapshot = None
 
     @staticmethod
     def _create_empty_board(num_rows=DEFAULT_DIMENSIONS[0], num_cols=DEFAULT_DIMENSIONS[1]):
@@ -311,6 +790,75 @@ class Board:
             board.append(row)
         return board
 
+    @staticmethod
+    def get_adjacency_table(num_rows, num_cols):
+        """
+        Returns the adjacency table (as defined above) for boards of the given dimensions, building it on first use.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: the adjacency table (as defined above).
+        :rtype: list
+        """
+        key = (num_rows, num_cols)
+        if key not in Board._ADJACENCY_TABLES:
+            table = []
+            for row in range(num_rows):
+                for col in range(num_cols):
+                    cell_adjacency = []
+                    for dir_index, (d_row, d_col) in enumerate(Board.DIRECTION_OFFSETS):
+                        adj_row, adj_col = row + d_row, col + d_col
+                        in_bounds = 0 <= adj_row < num_rows and 0 <= adj_col < num_cols
+                        adj_index = adj_row * num_cols + adj_col if in_bounds else -1
+                        cell_adjacency.append(AdjacentCell(adj_row, adj_col, adj_index, in_bounds,
+                                                           Board.OPPOSITE_DIRECTION_INDICES[dir_index]))
+                    table.append(tuple(cell_adjacency))
+            Board._ADJACENCY_TABLES[key] = table
+        return Board._ADJACENCY_TABLES[key]
+
+    @staticmethod
+    def get_neighbor_sum_deltas(num_rows, num_cols):
+        """
+        Returns what building on each cell of a board of the given dimensions adds to `self.neighbor_sums` (see
+        `neighbor sums` above), building them on first use.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: `list`, indexed by cell index, of `tuple`s indexed by the height of the cell before the build.
+        :rtype: list
+        """
+        key = (num_rows, num_cols)
+        if key not in Board._NEIGHBOR_SUM_DELTAS:
+            deltas = []
+            for cell_adjacency in Board.get_adjacency_table(num_rows, num_cols):
+                # one 1 in the neighbor sums of each adjacent cell
+                spread = sum(1 << adj_cell.index * Board.NEIGHBOR_SUM_BITS
+                             for adj_cell in cell_adjacency if adj_cell.in_bounds)
+                deltas.append(tuple(delta * spread for delta in Board.BUILD_DELTAS))
+            Board._NEIGHBOR_SUM_DELTAS[key] = deltas
+        return Board._NEIGHBOR_SUM_DELTAS[key]
+
+    @staticmethod
+    def get_zobrist_table(num_rows, num_cols):
+        """
+        Returns the random keys used to compute the hash (as defined above) of boards of the given dimensions, building
+        them on first use. The keys are seeded, so every process agrees on the hash of a board.
+
+        :param int num_rows: the number of rows of the board.
+        :param int num_cols: the number of columns of the board.
+        :return: a `ZobristTable` of `heights` and `workers` keys indexed by [cell index][height] and
+        [cell index][index in `RuleChecker.WORKERS`] respectively, and the `side` key.
+        :rtype: ZobristTable
+        """
+        key = (num_rows, num_cols)
+        if key not in Board._ZOBRIST_TABLES:
+            rand = random.Random(Board._ZOBRIST_SEED + num_rows * 1000 + num_cols)
+            heights = [(0,) + tuple(rand.getrandbits(64) for _ in range(RuleChecker.MAX_HEIGHT))
+                       for _ in range(num_rows * num_cols)]
+            workers = [tuple(rand.getrandbits(64) for _ in RuleChecker.WORKERS) for _ in range(num_rows * num_cols)]
+            Board._ZOBRIST_TABLES[key] = ZobristTable(heights, workers, rand.getrandbits(64))
+        return Board._ZOBRIST_TABLES[key]
+
     @staticmethod
     def _get_adj_cell(worker_row, worker_col, direction_string):
         """
@@ -322,15 +870,8 @@ class Board:
         """
         if not RuleChecker.is_valid_direction(direction_string):
             raise ValueError("Invalid Direction string provided: {}".format(direction_string))
-        if "N" in direction_string:
-            worker_row -= 1
-        elif "S" in direction_string:
-            worker_row += 1
-        if "E" in direction_string:
-            worker_col += 1
-        elif "W" in direction_string:
-            worker_col -= 1
-        return worker_row, worker_col
+        d_row, d_col = Board.DIRECTION_OFFSETS[RuleChecker.DIRECTION_INDICES[direction_string]]
+        return worker_row + d_row, worker_col + d_col
 
     @staticmethod
     def get_opposite_direction(direction_string):
@@ -342,16 +883,8 @@ class Board:
         """
         if not RuleChecker.is_valid_direction(direction_string):
             raise ValueError("Invalid Direction string provided: {}".format(direction_string))
-        opp_dir = ""
-        if "N" in direction_string:
-            opp_dir += "S"
-        elif "S" in direction_string:
-            opp_dir += "N"
-        if "E" in direction_string:
-            opp_dir += "W"
-        elif "W" in direction_string:
-            opp_dir += "E"
-        return opp_dir
+        dir_index = RuleChecker.DIRECTION_INDICES[direction_string]
+        return RuleChecker.DIRECTIONS[Board.OPPOSITE_DIRECTION_INDICES[dir_index]]
 
     def extract_json_board(self):
         """
@@ -371,6 +904,62 @@ class Board:
         """
         return deepcopy(self.board)
 
+    def get_snapshot(self):
+        """
+        Returns an immutable snapshot of the current board state. The snapshot is cached until the board next changes,
+        so repeated calls between plays don't copy the board.
+
+        :return: a snapshot of the board (as defined above).
+        :rtype: BoardSnapshot
+        """
+        if self._snapshot is None:
+            self._snapshot = BoardSnapshot.from_board(self.board)
+        return self._snapshot
+
+    def encode(self):
+        """
+        Returns a compact encoding of the current board state, for shipping boards between processes: the number of
+        rows and columns, then one byte per cell holding its height in bits 0-2 and, in bits 3-5, the index in
+        `RuleChecker.WORKERS` plus 1 of the worker on it, or 0.
+
+        CONTRACT:
+         - every worker on the board must be a worker (as defined above).
+
+        :return: the encoding of the board.
+        :rtype: bytes
+        """
+        snapshot = self.get_snapshot()
+        data = bytearray((len(snapshot), len(snapshot[0])))
+        for row in snapshot:
+            for cell in row:
+                if isinstance(cell, tuple):
+                    height, worker = cell
+                    if not RuleChecker.is_valid_worker(worker):
+                        raise ContractViolation("Cannot encode invalid worker: {}".format(worker))
+                    data.append(height | (RuleChecker.WORKER_INDICES[worker] + 1) << 3)
+                else:
+                    data.append(cell)
+        return bytes(data)
+
+    @staticmethod
+    def decode(data):
+        """
+        :param bytes data: an encoding of a board, as returned by `encode()`.
+        :return: the board (as defined above) the data encodes.
+        :rtype: list
+        """
+        num_rows, num_cols = data[0], data[1]
+        if len(data) != 2 + num_rows * num_cols:
+            raise ContractViolation("Invalid board encoding of length {}!".format(len(data)))
+        board = []
+        for r in range(num_rows):
+            row = []
+            for cell in data[2 + r * num_cols:2 + (r + 1) * num_cols]:
+                height, worker_index = cell & 7, cell >> 3
+                row.append([height, RuleChecker.WORKERS[worker_index - 1]] if worker_index else height)
+            board.append(row)
+        return board
+
     def __str__(self):
         result = ""
         for row in self.board:
@@ -16,3 +16,7 @@ class IllegalPlay(Exception):
 
 class IllegalResponse(Exception):
     pass
+
+
+class SearchTimeout(Exception):
+    pass
@@ -0,0 +1,200 @@
+import time
+from RuleChecker import RuleChecker
+from CustomExceptions import ContractViolation, SearchTimeout
+
+
+class EndgameSolver:
+    """
+    Proves who wins a board once few cells are left to build on, by searching every play to the end of the game.
+
+    Santorini can't be drawn: every play that doesn't win builds a level on a cell that isn't domed, so the game ends
+    within the number of levels left to build, with a win or with a player left without plays. Every board is
+    therefore either won or lost for the player to move, and the search only needs to prove which. Results are
+    memoized by the board's hash (which includes the side to move), and kept between plays, since the boards of a
+    later play are found again in the search of an earlier one.
+
+    The solver is only worth running once the game tree left is small, so `get_play()` only searches boards with at
+    most `max_open_cells` open cells, or on which the player to move has at most `max_plays` legal plays and there are
+    at most `max_plays_open_cells` open cells: with few plays but many open cells, the players soon have many plays
+    again, and the search rarely finishes. It gives up after `max_nodes` boards or `max_seconds` seconds, whichever
+    comes first, so that strategies searching without a deadline aren't held up by it.
+
+    Definitions:
+
+    open cell
+        A cell that isn't domed and has no worker on it, i.e. a cell that can still be built on.
+
+    result
+        `tuple` of (won, num_plies): `True` if the player to move wins the board and `False` if they lose it, and the
+        number of plies until the game ends with the first win the search proved for the winner. Losing boards with no
+        plays end in 0 plies.
+    """
+
+    DEFAULT_MAX_OPEN_CELLS = 6
+    DEFAULT_MAX_PLAYS = 4
+    DEFAULT_MAX_NODES = 100000
+    DEFAULT_MAX_ENTRIES = 1 << 20
+    DEFAULT_MAX_PLAYS_OPEN_CELLS = 12
+    DEFAULT_MAX_SECONDS = 1.0
+
+    def __init__(self, max_open_cells=DEFAULT_MAX_OPEN_CELLS, max_plays=DEFAULT_MAX_PLAYS,
+                 max_nodes=DEFAULT_MAX_NODES, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_plays_open_cells=DEFAULT_MAX_PLAYS_OPEN_CELLS, max_seconds=DEFAULT_MAX_SECONDS):
+        """
+        :param int max_open_cells: the most open cells (as defined above) a board may have to be solved.
+        :param int max_plays: the most legal plays the player to move may have for the board to be solved, if it has
+        at most `max_plays_open_cells` open cells.
+        :param int max_nodes: the most boards to search for each play before giving up.
+        :param int max_entries: the most results to memoize. The memo is emptied once it grows past this.
+        :param int max_plays_open_cells: the most open cells a board with at most `max_plays` plays may have to be
+        solved.
+        :param float max_seconds: the most seconds to search for each play before giving up.
+        """
+        for name, value in (("max_open_cells", max_open_cells), ("max_plays", max_plays),
+                            ("max_plays_open_cells", max_plays_open_cells)):
+            if not isinstance(value, int) or value < 0:
+                raise ContractViolation("{} must be a non-negative integer! Given: {}".format(name, value))
+        for name, value in (("max_nodes", max_nodes), ("max_entries", max_entries)):
+            if not isinstance(value, int) or value < 1:
+                raise ContractViolation("{} must be a positive integer! Given: {}".format(name, value))
+        if isinstance(max_seconds, bool) or not isinstance(max_seconds, (int, float)) or max_seconds <= 0:
+            raise ContractViolation("max_seconds must be a positive number! Given: {}".format(max_seconds))
+        self.max_open_cells = max_open_cells
+        self.max_plays = max_plays
+        self.max_nodes = max_nodes
+        self.max_entries = max_entries
+        self.max_plays_open_cells = max_plays_open_cells
+        self.max_seconds = max_seconds
+        self.memo = {}  # key-value pair of board hash : result (as defined above)
+        self.nodes = 0
+        self.deadline = None
+        self.clock = None
+        self.stats = {"solved": 0, "gave_up": 0, "nodes": 0}
+
+    def is_endgame(self, board, codes):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param list codes: the play codes of the legal plays of the player to move.
+        :return: `True` if the board is small enough to solve (see above), else `False`.
+        :rtype: bool
+        """
+        num_open_cells = EndgameSolver.count_open_cells(board)
+        if len(codes) <= self.max_plays and num_open_cells <= self.max_plays_open_cells:
+            return True
+        return num_open_cells <= self.max_open_cells
+
+    def get_play(self, board, color, codes, clock=None):
+        """
+        Solves the board if it is an endgame (see `is_endgame()`), and returns a play that wins it, or, if every play
+        loses, the play that holds out the longest against the wins the search proved for the opponent.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined in the documentation of `RuleChecker`) to move.
+        :param list codes: the play codes (as defined in the documentation of `PlayCode`) of the legal plays of `color`,
+        none of them winning.
+        :param SearchClock clock: the clock of the strategy's search (see `Strategies.SearchClock`), ticked for each
+        board searched, which gives up once its deadline passes or its stop event is set, or `None` to give up after
+        `self.max_seconds` only.
+        :return: the play code of the play, whether it wins, and the number of plies until the game ends after it,
+        counting the play itself, or `None` if the board isn't an endgame or the search gave up.
+        :rtype: tuple
+        """
+        if not codes or not self.is_endgame(board, codes):
+            return None
+        if len(self.memo) > self.max_entries:
+            self.memo.clear()
+        board.set_side_to_move(color)  # the board's hash keys the memo
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        self.nodes = 0
+        self.deadline = time.monotonic() + self.max_seconds
+        self.clock = clock
+        num_plays = len(board.undo_stack)
+        best_code, best_plies = None, -1
+        try:
+            for code in codes:
+                board.make_play_code(code)
+                opp_won, num_plies = self._solve(board, opp_color, color)
+                board.unmake()
+                if not opp_won:
+                    self._finish(True)
+                    return code, True, num_plies + 1
+                if num_plies > best_plies:
+                    best_code, best_plies = code, num_plies
+        except SearchTimeout:
+            while len(board.undo_stack) > num_plays:
+                board.unmake()
+            self._finish(False)
+            return None
+        self._finish(True)
+        return best_code, False, best_plies + 1
+
+    def get_stats(self):
+        """
+        :return: how many boards were solved and given up on so far, and the boards searched by the last search.
+        :rtype: dict
+        """
+        return dict(self.stats)
+
+    @staticmethod
+    def count_open_cells(board):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :return: the number of open cells (as defined above) on the board.
+        :rtype: int
+        """
+        num_rows, num_cols = board.get_dimensions()
+        return sum(1 for row in range(num_rows) for col in range(num_cols)
+                   if board.get_cell_height(row, col) < RuleChecker.MAX_HEIGHT and not board.has_worker(row, col))
+
+    def _finish(self, solved):
+        self.stats["solved" if solved else "gave_up"] += 1
+        self.stats["nodes"] = self.nodes
+
+    def _solve(self, board, color, opp_color):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color to move.
+        :param str opp_color: the other color.
+        :return: the result (as defined above) of the board for `color`.
+        :rtype: tuple
+        """
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise SearchTimeout("Endgame search gave up after {} nodes.".format(self.max_nodes))
+        if not self.nodes % 256 and time.monotonic() >= self.deadline:
+            raise SearchTimeout("Endgame search gave up after {} seconds.".format(self.max_seconds))
+        if self.clock is not None:
+            self.clock.tick()
+        if board.has_winning_move(color):
+            return True, 1
+
+        key = board.hash()
+        memo = self.memo
+        result = memo.get(key)
+        if result is not None:
+            return result
+
+        codes = board.generate_play_codes(color)
+        # a play to a board already proven lost for the opponent wins without searching any other play
+        for code in codes:
+            board.make_play_code(code)
+            child = memo.get(board.hash())
+            board.unmake()
+            if child is not None and not child[0]:
+                result = (True, child[1] + 1)
+                memo[key] = result
+                return result
+
+        longest = 0
+        for code in codes:
+            board.make_play_code(code)
+            opp_won, num_plies = self._solve(board, opp_color, color)
+            board.unmake()
+            if not opp_won:
+                result = (True, num_plies + 1)
+                break
+            longest = max(longest, num_plies + 1)
+        else:
+            result = (False, longest)
+        memo[key] = result
+        return result
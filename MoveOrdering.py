@@ -0,0 +1,154 @@
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from TranspositionTable import TranspositionTable
+
+
+class MoveOrderer:
+    """
+    Orders the plays of a search node so that the plays most likely to cause a cutoff are searched first, and keeps
+    statistics on how well that worked.
+
+    Plays are searched in the following order:
+     - the best play stored in the transposition table for the node.
+     - winning plays.
+     - climbs, i.e. moves onto a higher cell, the highest first.
+     - the killer plays of the node's ply: the last `NUM_KILLERS` plays that caused a cutoff at that ply.
+     - the remaining plays, by history score: the sum of depth * depth over every cutoff the play has caused.
+
+    Definitions:
+
+    ply
+        `int`. The number of plays made since the root of the search.
+
+    cutoff
+        A play that scored at least beta, so the other plays of its node didn't have to be searched.
+    """
+
+    NUM_KILLERS = 2
+    SOURCES = ("tt", "win", "climb", "killer", "history")
+    _TT_KEY = 1 << 40
+    _WIN_KEY = 1 << 39
+    _CLIMB_SHIFT = 36  # climbs onto height h are keyed h << _CLIMB_SHIFT
+    _KILLER_KEYS = (1 << 35, 1 << 34)
+    _MAX_HISTORY = (1 << 34) - 1
+
+    def __init__(self):
+        self.killers = []  # indexed by ply, lists of at most NUM_KILLERS play codes
+        self.history = [0] * (2 * PlayCode.WIN_FLAG)  # indexed by play code
+        self.nodes = 0
+        self.cutoffs = 0
+        self.first_play_cutoffs = 0
+        self.cutoffs_by_source = dict.fromkeys(MoveOrderer.SOURCES, 0)
+
+    def new_search(self):
+        """
+        Forgets the killer plays and halves the history scores, so that the plays of the previous search still count,
+        but less than those of the new one. The statistics are kept.
+
+        :rtype: void
+        """
+        self.killers = []
+        self.history = [score >> 1 for score in self.history]
+
+    def order(self, board, codes, ply, tt_code=TranspositionTable.NO_MOVE):
+        """
+        :param Board board: the board of the node (refer to documentation of Board class).
+        :param list codes: the play codes (as defined in the documentation of `PlayCode`) of the node's legal plays.
+        :param int ply: the node's ply (as defined above).
+        :param int tt_code: the best play stored in the transposition table for the node, or `NO_MOVE`.
+        :return: a new `list` of the codes, in the order to search them.
+        :rtype: list
+        """
+        self.nodes += 1
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+        history = self.history
+        climbs = self._get_climbs(board, codes)
+
+        def get_key(code):
+            if code == tt_code:
+                return MoveOrderer._TT_KEY
+            if code & PlayCode.WIN_FLAG:
+                return MoveOrderer._WIN_KEY
+            key = climbs[code >> PlayCode.MOVE_SHIFT] << MoveOrderer._CLIMB_SHIFT
+            if code in killers:
+                key += MoveOrderer._KILLER_KEYS[killers.index(code)]
+            return key + history[code]
+
+        return sorted(codes, key=get_key, reverse=True)
+
+    def record_cutoff(self, board, code, ply, depth, play_number, tt_code=TranspositionTable.NO_MOVE):
+        """
+        Records a cutoff, making the play a killer play of its ply and adding to its history score.
+
+        :param Board board: the board of the node, with the play unmade (refer to documentation of Board class).
+        :param int code: the play code of the play that caused the cutoff.
+        :param int ply: the node's ply (as defined above).
+        :param int depth: the number of plies that were left to search at the node.
+        :param int play_number: the index of the play in the node's ordered plays.
+        :param int tt_code: the best play stored in the transposition table for the node, or `NO_MOVE`.
+        :rtype: void
+        """
+        self.cutoffs += 1
+        if play_number == 0:
+            self.first_play_cutoffs += 1
+        self.cutoffs_by_source[self._get_source(board, code, ply, tt_code)] += 1
+
+        if code & PlayCode.WIN_FLAG:  # wins are always searched early, so they don't need remembering
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if code not in killers:
+            killers.insert(0, code)
+            del killers[MoveOrderer.NUM_KILLERS:]
+        self.history[code] = min(self.history[code] + depth * depth, MoveOrderer._MAX_HISTORY)
+
+    def get_stats(self):
+        """
+        :return: the number of nodes ordered, the number of cutoffs, the fraction of cutoffs caused by the first play
+        searched, and the number of cutoffs caused by plays from each source (tt, win, climb, killer or history).
+        :rtype: dict
+        """
+        return {
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "first_play_cutoff_rate": self.first_play_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "cutoffs_by_source": dict(self.cutoffs_by_source)
+        }
+
+    def _get_source(self, board, code, ply, tt_code):
+        """
+        :return: the source (as in `SOURCES`) that put the play where it was in the order.
+        :rtype: string
+        """
+        if code == tt_code:
+            return "tt"
+        if code & PlayCode.WIN_FLAG:
+            return "win"
+        if self._get_climbs(board, [code])[code >> PlayCode.MOVE_SHIFT]:
+            return "climb"
+        if ply < len(self.killers) and code in self.killers[ply]:
+            return "killer"
+        return "history"
+
+    @staticmethod
+    def _get_climbs(board, codes):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param list codes: play codes of legal plays on the board.
+        :return: a `dict` of `code >> PlayCode.MOVE_SHIFT` (i.e. the worker and move of a play) : the height moved up
+        to if the move is a climb, else 0.
+        :rtype: dict
+        """
+        climbs = {}
+        for code in codes:
+            move_key = code >> PlayCode.MOVE_SHIFT
+            if move_key in climbs:
+                continue
+            worker = PlayCode.get_worker(code)
+            direction = RuleChecker.DIRECTIONS[move_key & PlayCode.DIRECTION_MASK]
+            height = board.get_worker_position(worker)[2]
+            adj_cell = board.get_adjacent_cell(worker, direction)
+            adj_height = board.get_cell_height(adj_cell.row, adj_cell.col)
+            climbs[move_key] = adj_height if adj_height > height else 0
+        return climbs
@@ -0,0 +1,185 @@
+import mmap
+import os
+import struct
+from CustomExceptions import ContractViolation
+
+
+class OpeningBook:
+    """
+    A precomputed book of worker placements, built offline by `build_opening_book.py` and read from a binary file,
+    which is memory-mapped the first time a book is needed.
+
+    The book holds the best placement for the player who places first, and the best reply to every placement of the
+    player who places first. Placements that are the same up to a symmetry of the board (a rotation or reflection) are
+    stored once, by their canonical key.
+
+    Definitions:
+
+    cell index
+        `int` in range [0, num_rows * num_cols). The cell at position (row, col) has cell index `row * num_cols + col`.
+
+    symmetry
+        `tuple` mapping each cell index to the cell index it is moved to by a rotation or reflection of the board.
+        Square boards have 8, the others 4.
+
+    key
+        `int`. The mask with the bit `1 << cell index` set for each cell of the workers already placed, taken in the
+        symmetry that makes it smallest. 0 if no workers are placed yet.
+
+    record
+        `tuple` of (key, cell index 1, cell index 2, score): the cells to place on, in the symmetry of the key, and the
+        score of the placement for the player placing, as found by the search that built the book.
+
+    book file
+        A header of (magic, version, num_rows, num_cols, number of records) followed by the records, sorted by key,
+        packed as `HEADER` and `RECORD`.
+    """
+
+    MAGIC = b"SPBK"
+    VERSION = 1
+    HEADER = struct.Struct("<4sBBBH")
+    RECORD = struct.Struct("<IBBh")
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "placement_book.bin")
+    _books = {}  # key-value pair of path : book, or `None` if there is no valid book at the path
+
+    def __init__(self, path):
+        """
+        Constructor. Memory-maps the book file at the given path.
+
+        :param str path: the path of a book file (as defined above).
+        """
+        with open(path, "rb") as f:
+            try:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                raise ContractViolation("Invalid opening book file: {}".format(path))
+        if len(self.data) < OpeningBook.HEADER.size:
+            raise ContractViolation("Invalid opening book file: {}".format(path))
+        magic, version, self.rows, self.cols, self.num_records = OpeningBook.HEADER.unpack_from(self.data)
+        if (magic != OpeningBook.MAGIC or version != OpeningBook.VERSION
+                or len(self.data) != OpeningBook.HEADER.size + self.num_records * OpeningBook.RECORD.size):
+            raise ContractViolation("Invalid opening book file: {}".format(path))
+        self.symmetries = OpeningBook.get_symmetries(self.rows, self.cols)
+
+    @staticmethod
+    def load(path=DEFAULT_PATH):
+        """
+        Returns the book at the given path, memory-mapping it on the first call for that path.
+
+        :param str path: the path of a book file (as defined above).
+        :return: the book, or `None` if there is no valid book file at the path.
+        :rtype: OpeningBook
+        """
+        if path not in OpeningBook._books:
+            try:
+                OpeningBook._books[path] = OpeningBook(path)
+            except FileNotFoundError:
+                OpeningBook._books[path] = None
+            except ContractViolation as e:
+                print(e)  # debug
+                OpeningBook._books[path] = None
+        return OpeningBook._books[path]
+
+    def get_placements(self, board):
+        """
+        Looks up the placements for the player placing next on the given board.
+
+        :param Board board: an instance of Board (refer to documentation of Board class) of the book's dimensions,
+        with no buildings and either no workers or the two workers of the player who placed first.
+        :return: `list` of [position1, position2] (as in `BaseStrategy.get_placements`), or `None` if the board is not
+        in the book.
+        :rtype: list
+        """
+        if board.get_dimensions() != (self.rows, self.cols):
+            return None
+        cells = []
+        for row_index, row in enumerate(board.get_snapshot()):
+            for col_index, cell in enumerate(row):
+                if isinstance(cell, tuple):
+                    cells.append(row_index * self.cols + col_index)
+                    cell = cell[0]
+                if cell != 0:
+                    return None
+        if len(cells) not in (0, 2):
+            return None
+        key, symmetry = OpeningBook.get_key(cells, self.symmetries)
+        record = self.find(key)
+        if record is None:
+            return None
+        inverse = {to_cell: from_cell for from_cell, to_cell in enumerate(symmetry)}
+        return [[inverse[cell] // self.cols, inverse[cell] % self.cols] for cell in record[1:3]]
+
+    @staticmethod
+    def get_key(cells, symmetries):
+        """
+        :param list cells: the cell indices of the workers placed.
+        :param list symmetries: the symmetries (as defined above) of the board.
+        :return: the key (as defined above) of the cells, and the symmetry (as defined above) that gives it.
+        :rtype: tuple
+        """
+        return min((sum(1 << symmetry[cell] for cell in cells), symmetry) for symmetry in symmetries)
+
+    def find(self, key):
+        """
+        :param int key: a key (as defined above).
+        :return: the record (as defined above) of the key, found by binary search, or `None` if there is none.
+        :rtype: tuple
+        """
+        low, high = 0, self.num_records
+        while low < high:
+            middle = (low + high) // 2
+            record = OpeningBook.RECORD.unpack_from(self.data, OpeningBook.HEADER.size
+                                                    + middle * OpeningBook.RECORD.size)
+            if record[0] == key:
+                return record
+            if record[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def __len__(self):
+        """
+        :return: the number of records in the book.
+        :rtype: int
+        """
+        return self.num_records
+
+    @staticmethod
+    def get_symmetries(num_rows, num_cols):
+        """
+        :param int num_rows: number of rows of the board.
+        :param int num_cols: number of columns of the board.
+        :return: the symmetries (as defined above) of a board of the given dimensions, the identity first.
+        :rtype: list
+        """
+        last_row, last_col = num_rows - 1, num_cols - 1
+        transforms = [lambda r, c: (r, c), lambda r, c: (last_row - r, last_col - c),
+                      lambda r, c: (r, last_col - c), lambda r, c: (last_row - r, c)]
+        if num_rows == num_cols:
+            transforms += [lambda r, c: (c, last_row - r), lambda r, c: (last_col - c, r),
+                           lambda r, c: (c, r), lambda r, c: (last_col - c, last_row - r)]
+        symmetries = []
+        for transform in transforms:
+            symmetries.append(tuple(row * num_cols + col for row, col in
+                                    (transform(index // num_cols, index % num_cols)
+                                     for index in range(num_rows * num_cols))))
+        return symmetries
+
+    @staticmethod
+    def write(path, num_rows, num_cols, records):
+        """
+        Writes a book file (as defined above).
+
+        :param str path: the path to write to.
+        :param int num_rows: number of rows of the board.
+        :param int num_cols: number of columns of the board.
+        :param list records: the records (as defined above), with scores clipped to the range of a 16-bit int.
+        :rtype: void
+        """
+        records = sorted(records)
+        with open(path, "wb") as f:
+            f.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.VERSION, num_rows, num_cols, len(records)))
+            for key, cell1, cell2, score in records:
+                f.write(OpeningBook.RECORD.pack(key, cell1, cell2, max(-32768, min(32767, int(score)))))
+        OpeningBook._books.pop(path, None)
@@ -0,0 +1,73 @@
+from RuleChecker import RuleChecker
+from CustomExceptions import ContractViolation
+
+
+class PlayCode:
+    """
+    A compact integer encoding of plays, used by the move generator and the search strategies so they don't allocate
+    two lists per play. Plays are converted back into the list format only where they leave a strategy.
+
+    Definitions:
+
+    play
+        `list`: [worker, [direction1, direction2]] or [worker, [direction1]] where direction1 is the direction to move
+        and direction2 is the direction to build.
+
+    play code
+        `int` in range [0, 512). Bits 6-7 hold the index of the worker in `RuleChecker.WORKERS`, bits 3-5 the index of
+        the move direction and bits 0-2 the index of the build direction in `RuleChecker.DIRECTIONS`. Winning plays
+        have no build, so they set `WIN_FLAG` and leave the build bits at 0.
+    """
+
+    WORKER_SHIFT = 6
+    MOVE_SHIFT = 3
+    DIRECTION_MASK = 7
+    WORKER_MASK = 3
+    WIN_FLAG = 1 << 8
+
+    @staticmethod
+    def encode(play):
+        """
+        :param list play: a play (as defined above).
+        :return: the play code (as defined above) of the play.
+        :rtype: int
+        """
+        if not RuleChecker.is_valid_play(play) or not play or not RuleChecker.is_valid_worker(play[0]):
+            raise ContractViolation("Invalid play provided: {}".format(play))
+        worker, directions = play
+        code = (RuleChecker.WORKER_INDICES[worker] << PlayCode.WORKER_SHIFT
+                | RuleChecker.DIRECTION_INDICES[directions[0]] << PlayCode.MOVE_SHIFT)
+        if len(directions) == 1:
+            return code | PlayCode.WIN_FLAG
+        return code | RuleChecker.DIRECTION_INDICES[directions[1]]
+
+    @staticmethod
+    def decode(code):
+        """
+        :param int code: a play code (as defined above).
+        :return: the play (as defined above) the code stands for.
+        :rtype: list
+        """
+        worker = RuleChecker.WORKERS[code >> PlayCode.WORKER_SHIFT & PlayCode.WORKER_MASK]
+        move_dir = RuleChecker.DIRECTIONS[code >> PlayCode.MOVE_SHIFT & PlayCode.DIRECTION_MASK]
+        if code & PlayCode.WIN_FLAG:
+            return [worker, [move_dir]]
+        return [worker, [move_dir, RuleChecker.DIRECTIONS[code & PlayCode.DIRECTION_MASK]]]
+
+    @staticmethod
+    def is_winning(code):
+        """
+        :param int code: a play code (as defined above).
+        :return: `True` if the code is a winning play (a move up to height 3, with no build), else `False`.
+        :rtype: bool
+        """
+        return bool(code & PlayCode.WIN_FLAG)
+
+    @staticmethod
+    def get_worker(code):
+        """
+        :param int code: a play code (as defined above).
+        :return: the worker (as defined in the documentation of `Board`) making the play.
+        :rtype: string
+        """
+        return RuleChecker.WORKERS[code >> PlayCode.WORKER_SHIFT & PlayCode.WORKER_MASK]
@@ -31,11 +31,12 @@ class Player(PlayerInterface):
 
     COUNT = 0  # number of instances of local players. For naming purposes only.
 
-    def __init__(self, name=None, strategy=RandomStrategy()):
+    def __init__(self, name=None, strategy=RandomStrategy(), board_type=Board):
         """
 
         :param str name: the name of the Santorini player.
         :param Strategy strategy: the strategy the player employs.
+        :param type board_type: the `Board` implementation the player keeps its board in (e.g. `BitBoard`).
         :return:
         :rtype: None
         """
@@ -56,7 +57,8 @@ class Player(PlayerInterface):
             self.name = name
         if not isinstance(strategy, BaseStrategy):
             raise ContractViolation("Strategy must implement BaseStrategy interface!")
-        self.board = Board()
+        self.board_type = board_type
+        self.board = board_type()
         self.strategy = strategy
         self.color = None
         self.registered = False  # shadow state
@@ -105,6 +107,7 @@ class Player(PlayerInterface):
         if not RuleChecker.is_legal_initial_board(board, self.color):
             raise ContractViolation("Invalid initial board provided: {}".format(board))
         self.board.set_board(board)
+        self.board.set_side_to_move(self.color)
         # TODO: potential contract needed to ensure set_board is called at start of every turn for player
         return self.strategy.get_placements(self.board, self.color)
 
@@ -121,6 +124,7 @@ class Player(PlayerInterface):
         if not RuleChecker.is_legal_board(board):
             raise ContractViolation("Invalid board provided: {}".format(board))
         self.board.set_board(board)
+        self.board.set_side_to_move(self.color)
         play = self.strategy.get_play(self.board, self.color)
         print("sending play", play)  # debug
         return play
@@ -140,7 +144,7 @@ class Player(PlayerInterface):
         if not self.registered:
             raise ContractViolation("Player.notify() cannot be called before register!")
         # resetting interaction protocol contracts for future games
-        self.board = Board()
+        self.board = self.board_type()
         self.color = None
         print("{} has won the game!".format(winner_name))  # debug
         print("------------------------------------------------")  # debug
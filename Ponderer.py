@@ -0,0 +1,132 @@
+import threading
+from Board import BoardSnapshot
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from Strategies import SmartStrategy
+
+
+class Ponderer:
+    """
+    Searches ahead on a background thread while the opponent is thinking ("pondering"): after the player sends a play,
+    the strategy is run on the board after each of the opponent's replies, most likely first, and the play it finds
+    for each is kept. If the opponent then makes one of those replies, the player answers with the kept play without
+    searching again. Searching strategies also keep what they learnt in their transposition tables, so boards that
+    weren't pondered to the end are searched faster too.
+
+    The strategy is shared with the player, so it must not be used while pondering: `stop()` sets the strategy's
+    `stop_event`, which ends its search at the next clock check (see `SearchClock`), and waits for the thread.
+
+    Definitions:
+
+    pondered play
+        The play the strategy returned for a board after one of the opponent's replies, kept by the board's snapshot
+        (see `BoardSnapshot`).
+    """
+
+    def __init__(self, strategy, board_type):
+        """
+        :param BaseStrategy strategy: the strategy of the player.
+        :param type board_type: the `Board` implementation to ponder on (e.g. `BitBoard`).
+        """
+        self.strategy = strategy
+        self.board_type = board_type
+        self.plays = {}  # key-value pair of board snapshot : pondered play (as defined above)
+        self.thread = None
+        self.stop_event = None
+        self.stats = {"pondered": 0, "hits": 0, "misses": 0}
+
+    def start(self, board, color, play):
+        """
+        Starts pondering the opponent's replies to a play, forgetting the plays pondered before.
+
+        :param Board board: an instance of Board (refer to documentation of Board class), before the play. It is copied,
+        not changed.
+        :param str color: color (as defined in the documentation of `RuleChecker`) of the player.
+        :param list play: the play (as defined in the documentation of `Player`) the player made on the board.
+        :rtype: void
+        """
+        self.stop()
+        self.plays = {}
+        if not play or len(play[1]) == 1:  # a winning play, or no play, ends the game
+            return
+        ponder_board = self.board_type()
+        ponder_board.set_board(board.get_snapshot())
+        ponder_board.set_side_to_move(color)  # the board's hash keys the strategy's table
+        ponder_board.make_play_code(PlayCode.encode(play))
+        self.stop_event = threading.Event()
+        self.strategy.stop_event = self.stop_event
+        self.thread = threading.Thread(target=self._ponder, args=(ponder_board, color), daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """
+        Stops pondering, and waits for the strategy's search to end. Does nothing if not pondering.
+
+        :rtype: void
+        """
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.strategy.stop_event = None
+
+    def get_play(self, board):
+        """
+        CONTRACT:
+         - must be called after `stop()`.
+
+        :param list board: a board (as defined in the documentation of `Board`), or a snapshot of one.
+        :return: the pondered play (as defined above) for the board, or `None` if it wasn't pondered.
+        :rtype: list
+        """
+        play = self.plays.get(BoardSnapshot.from_board(board))
+        self.stats["hits" if play is not None else "misses"] += 1
+        return play
+
+    def get_stats(self):
+        """
+        :return: how many boards were pondered to the end, and how many boards asked for were pondered or not.
+        :rtype: dict
+        """
+        return dict(self.stats)
+
+    def _ponder(self, board, color):
+        """
+        Runs on the pondering thread: searches the board after each of the opponent's replies until stopped.
+
+        :param Board board: the board after the player's play, which the thread owns.
+        :param str color: color of the player.
+        :rtype: void
+        """
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        if board.has_winning_move(opp_color):  # the opponent will take the win
+            return
+        for code in self._order_replies(board, color, opp_color, board.generate_play_codes(opp_color)):
+            if self.stop_event.is_set():
+                return
+            board.make_play_code(code)
+            play = self.strategy.get_play(board, color)
+            if not self.stop_event.is_set():  # a stopped search may not have finished
+                self.plays[board.get_snapshot()] = play
+                self.stats["pondered"] += 1
+            board.unmake()
+
+    def _order_replies(self, board, color, opp_color, codes):
+        """
+        :return: the play codes of the opponent's replies, most likely first: the best reply the strategy's last search
+        found, if its table has one, then the others, best first for the opponent by the `SmartStrategy` heuristic.
+        :rtype: list
+        """
+        scores = {}
+        for code in codes:
+            board.make_play_code(code)
+            scores[code] = (SmartStrategy._score_board_helper(board, opp_color)
+                            - SmartStrategy._score_board_helper(board, color))
+            board.unmake()
+        codes = sorted(codes, key=scores.get, reverse=True)
+        entry = self.strategy.table.probe(board.hash()) if self.strategy.table is not None else None
+        if entry is not None and entry[3] in scores:
+            codes.remove(entry[3])
+            codes.insert(0, entry[3])
+        return codes
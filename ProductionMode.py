@@ -0,0 +1,43 @@
+from Board import Board
+from BitBoard import BitBoard
+from RuleChecker import RuleChecker
+
+
+# Classes whose `FAST_PATH_METHODS` are swapped for their `_<method>_unchecked` counterparts in production mode.
+FAST_PATH_CLASSES = (Board, BitBoard, RuleChecker)
+
+# (class, method name) -> the original, contract-checking class attribute.
+_checked_methods = {}
+
+
+def set_production_mode(enabled):
+    """
+    Turns production mode on or off.
+
+    In production mode the hot-path methods listed in each class's `FAST_PATH_METHODS` skip their contract checks, since
+    every board and play reaching them has already been validated at a trust boundary (`Referee` validates every play
+    from a player, `SmartPlayer` every board from the referee). Off (the default) restores the checked methods, which is
+    what the tests run against.
+
+    :param bool enabled: `True` to strip contract checks from hot paths, `False` to restore them.
+    :rtype: void
+    """
+    for cls in FAST_PATH_CLASSES:
+        for name in cls.FAST_PATH_METHODS:
+            if name not in vars(cls):  # inherited, so swapped on the class that defines it
+                continue
+            key = (cls, name)
+            if key not in _checked_methods:
+                # only look at the class's own attributes, so subclasses keep their own overrides
+                _checked_methods[key] = vars(cls)[name]
+            fast_path = vars(cls)["_{}_unchecked".format(name)] if enabled else _checked_methods[key]
+            setattr(cls, name, fast_path)
+
+
+def is_production_mode():
+    """
+    :return: `True` if production mode is on, else `False`.
+    :rtype: bool
+    """
+    return any(vars(cls)[name] is not _checked_methods.get((cls, name), vars(cls)[name])
+               for cls in FAST_PATH_CLASSES for name in cls.FAST_PATH_METHODS if name in vars(cls))
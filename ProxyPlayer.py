@@ -1,14 +1,14 @@
-import json
 from RuleChecker import RuleChecker
 from PlayerInterface import PlayerInterface
+from Transport import Transport
 from CustomExceptions import ContractViolation, IllegalResponse, InvalidCommand, IllegalPlay
-from JsonParser import parse_json
 
 
 class ProxyPlayer(PlayerInterface):  # TODO: change docstrings and implement interaction protocol contract
 
     def __init__(self, conn):
         self.s = conn
+        self.transport = Transport(conn) if conn is not None else None
         self.name = None
 
     def register(self):
@@ -25,11 +25,7 @@ class ProxyPlayer(PlayerInterface):  # TODO: change docstrings and implement int
         # TODO: contract checks
         message = ["Register"]
         response = self._send_message_and_recv_response(message)
-        self._examine_for_error(response)
-        if not isinstance(response, str):  # checking if is_valid_name. Potentially create well named micro-function?
-            raise InvalidCommand("ProxyPlayer didn't receive string for name. Received: {}".format(response))
-        self.name = response
-        return response
+        return self._set_name(response)
 
     def place(self, board, color):
         """
@@ -102,6 +98,20 @@ class ProxyPlayer(PlayerInterface):  # TODO: change docstrings and implement int
             raise ContractViolation("ProxyPlayer.register() must be called before get_name()!")
         return self.name
 
+    def _set_name(self, response):
+        """
+        Checks the response to a `["Register"]` message and takes the name in it.
+
+        :param any response: the response of the remote player.
+        :return: the name of the player
+        :rtype: str
+        """
+        self._examine_for_error(response)
+        if not isinstance(response, str):  # checking if is_valid_name. Potentially create well named micro-function?
+            raise InvalidCommand("ProxyPlayer didn't receive string for name. Received: {}".format(response))
+        self.name = response
+        return response
+
     def _send_message_and_recv_response(self, message):
         """
 
@@ -109,12 +119,15 @@ class ProxyPlayer(PlayerInterface):  # TODO: change docstrings and implement int
         :return: an object that can be converted to json via json.dumps()
         :rtype: any
         """
-        data = bytes(json.dumps(message) + "\n", "utf-8")
-        self.s.sendall(data)
-        response = str(self.s.recv(1024), "utf-8")  # Receive data from the server
-        if not response:
+        try:
+            self.transport.send(message)
+            response = self.transport.recv()
+        except ConnectionError as e:
+            raise IllegalResponse("Connection lost: {}".format(e))
+        except ValueError as e:
+            raise IllegalResponse("Response was not JSON! {}".format(e))
+        if response is None:
             raise IllegalResponse("Response was empty!")
-        response = parse_json(response)[0]["value"]
         return response
 
     @staticmethod
@@ -52,14 +52,14 @@ class Referee:
         try:
 
             for player in self.players:
-                placements = player.place(self.board.extract_board(), RuleChecker.COLORS[self.turn])
+                placements = player.place(self.board.get_snapshot(), RuleChecker.COLORS[self.turn])
                 print(placements)  # debug
                 self._update_board_with_placements(placements)
                 self._swap_turn()
 
             while not winner:
                 player = self.players[self.turn]
-                play = player.play(self.board.extract_board())
+                play = player.play(self.board.get_snapshot())
 
                 # cheater checking testing: comment line above and uncomment if/else below to sometimes send bad boards
                 # if random.randrange(10) < 1:
@@ -69,9 +69,9 @@ class Referee:
                 #     incorrect_board.place_worker(0, 4, RuleChecker.COLORS[0] + "2")
                 #     incorrect_board.place_worker(4, 4, RuleChecker.COLORS[1] + "1")
                 #     incorrect_board.place_worker(4, 0, RuleChecker.COLORS[1] + "2")
-                #     play = player.play(incorrect_board.extract_board())
+                #     play = player.play(incorrect_board.get_snapshot())
                 # else:
-                #     play = player.play(self.board.extract_board())
+                #     play = player.play(self.board.get_snapshot())
 
                 print(play)  # debug
                 if not play:
@@ -150,7 +150,8 @@ class Referee:
         if not RuleChecker.is_valid_play(play):
             raise ContractViolation("Play not in correct format.")
         worker, directions = play
-        if (worker[:-1] != RuleChecker.COLORS[self.turn]
+        if (not RuleChecker.is_valid_worker(worker)
+                or worker[:-1] != RuleChecker.COLORS[self.turn]
                 or not RuleChecker.is_legal_play(self.board, worker, directions)):
             raise IllegalPlay("Illegal play made by {player}: {play}".format(player=self.players[self.turn].get_name(),
                                                                              play=play))
@@ -17,15 +17,38 @@ class RuleChecker:
     """
 
     DIRECTIONS = ("N", "NE", "E", "SE", "S", "SW", "W", "NW")
+    DIRECTION_INDICES = {direction: index for index, direction in enumerate(DIRECTIONS)}
     COLORS = ("blue", "white")
     WORKERS = (COLORS[0]+"1", COLORS[0]+"2", COLORS[1]+"1", COLORS[1]+"2")
+    WORKER_INDICES = {worker: index for index, worker in enumerate(WORKERS)}
+    MAX_HEIGHT = 4
+    # Methods with an unchecked fast path named `_<method>_unchecked`, which `ProductionMode` wires in at startup.
+    FAST_PATH_METHODS = ("is_winning_move", "is_winning_play", "is_valid_move", "is_valid_build")
 
     @staticmethod
     def is_winning_move(board, worker, direction):
         if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
             raise ContractViolation("Invalid (or no) worker / direction provided.")
+        return RuleChecker._is_winning_move_unchecked(board, worker, direction)
+
+    @staticmethod
+    def _is_winning_move_unchecked(board, worker, direction):
         return board.get_height(worker, direction) == 3
 
+    @staticmethod
+    def has_winning_move(board, color):
+        """
+        Checks if a worker of the given color can move up to height 3, without generating any plays.
+
+        :param Board board:
+        :param string color:
+        :return: `True` if the color has a winning move, else `False`.
+        :rtype: bool
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color provided: {}".format(color))
+        return board.has_winning_move(color)
+
     @staticmethod
     def is_winning_play(board, worker, directions):
         """
@@ -49,7 +72,13 @@ class RuleChecker:
             raise ContractViolation("Invalid (or no) directions provided.")
         if not RuleChecker.is_legal_play(board, worker, directions):
             raise ContractViolation("Illegal play passed into is_winning_play: {}".format([worker, directions]))
+        return RuleChecker._is_winning_play_unchecked(board, worker, directions)
 
+    @staticmethod
+    def _is_winning_play_unchecked(board, worker, directions):
+        """
+        Fast path of `is_winning_play()` that assumes the play has already been checked for legality.
+        """
         color = worker[:-1]
         available_colors = list(RuleChecker.COLORS)
         available_colors.remove(color)
@@ -59,11 +88,9 @@ class RuleChecker:
             return True
         else:
             opp_cannot_play = False
-            move_dir, build_dir = directions
 
             # simulate play
-            board.move(worker, move_dir)
-            board.build(worker, build_dir)
+            board.make_play([worker, directions])
 
             # commented out to avoid circular imports
             # opposition_player_legal_plays = Strategy.get_legal_plays(board, opp_color)
@@ -72,8 +99,7 @@ class RuleChecker:
             #     opp_cannot_play = True
 
             # undo play
-            board.undo_build(worker, build_dir)
-            board.move(worker, board.get_opposite_direction(move_dir))
+            board.unmake()
 
             return opp_cannot_play
 
@@ -81,21 +107,29 @@ class RuleChecker:
     def is_valid_move(board, worker, direction):
         if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
             raise ContractViolation("Invalid (or no) worker / direction provided.")
+        return RuleChecker._is_valid_move_unchecked(board, worker, direction)
+
+    @staticmethod
+    def _is_valid_move_unchecked(board, worker, direction):
+        adj_cell = board.get_adjacent_cell(worker, direction)
+        if not adj_cell.in_bounds or board.has_worker(adj_cell.row, adj_cell.col):
+            return False
         worker_height = board.get_worker_position(worker)[2]
-        adj_cell_height = board.get_height(worker, direction)
-        return (board.neighboring_cell_exists(worker, direction)
-                and not board.is_occupied(worker, direction)
-                and adj_cell_height != 4
-                and adj_cell_height - worker_height <= 1)
+        adj_cell_height = board.get_cell_height(adj_cell.row, adj_cell.col)
+        return adj_cell_height != 4 and adj_cell_height - worker_height <= 1
 
     @staticmethod
     def is_valid_build(board, worker, direction):
         if not RuleChecker.is_valid_worker(worker) or not RuleChecker.is_valid_direction(direction):
             raise ContractViolation("Invalid (or no) worker / direction provided.")
-        adj_cell_height = board.get_height(worker, direction)
-        return (board.neighboring_cell_exists(worker, direction)
-                and not board.is_occupied(worker, direction)
-                and adj_cell_height != 4)
+        return RuleChecker._is_valid_build_unchecked(board, worker, direction)
+
+    @staticmethod
+    def _is_valid_build_unchecked(board, worker, direction):
+        adj_cell = board.get_adjacent_cell(worker, direction)
+        return (adj_cell.in_bounds
+                and not board.has_worker(adj_cell.row, adj_cell.col)
+                and board.get_cell_height(adj_cell.row, adj_cell.col) != 4)
 
     @staticmethod
     def is_valid_placement(placements):
@@ -177,12 +211,12 @@ class RuleChecker:
                     return False
             elif build_dir is None:
                 return False
-            board.move(worker, move_dir)
+            board.make_play([worker, [move_dir]])
             if RuleChecker.is_valid_build(board, worker, build_dir):
                 return_val = True
             else:
                 return_val = False
-            board.move(worker, board.get_opposite_direction(move_dir))  # undo the move
+            board.unmake()  # undo the move
             return return_val
         else:
             return False
@@ -192,18 +226,18 @@ class RuleChecker:
         """
         Checks the format of a board.
 
-        :param list board: A board (as defined in the documentation of Board).
+        :param list board: A board (as defined in the documentation of Board), or a BoardSnapshot of one.
         :return: 'True' if the board format is valid, else 'False'.
         :rtype: bool
         """
-        if ((not isinstance(board, list) or
-             not all(isinstance(row, list) and len(board) == len(row) for row in board))):
+        if ((not isinstance(board, (list, tuple)) or
+             not all(isinstance(row, (list, tuple)) and len(board) == len(row) for row in board))):
             return False
         for row_count in range(len(board)):
             for col_count in range(len(board[0])):
                 cell = board[row_count][col_count]
                 if not isinstance(cell, int):
-                    if ((not isinstance(cell, list) or
+                    if ((not isinstance(cell, (list, tuple)) or
                          len(cell) != 2 or
                          not isinstance(cell[0], int) or
                          not isinstance(cell[1], str))):
@@ -215,7 +249,7 @@ class RuleChecker:
         """
         Checks the validity of an initial board.
 
-        :param list board: A board (as defined in the documentation of Board).
+        :param list board: A board (as defined in the documentation of Board), or a BoardSnapshot of one.
         :param string color: A color (as defined in the documentation of Referee).
         :return: 'True' if the board is a valid initial board, else 'False'.
         :rtype: bool
@@ -230,7 +264,7 @@ class RuleChecker:
         """
         Checks the validity of a board.
 
-        :param list board: A board (as defined in the documentation of Board).
+        :param list board: A board (as defined in the documentation of Board), or a BoardSnapshot of one.
         :param list unset_workers: A list of workers (as defined in the documentation of Board) not in the board that
         will be accounted for later (default: empty list).
         :param int max_height: Maximum height (as defined in the documentation of Board) that any cell in the board
@@ -245,7 +279,7 @@ class RuleChecker:
         for row in range(len(board)):
             for col in range(len(board[0])):
                 cell = board[row][col]
-                if isinstance(cell, list):
+                if isinstance(cell, (list, tuple)):
                     cell_height, cell_worker = cell
                     max_cell_height = min(max_height, 2)
                     if cell_worker in workers or not RuleChecker.is_valid_worker(cell_worker):
@@ -0,0 +1,56 @@
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from ProductionMode import set_production_mode, is_production_mode
+
+
+# The pool shared by every parallel search and offloaded strategy (see `OffloadedStrategy`) in this process, and the
+# number of worker processes it was created with.
+_pool = None
+_num_processes = 0
+# guards the two above: offloaded strategies (see `OffloadedStrategy`) ask for the pool from concurrent game threads
+_lock = threading.Lock()
+
+
+def get_pool(num_processes):
+    """
+    Returns the process pool that parallel searches run on. The pool is created on first use and then kept, so its
+    worker processes (and whatever they cache, e.g. transposition tables) are reused across plays and games. Asking
+    for a different number of processes replaces the pool.
+
+    The worker processes start in the production mode (see `ProductionMode`) of this process at the time the pool is
+    created.
+
+    :param int num_processes: the number of worker processes.
+    :return: the pool.
+    :rtype: ProcessPoolExecutor
+    """
+    global _pool, _num_processes
+    with _lock:
+        if _pool is None or _num_processes != num_processes:
+            _shutdown_pool()
+            _pool = ProcessPoolExecutor(num_processes, initializer=set_production_mode,
+                                        initargs=(is_production_mode(),))
+            _num_processes = num_processes
+        return _pool
+
+
+def shutdown_pool():
+    """
+    Shuts the pool down, if there is one, waiting for its worker processes to exit. Called at exit.
+
+    :rtype: void
+    """
+    with _lock:
+        _shutdown_pool()
+
+
+def _shutdown_pool():
+    global _pool, _num_processes
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
+        _num_processes = 0
+
+
+atexit.register(shutdown_pool)
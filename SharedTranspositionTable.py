@@ -0,0 +1,187 @@
+import atexit
+import struct
+from multiprocessing import shared_memory, resource_tracker
+from TranspositionTable import TranspositionTable
+from CustomExceptions import ContractViolation
+
+
+class SharedTranspositionTable:
+    """
+    A `TranspositionTable` that lives in a named `multiprocessing.shared_memory` block, so that every process that opens
+    the table by the same name (pool workers, or several players on one machine) reuses the others' search results.
+    It has the same interface, keys, entries and two-entry buckets as `TranspositionTable`.
+
+    The processes must run the same strategy with the same settings, since the table doesn't record what its values
+    mean.
+
+    Entries are written without locks, so a process may read an entry while another is halfway through writing it.
+    Every entry is stored as three 64-bit words, the check word, the meta word and the value, where the check word is
+    the key XOR the other two words. An entry whose words don't check out against the probed key, because it was torn
+    by a concurrent write or belongs to a different key, is treated as missing.
+
+    Definitions:
+
+    meta word
+        `int`. Bit 20 is set if the entry is in use, bits 10-19 hold the move plus 1 (so `NO_MOVE` is 0), bits 8-9 the
+        flag and bits 0-7 the depth.
+    """
+
+    MAGIC = 0x53414e544f52494e  # marks a block as holding a table
+    HEADER_WORDS = 2  # the magic number and the number of buckets
+    ENTRY_WORDS = 3  # the check word, the meta word and the value
+    ENTRY_BYTES = 8 * ENTRY_WORDS
+    _USED = 1 << 20
+    _MOVE_SHIFT = 10
+    _FLAG_SHIFT = 8
+    _DEPTH_MASK = 0xff
+    _FLAG_MASK = 0x3
+    _MOVE_MASK = 0x3ff
+
+    def __init__(self, name, max_bytes=TranspositionTable.DEFAULT_MAX_BYTES):
+        """
+        Constructor. Opens the table of the given name if some process already created it, else creates it with the
+        largest power-of-two number of buckets that fits in `max_bytes`.
+
+        :param str name: the name of the shared memory block.
+        :param int max_bytes: the memory cap of the table, in bytes, if it is created.
+        """
+        if not isinstance(name, str) or not name:
+            raise ContractViolation("name must be a non-empty string! Given: {}".format(name))
+        if not isinstance(max_bytes, int) or max_bytes < 2 * SharedTranspositionTable.ENTRY_BYTES:
+            raise ContractViolation("max_bytes must be an int of at least {}! Given: {}".format(
+                2 * SharedTranspositionTable.ENTRY_BYTES, max_bytes))
+        num_buckets = 1 << ((max_bytes // (2 * SharedTranspositionTable.ENTRY_BYTES)).bit_length() - 1)
+        size = 8 * SharedTranspositionTable.HEADER_WORDS + 2 * num_buckets * SharedTranspositionTable.ENTRY_BYTES
+        try:
+            self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            self.owner = True
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name)
+            self.owner = False
+        # the resource tracker would destroy the block when the first process using it exits, and processes forked
+        # from each other share a tracker, so the block's lifetime is managed here instead: the creator unlinks it
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+        self.unlinked = False
+        if self.owner:
+            atexit.register(self.unlink)
+        self.name = name
+        self.words = self.shm.buf.cast("Q")
+        if self.owner:
+            self.words[1] = num_buckets
+            self.words[0] = SharedTranspositionTable.MAGIC
+        elif self.words[0] != SharedTranspositionTable.MAGIC:
+            self.close()
+            raise ContractViolation("Shared memory block {} does not hold a transposition table!".format(name))
+        self.mask = self.words[1] - 1
+        self.size = 2 * self.words[1]
+
+    def probe(self, key):
+        """
+        :param int key: a key (as defined in the documentation of `TranspositionTable`).
+        :return: the entry stored for the key, or `None` if there is none. See `TranspositionTable.probe`.
+        :rtype: tuple
+        """
+        index = (key & self.mask) << 1
+        entry = self._read(index, key)
+        return entry if entry is not None else self._read(index + 1, key)
+
+    def store(self, key, depth, flag, value, move=TranspositionTable.NO_MOVE):
+        """
+        Stores a search result, with the same replacement scheme as `TranspositionTable.store`.
+
+        :param int key: a key (as defined in the documentation of `TranspositionTable`).
+        :param int depth: a depth (as defined in the documentation of `TranspositionTable`).
+        :param int flag: a flag (as defined in the documentation of `TranspositionTable`).
+        :param float value: the value found by the search.
+        :param int move: the play code of the best play found, or `NO_MOVE`.
+        :rtype: void
+        """
+        index = (key & self.mask) << 1
+        offset = self._get_offset(index)
+        words = self.words
+        meta = words[offset + 1]
+        old_key = words[offset] ^ meta ^ words[offset + 2]
+        old_depth = meta & SharedTranspositionTable._DEPTH_MASK if meta & SharedTranspositionTable._USED else -1
+        if depth >= old_depth:
+            if old_key != key and old_depth >= 0:
+                self._write_words(index + 1, words[offset], meta, words[offset + 2])
+            self._write(index, key, depth, flag, value, move)
+        else:
+            self._write(index + 1, key, depth, flag, value, move)
+
+    def clear(self):
+        """
+        Empties the table, for every process using it.
+
+        :rtype: void
+        """
+        start = 8 * SharedTranspositionTable.HEADER_WORDS
+        self.shm.buf[start:] = bytes(len(self.shm.buf) - start)
+
+    def close(self):
+        """
+        Detaches this process from the table. The table itself stays until the process that created it calls
+        `unlink()`.
+
+        :rtype: void
+        """
+        self.words.release()
+        self.shm.close()
+
+    def unlink(self):
+        """
+        Destroys the shared memory block once every process has closed it. Only the process that created the table
+        should call this, and it is called when that process exits.
+
+        :rtype: void
+        """
+        if self.unlinked:
+            return
+        self.unlinked = True
+        # `SharedMemory.unlink()` tells the resource tracker to stop tracking the block, which it isn't (see __init__)
+        resource_tracker.register(self.shm._name, "shared_memory")
+        self.shm.unlink()
+
+    def __len__(self):
+        """
+        :return: the number of entries in use.
+        :rtype: int
+        """
+        words = self.words
+        used = SharedTranspositionTable._USED
+        return sum(1 for index in range(self.size) if words[self._get_offset(index) + 1] & used)
+
+    @staticmethod
+    def _get_offset(index):
+        """
+        :return: the index in `self.words` of the first word of the entry with the given index.
+        :rtype: int
+        """
+        return SharedTranspositionTable.HEADER_WORDS + index * SharedTranspositionTable.ENTRY_WORDS
+
+    def _read(self, index, key):
+        """
+        :return: the entry with the given index, if it is in use and its check word matches the key, else `None`.
+        :rtype: tuple
+        """
+        offset = self._get_offset(index)
+        check, meta, value_bits = self.words[offset:offset + 3]
+        if not meta & SharedTranspositionTable._USED or check ^ meta ^ value_bits != key:
+            return None
+        # the value is taken from the words that were checked, not read again, since it may have been overwritten since
+        return (meta & SharedTranspositionTable._DEPTH_MASK,
+                meta >> SharedTranspositionTable._FLAG_SHIFT & SharedTranspositionTable._FLAG_MASK,
+                struct.unpack("<d", struct.pack("<Q", value_bits))[0],
+                (meta >> SharedTranspositionTable._MOVE_SHIFT & SharedTranspositionTable._MOVE_MASK) - 1)
+
+    def _write(self, index, key, depth, flag, value, move):
+        meta = (SharedTranspositionTable._USED | (move + 1) << SharedTranspositionTable._MOVE_SHIFT
+                | flag << SharedTranspositionTable._FLAG_SHIFT | depth)
+        value_bits = struct.unpack("<Q", struct.pack("<d", value))[0]
+        self._write_words(index, key ^ meta ^ value_bits, meta, value_bits)
+
+    def _write_words(self, index, check, meta, value_bits):
+        offset = self._get_offset(index)
+        self.words[offset + 2] = value_bits
+        self.words[offset + 1] = meta
+        self.words[offset] = check
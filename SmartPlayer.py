@@ -1,16 +1,25 @@
-from Board import Board
+from Board import Board, BoardSnapshot
 from RuleChecker import RuleChecker
 from Strategies import RandomStrategy
 from CustomExceptions import ContractViolation, IllegalPlay
 from Player import Player
-import json
+from PlayCode import PlayCode
+from Ponderer import Ponderer
 
 
 class SmartPlayer(Player):
 
-    def __init__(self, name=None, strategy=RandomStrategy()):
-        super().__init__(name, strategy)
+    def __init__(self, name=None, strategy=RandomStrategy(), board_type=Board, ponder=False):
+        """
+        :param str name: see `Player`.
+        :param Strategy strategy: see `Player`.
+        :param type board_type: see `Player`.
+        :param bool ponder: `True` to search the opponent's replies while waiting for them, see `ponder()`.
+        """
+        super().__init__(name, strategy, board_type)
         self.placements = None
+        self.ponderer = Ponderer(strategy, board_type) if ponder else None
+        self.last_play = None
 
     def place(self, board, color):
         placements = super().place(board, color)
@@ -22,29 +31,62 @@ class SmartPlayer(Player):
             raise ContractViolation("Function must be called after player.place()!")
         if not RuleChecker.is_legal_board(board):
             raise ContractViolation("Invalid board provided: {}".format(board))
+        self.stop_pondering()
         if not self._check_board(board):
             raise IllegalPlay("Player provided with a cheating board.")
         print("cheater checking...")  # debug
-        return super().play(board)
+        play = self.ponderer.get_play(board) if self.ponderer is not None else None
+        if play is not None:
+            self.board.set_board(board)
+            self.board.set_side_to_move(self.color)
+            print("sending pondered play", play)  # debug
+        else:
+            play = super().play(board)
+        self.last_play = play
+        return play
+
+    def ponder(self):
+        """
+        Starts searching the opponent's replies to the last play in the background (see `Ponderer`), if the player
+        ponders. Call it once the play has been sent, and `stop_pondering()` once the next command arrives.
+
+        :rtype: void
+        """
+        if self.ponderer is not None and self.last_play is not None:
+            self.ponderer.start(self.board, self.color, self.last_play)
+
+    def stop_pondering(self):
+        """
+        Stops the search started by `ponder()`, if any, so that the strategy can be used again.
+
+        :rtype: void
+        """
+        if self.ponderer is not None:
+            self.ponderer.stop()
+
+    def notify(self, winner_name):
+        self.stop_pondering()
+        self.last_play = None
+        return super().notify(winner_name)
 
     def _check_board(self, curr_board):  # TODO - there's a bug here, need to test. commenting out usage for now
         """
         Ensures that a received board is within 2 plays of the board currently stored in the Player.
 
-        :param list curr_board: A board (as defined in the documentation of Board).
+        :param list curr_board: A board (as defined in the documentation of Board), or a BoardSnapshot of one.
         :return: 'True' if board is valid given previous board, else 'False'.
         :type: bool
         """
         opp_color = RuleChecker.COLORS[0] if self.color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        curr_board = BoardSnapshot.from_board(curr_board)
         # if player's last turn was a placement
-        # TODO: can't use json.dumps data without json.loads first, so either we use that or a deepcopy function
-        if RuleChecker.is_legal_initial_board(json.loads(self.board.extract_json_board()), self.color):
+        if RuleChecker.is_legal_initial_board(self.board.get_snapshot(), self.color):
             # apply placements to currently stored board
             for count, placement in enumerate(self.placements, 1):
                 row, col = placement
                 self.board.place_worker(row, col, self.color + str(count))
             # if player placed workers second, check possible opponent plays
-            if RuleChecker.is_legal_board(json.loads(self.board.extract_json_board())):
+            if RuleChecker.is_legal_board(self.board.get_snapshot()):
                 return self._check_turn(self.board, curr_board, opp_color)
             # else expect a 4-worker initial board with our workers in the same place
             else:
@@ -57,12 +99,12 @@ class SmartPlayer(Player):
                         # get_cell_worker? it would be the 3 lines of code below except the last would be returned
                         cell_height = self.board.get_cell_height(row_count, col_count)
                         cell_worker = self.board.get_cell_worker(row_count, col_count)
-                        prev_cell = [cell_height, cell_worker] if cell_worker else cell_height
+                        prev_cell = (cell_height, cell_worker) if cell_worker else cell_height
                         curr_cell = curr_board[row_count][col_count]
                         if prev_cell != curr_cell:
                             # if the cell used to have a worker but changed, or if the cell's height changed,
                             # or if the worker in the new cell is not one of the opponent's valid workers, return False
-                            if ((isinstance(prev_cell, list)
+                            if ((isinstance(prev_cell, tuple)
                                  or isinstance(curr_cell, int)
                                  or curr_cell[1] not in unset_workers)):
                                 return False
@@ -72,21 +114,17 @@ class SmartPlayer(Player):
         # else if player has already placed, checks possible sets of two turns
         else:
             # iterate through possible own plays, then for each check possible opponent plays for a board match
-            for own_play in self.strategy.get_legal_plays(self.board, self.color):
-                own_worker, own_directions = own_play
+            for own_code in self.strategy.get_legal_play_codes(self.board, self.color):
                 # ignore wins as they did not occur
-                if len(own_directions) == 1:
+                if own_code & PlayCode.WIN_FLAG:
                     continue
-                own_move_dir, own_build_dir = own_directions
                 # apply play to self.board
-                self.board.move(own_worker, own_move_dir)
-                self.board.build(own_worker, own_build_dir)
+                self.board.make_play_code(own_code)
                 # check opponent plays on modified board
                 if self._check_turn(self.board, curr_board, opp_color):
                     return True
                 # reverse play
-                self.board.undo_build(own_worker, own_build_dir)
-                self.board.move(own_worker, Board.get_opposite_direction(own_move_dir))
+                self.board.unmake()
             return False
 
     # TODO: possibly make this function return a set of plays so that check_board can call it twice and apply and
@@ -96,25 +134,22 @@ class SmartPlayer(Player):
         Ensures that a previous board is within 1 play of a given board.
 
         :param Board prev_board: A Board object (see documentation for Board).
-        :param list curr_board: A board (as defined in the documentation of Board).
+        :param list curr_board: A board (as defined in the documentation of Board), or a BoardSnapshot of one.
         :param str color: A color (as defined in the documentation of Referee).
         :return: 'True' if the current board can be achieved in one move from the previous board, else 'False'.
         :rtype: bool
         """
+        curr_board = BoardSnapshot.from_board(curr_board)
         # iterate through a player's plays to check for a matching resulting board
-        for play in self.strategy.get_legal_plays(prev_board, color):
-            worker, directions = play
+        for code in self.strategy.get_legal_play_codes(prev_board, color):
             # ignore wins as they did not occur
-            if len(directions) == 1:
+            if code & PlayCode.WIN_FLAG:
                 continue
-            move_dir, build_dir = directions
             # apply play to prev_board
-            prev_board.move(worker, move_dir)
-            prev_board.build(worker, build_dir)
+            prev_board.make_play_code(code)
             # check for board uniformity
-            if json.loads(prev_board.extract_json_board()) == curr_board:
+            if prev_board.get_snapshot() == curr_board:
                 return True
             # reverse play
-            prev_board.undo_build(worker, build_dir)
-            prev_board.move(worker, Board.get_opposite_direction(move_dir))
+            prev_board.unmake()
         return False
@@ -1,8 +1,52 @@
 from abc import ABC, abstractmethod
 import random
 from RuleChecker import RuleChecker
-from CustomExceptions import ContractViolation
+from Board import Board
+from BitBoard import BitBoard
+from PlayCode import PlayCode
+from TranspositionTable import TranspositionTable
+from SharedTranspositionTable import SharedTranspositionTable
+from MoveOrdering import MoveOrderer
+from OpeningBook import OpeningBook
+from EndgameSolver import EndgameSolver
+from BatchEvaluation import BatchEvaluator
+from CustomExceptions import ContractViolation, SearchTimeout
+import SearchPool
+import copy
 import math
+import pickle
+import time
+
+
+class SearchClock:
+    """
+    The deadline of an anytime search. The search calls `tick()` once per node, which reads the time only every
+    `CHECK_INTERVAL` nodes and raises `SearchTimeout` once the deadline has passed, or the stop event has been set.
+    """
+
+    CHECK_INTERVAL = 256
+
+    def __init__(self, deadline, stop_event=None):
+        """
+        :param float deadline: the `time.monotonic()` time by which the search must stop, or `None`.
+        :param threading.Event stop_event: an event that stops the search once set, or `None`.
+        """
+        self.deadline = deadline
+        self.stop_event = stop_event
+        self.nodes = 0
+
+    def tick(self):
+        """
+        Counts a search node.
+
+        :rtype: void
+        """
+        self.nodes += 1
+        if not self.nodes % SearchClock.CHECK_INTERVAL:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                raise SearchTimeout("Search deadline passed after {} nodes.".format(self.nodes))
+            if self.stop_event is not None and self.stop_event.is_set():
+                raise SearchTimeout("Search stopped after {} nodes.".format(self.nodes))
 
 
 class BaseStrategy(ABC):
@@ -21,6 +65,10 @@ class BaseStrategy(ABC):
 
     """
 
+    endgame_solver = None  # the `EndgameSolver` tried before searching, see `_solve_endgame()`
+    stop_event = None  # a `threading.Event` that stops the search once set, see `_start_clock()` and `Ponderer`
+    table = None  # the transposition table of searching strategies, kept between plays
+
     @abstractmethod
     def get_placements(self, board, color):
         """
@@ -34,11 +82,13 @@ class BaseStrategy(ABC):
         pass
 
     @abstractmethod
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         """
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
+        :param float deadline: the `time.monotonic()` time by which a searching strategy should return its best play so
+        far, or `None` to use the strategy's own time per move, if any. Strategies that don't search ignore it.
         :return: a play (as defined above)
         :rtype: list
         """
@@ -54,34 +104,101 @@ class BaseStrategy(ABC):
         :return: a `list` of legal plays (as defined above)
         :rtype: list
         """
+        return [PlayCode.decode(code) for code in BaseStrategy.get_legal_play_codes(board, color)]
+
+    @staticmethod
+    def get_legal_play_codes(board, color):
+        """
+        Returns the play codes of all possible legal plays for players of the given color. Searches work on play codes,
+        and only decode the play they pick.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :return: a `list` of play codes (as defined in the documentation of `PlayCode`)
+        :rtype: list
+        """
         if not RuleChecker.is_valid_color(color):
             raise ContractViolation("Invalid color given: {}".format(color))
+        return board.generate_play_codes(color)
 
-        legal_plays = []
-        players = [str(color + "1"), str(color + "2")]
-        player_movable_directions = [[], []]
+    @staticmethod
+    def iter_legal_play_codes(board, color):
+        """
+        Lazily yields the play codes of all possible legal plays for players of the given color, winning plays first.
+        Use this over `get_legal_play_codes()` when the search may stop before seeing every play.
 
-        # Valid Move directions
-        for direc in RuleChecker.DIRECTIONS:
-            for i, player in enumerate(players):
-                if RuleChecker.is_valid_move(board, player, direc):
-                    player_movable_directions[i].append(direc)
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :return: an iterator over play codes (as defined in the documentation of `PlayCode`)
+        :rtype: iterator
+        """
+        if not RuleChecker.is_valid_color(color):
+            raise ContractViolation("Invalid color given: {}".format(color))
+        return board.iter_play_codes(color)
 
-        # Constructing all possible legal plays
-        for i, player in enumerate(players):
-            for move_dir in player_movable_directions[i]:
-                if RuleChecker.is_winning_move(board, player, move_dir):
-                    legal_plays.append([player, [move_dir]])
+    def _start_clock(self, deadline, time_per_move):
+        """
+        :param float deadline: the `time.monotonic()` time by which to stop searching, or `None`.
+        :param float time_per_move: the number of seconds to search for if no deadline is given, or `None`.
+        :return: a `SearchClock` for the deadline and `self.stop_event`, or `None` if the search shouldn't be timed and
+        can't be stopped.
+        :rtype: SearchClock, None
+        """
+        if deadline is None and time_per_move is not None:
+            deadline = time.monotonic() + time_per_move
+        if deadline is None and self.stop_event is None:
+            return None
+        return SearchClock(deadline, self.stop_event)
 
-                else:
-                    board.move(player, move_dir)
-                    for build_dir in RuleChecker.DIRECTIONS:
-                        if RuleChecker.is_valid_build(board, player, build_dir):
-                            legal_plays.append([player, [move_dir, build_dir]])
-                    opp_dir = board.get_opposite_direction(move_dir)
-                    board.move(player, opp_dir)  # undoing the move
+    @staticmethod
+    def _get_book_placements(board):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :return: the placements the opening book (see `OpeningBook`) has for the board, or `None` if there is no book or
+        the board isn't in it.
+        :rtype: list
+        """
+        book = OpeningBook.load()
+        return book.get_placements(board) if book is not None else None
 
-        return legal_plays
+    def _solve_endgame(self, board, color, codes, clock=None):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :param list codes: the play codes of the legal plays of `color`, none of them winning.
+        :param SearchClock clock: the clock of the search, by which to give up solving, or `None`.
+        :return: what `self.endgame_solver` returns for the board (see `EndgameSolver.get_play`), or `None` if the
+        strategy has no solver.
+        :rtype: tuple
+        """
+        if self.endgame_solver is None:
+            return None
+        return self.endgame_solver.get_play(board, color, codes, clock)
+
+    @staticmethod
+    def _create_table(table_size, table_name=None):
+        """
+        :param int table_size: the memory cap of the table, in bytes.
+        :param str table_name: the name of a shared table to open or create (see `SharedTranspositionTable`), or `None`
+        for a table of this process only.
+        :return: a transposition table.
+        :rtype: TranspositionTable, SharedTranspositionTable
+        """
+        if table_name is None:
+            return TranspositionTable(table_size)
+        return SharedTranspositionTable(table_name, table_size)
+
+    @staticmethod
+    def _rewind(board, num_plays):
+        """
+        Unmakes the plays a search that timed out left on the board.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param int num_plays: the number of plays on the board's undo stack before the search started.
+        :rtype: void
+        """
+        while len(board.undo_stack) > num_plays:
+            board.unmake()
 
 
 class RandomStrategy(BaseStrategy):
@@ -110,19 +227,20 @@ class RandomStrategy(BaseStrategy):
         # may as well
         return placements
 
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         """
         Returns a random play from all possible legal plays. If no legal plays, returns an empty list.
 
         :param Board board:
         :param str color:
+        :param float deadline: ignored, see `BaseStrategy.get_play`.
         :return: A random play.
         :rtype: list
         """
-        plays = self.get_legal_plays(board, color)
-        if not plays:
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
             return []
-        return random.choice(plays)
+        return PlayCode.decode(random.choice(codes))
 
 
 class NLooksAheadStrategy(BaseStrategy):
@@ -144,15 +262,39 @@ class NLooksAheadStrategy(BaseStrategy):
     # strategy be a private class within player? that doesn't make sense to me. having some of Strategy's function's
     # exposed doesn't allow any manipulation to variables that represent the game state, so it should be fine (I think).
 
-    def __init__(self, num_looks_ahead):
+    _worker_tables = {}  # key-value pair of (table size, table name) : table, in the search pool's worker processes
+
+    def __init__(self, num_looks_ahead, table_size=TranspositionTable.DEFAULT_MAX_BYTES, time_per_move=None,
+                 num_processes=None, table_name=None, endgame_solver=None):
+        """
+        :param int num_looks_ahead: number of moves to look ahead by.
+        :param int table_size: the memory cap of the transposition table (of each worker process, if parallel).
+        :param float time_per_move: the number of seconds to search for each play, or `None` to search to full depth.
+        :param int num_processes: the number of worker processes to search the plays on in parallel (see
+        `_get_plays_parallel()`), or `None` to search in this process.
+        :param str table_name: the name of a shared transposition table (see `SharedTranspositionTable`) for this
+        process and the worker processes to use, or `None` to give each process a table of its own.
+        :param EndgameSolver endgame_solver: the solver to try before searching (see `EndgameSolver`), or `None` for
+        one with the default thresholds.
+        """
         if not isinstance(num_looks_ahead, int) or num_looks_ahead < 1:
             raise ContractViolation("num_looks_ahead must be a positive integer! Given: {}".format(num_looks_ahead))
+        if time_per_move is not None and (not isinstance(time_per_move, (int, float)) or time_per_move <= 0):
+            raise ContractViolation("time_per_move must be a positive number! Given: {}".format(time_per_move))
+        if num_processes is not None and (not isinstance(num_processes, int) or num_processes < 1):
+            raise ContractViolation("num_processes must be a positive integer! Given: {}".format(num_processes))
         self.num_looks_ahead = num_looks_ahead
+        self.table_size = table_size
+        self.table_name = table_name
+        self.table = self._create_table(table_size, table_name)  # kept between plays, see _loses_in_n_moves()
+        self.time_per_move = time_per_move
+        self.num_processes = num_processes
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
 
     def get_placements(self, board, color):
         """
-        Returns worker placements of given color, by scheme of choosing the first two unoccupied corner cells, starting
-        from top left, in the clockwise direction.
+        Returns worker placements of given color from the opening book (see `OpeningBook`), or random placements if
+        the board isn't in the book.
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
@@ -172,8 +314,11 @@ class NLooksAheadStrategy(BaseStrategy):
         # # may as well
         # return placements
 
+        placements = self._get_book_placements(board)
+        if placements is not None:
+            return placements
+
         # making this return random placements now, not corners - so we can play against local players.
-        # TODO - make the placements somewhat strategic?
         num_rows, num_cols = board.get_dimensions()
         placements = []
         while len(placements) != 2:
@@ -185,17 +330,41 @@ class NLooksAheadStrategy(BaseStrategy):
         # may as well
         return placements
 
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         """
         Returns a winning or random play from all possible plays that don't result in a loss within self.num_looks_ahead
-         of the opponents moves.
+         of the opponents moves. Endgames that `self.endgame_solver` solves are played as it says instead.
+
+        If there is a deadline (or `self.time_per_move`), the plays are searched 1, 2, ... moves ahead up to
+        self.num_looks_ahead, and the plays of the deepest search that finished in time, and left any plays, are used.
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
+        :param float deadline: see `BaseStrategy.get_play`.
         :return: a play (as defined above)
         :rtype: list
         """
-        plays = NLooksAheadStrategy.get_plays(board, color, self.num_looks_ahead)
+        clock = self._start_clock(deadline, self.time_per_move)
+        codes = self.get_legal_play_codes(board, color)
+        if not any(code & PlayCode.WIN_FLAG for code in codes):
+            solved = self._solve_endgame(board, color, codes, clock)
+            if solved is not None:
+                return PlayCode.decode(solved[0])
+
+        if clock is None:
+            plays = self._get_plays(board, color, self.num_looks_ahead)
+        else:
+            plays = self._get_plays(board, color, 1)
+            num_plays = len(board.undo_stack)
+            for num_look_ahead in range(2, self.num_looks_ahead + 1):
+                try:
+                    deeper_plays = self._get_plays(board, color, num_look_ahead, clock)
+                except SearchTimeout:
+                    self._rewind(board, num_plays)
+                    break
+                if not deeper_plays:  # every play loses this far ahead, so keep the plays that survive the longest
+                    break
+                plays = deeper_plays
         if not plays:
             return []
         for play in plays:
@@ -203,8 +372,16 @@ class NLooksAheadStrategy(BaseStrategy):
                 return play
         return random.choice(plays)
 
+    def _get_plays(self, board, color, num_look_ahead, clock=None):
+        """
+        Runs `get_plays()` with the strategy's table, or `_get_plays_parallel()` if `self.num_processes` is set.
+        """
+        if self.num_processes is None:
+            return NLooksAheadStrategy.get_plays(board, color, num_look_ahead, self.table, clock)
+        return self._get_plays_parallel(board, color, num_look_ahead, clock)
+
     @staticmethod
-    def get_plays(board, color, num_look_ahead):  # TODO - make private method
+    def get_plays(board, color, num_look_ahead, table=None, clock=None):  # TODO - make private method
         """
         Returns a list of all possible legal plays that cannot not result in the opposing player winning within the next
         `num_look_ahead` moves.
@@ -215,148 +392,216 @@ class NLooksAheadStrategy(BaseStrategy):
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
         :param int num_look_ahead: number of moves to look ahead by
+        :param TranspositionTable table: a table to reuse the results of positions searched before, or `None`.
+        :param SearchClock clock: the deadline of the search, or `None`. Raises `SearchTimeout` once it passes.
         :return: a `list` of legal plays (as defined above)
         :rtype: `list`
         """
         if not RuleChecker.is_valid_color(color):
             raise ContractViolation("Invalid color given: {}".format(color))
+        board.set_side_to_move(color)  # the board's hash keys the table
 
         available_colors = list(RuleChecker.COLORS)
         available_colors.remove(color)
         opp_color = available_colors[0]
 
-        result_plays = []
+        result_codes = []
 
-        for play in NLooksAheadStrategy.get_legal_plays(board, color):
+        for code in NLooksAheadStrategy.get_legal_play_codes(board, color):
             # avoid circular import
             # if RuleChecker.is_winning_play(board, *play):
             #     result_plays.append(play)
-            # print("checking", play)  # debug
-            if len(play[1]) == 1:
-                result_plays.append(play)
-            else:
-                opposition_win = False
-                worker = play[0]
-                move_dir, build_dir = play[1]
+            if code & PlayCode.WIN_FLAG or NLooksAheadStrategy._survives(board, color, opp_color, code, num_look_ahead,
+                                                                         table, clock):
+                result_codes.append(code)
 
-                # player play
-                board.move(worker, move_dir)
-                board.build(worker, build_dir)
+        return [PlayCode.decode(code) for code in result_codes]
 
-                opp_legal_plays = NLooksAheadStrategy.get_legal_plays(board, opp_color)
-                if any(len(opp_play[1]) == 1 for opp_play in opp_legal_plays):  # try and prune search
-                    opposition_win = True
-                else:
-                    for opp_play in opp_legal_plays:
-                        # avoid circular import
-                        # if RuleChecker.is_winning_play(board, *opp_play):
-                        #     opposition_win = True
-                        #     break
-                        if len(opp_play[1]) == 1:
-                            opposition_win = True
-                            break
-                        elif num_look_ahead > 1:
-                            opp_worker = opp_play[0]
-                            opp_move_dir, opp_build_dir = opp_play[1]
+    @staticmethod
+    def _survives(board, color, opp_color, code, num_look_ahead, table=None, clock=None):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :param str opp_color: the other color.
+        :param int code: the play code (as defined in the documentation of `PlayCode`) of a legal play that doesn't win.
+        :param int num_look_ahead: number of moves to look ahead by.
+        :param TranspositionTable table: see `get_plays()`.
+        :param SearchClock clock: see `get_plays()`.
+        :return: `True` if the play cannot result in the opposing player winning within `num_look_ahead` moves.
+        :rtype: bool
+        """
+        opposition_win = False
+
+        # player play
+        board.make_play_code(code)
+
+        if RuleChecker.has_winning_move(board, opp_color):  # try and prune search
+            opposition_win = True
+        elif num_look_ahead > 1:
+            for opp_code in NLooksAheadStrategy.iter_legal_play_codes(board, opp_color):
+                # avoid circular import
+                # if RuleChecker.is_winning_play(board, *opp_play):
+                #     opposition_win = True
+                #     break
 
-                            # opposition play
-                            board.move(opp_worker, opp_move_dir)
-                            board.build(opp_worker, opp_build_dir)
+                # opposition play
+                board.make_play_code(opp_code)
 
-                            opposition_win = NLooksAheadStrategy._loses_in_n_moves(board, color, num_look_ahead - 1)
+                opposition_win = NLooksAheadStrategy._loses_in_n_moves(board, color, num_look_ahead - 1, table, clock)
 
-                            # undoing opposition play
-                            board.undo_build(opp_worker, opp_build_dir)
-                            board.move(opp_worker, board.get_opposite_direction(opp_move_dir))
+                # undoing opposition play
+                board.unmake()
 
-                            if opposition_win:
-                                break
+                if opposition_win:
+                    break
 
-                # undoing player play
-                board.undo_build(worker, build_dir)
-                board.move(worker, board.get_opposite_direction(move_dir))
+        # undoing player play
+        board.unmake()
 
-                if not opposition_win:
-                    result_plays.append(play)
+        return not opposition_win
+
+    def _get_plays_parallel(self, board, color, num_look_ahead, clock=None):
+        """
+        Same as `get_plays()`, but with the plays that don't win searched in parallel on the search pool (see
+        `SearchPool`), one task per play. The board is shipped to the worker processes encoded (see `Board.encode`),
+        and each worker process keeps its transposition table between tasks: its own, or the shared table named
+        `self.table_name`, so that the workers reuse each other's results. The result is the same as `get_plays()`'s.
+        The worker processes only see the clock's deadline, not its stop event, so stopping the search waits for the
+        tasks already sent.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :param int num_look_ahead: number of moves to look ahead by
+        :param SearchClock clock: the deadline of the search, or `None`. Raises `SearchTimeout` once it passes.
+        :return: a `list` of legal plays (as defined above)
+        :rtype: `list`
+        """
+        codes = self.get_legal_play_codes(board, color)
+        searched = [code for code in codes if not code & PlayCode.WIN_FLAG]
+        num_searched = len(searched)
+        deadline = clock.deadline if clock is not None else None
+        pool = SearchPool.get_pool(self.num_processes)
+        results = dict(zip(searched, pool.map(NLooksAheadStrategy._search_root_play, [board.encode()] * num_searched,
+                                              [color] * num_searched, searched, [num_look_ahead] * num_searched,
+                                              [self.table_size] * num_searched, [deadline] * num_searched,
+                                              [self.table_name] * num_searched)))
+        if None in results.values():
+            raise SearchTimeout("Search deadline passed in a worker process.")
+        return [PlayCode.decode(code) for code in codes if code & PlayCode.WIN_FLAG or results[code]]
+
+    @staticmethod
+    def _search_root_play(encoded_board, color, code, num_look_ahead, table_size, deadline, table_name=None):
+        """
+        Runs in a worker process of the search pool: checks one play of `_get_plays_parallel()` with `_survives()`.
 
-        return result_plays
+        :param bytes encoded_board: the encoded board (see `Board.encode`).
+        :param str color: color (as defined above) to move.
+        :param int code: the play code of the play to check.
+        :param int num_look_ahead: number of moves to look ahead by
+        :param int table_size: the memory cap of the worker process's transposition table, in bytes.
+        :param float deadline: the `time.monotonic()` time by which to stop searching, or `None`.
+        :param str table_name: the name of the shared table to use, or `None` for a table of the worker process only.
+        :return: the result of `_survives()`, or `None` if the deadline passed.
+        :rtype: bool, None
+        """
+        board = BitBoard()
+        board.set_board(Board.decode(encoded_board))
+        board.set_side_to_move(color)
+        table_key = (table_size, table_name)
+        if table_key not in NLooksAheadStrategy._worker_tables:
+            NLooksAheadStrategy._worker_tables[table_key] = NLooksAheadStrategy._create_table(table_size, table_name)
+        table = NLooksAheadStrategy._worker_tables[table_key]
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        try:
+            return NLooksAheadStrategy._survives(board, color, opp_color, code, num_look_ahead, table,
+                                                 SearchClock(deadline) if deadline is not None else None)
+        except SearchTimeout:
+            return None
 
     @staticmethod
-    def _loses_in_n_moves(board, color, n):
+    def _loses_in_n_moves(board, color, n, table=None, clock=None):
         """
+        The result for a position is only reused from `table` if it was searched to exactly `n` moves, since this
+        search's result isn't monotonic in `n`.
 
         :param Board board:
         :param str color:
         :param int n:
+        :param TranspositionTable table:
+        :param SearchClock clock:
         :return:
         :rtype: bool
         """
         if n == 0:
             return False
+        if clock is not None:
+            clock.tick()
 
         opp_color = "blue" if color == "white" else "white"
 
-        legal_plays = NLooksAheadStrategy.get_legal_plays(board, color)
-        if all(len(play[1]) == 1 for play in legal_plays):
+        if RuleChecker.has_winning_move(board, color):
             return False
 
-        loses = True  # if the player has no plays, which means player lost, which means loop never executes
-        for play in legal_plays:
-            if len(play[1]) == 1:
-                continue
-            worker = play[0]
-            move_dir, build_dir = play[1]
+        if table is not None:
+            key = board.hash()
+            entry = table.probe(key)
+            if entry is not None and entry[0] == n:
+                return entry[2] > 0
 
+        loses = True  # if the player has no plays, which means player lost, which means loop never executes
+        for code in NLooksAheadStrategy.iter_legal_play_codes(board, color):
             # player play
-            board.move(worker, move_dir)
-            board.build(worker, build_dir)
+            board.make_play_code(code)
 
-            opp_legal_plays = NLooksAheadStrategy.get_legal_plays(board, opp_color)
-            if any(len(opp_play[1]) == 1 for opp_play in opp_legal_plays):  # try and prune search
+            if RuleChecker.has_winning_move(board, opp_color):  # try and prune search
                 loses = True
             else:
                 loses = False  # if opposition has no plays, which means player wins, which means loop never executes
-                for opp_play in opp_legal_plays:
-                    # avoid circular import
-                    # if RuleChecker.is_winning_play(board, *opp_play):
-                    #     loses = True
-                    if len(opp_play[1]) == 1:
-                        loses = True
-                        break
-                    elif n > 1:
-                        opp_worker = opp_play[0]
-                        opp_move_dir, opp_build_dir = opp_play[1]
+                if n > 1:
+                    for opp_code in NLooksAheadStrategy.iter_legal_play_codes(board, opp_color):
+                        # avoid circular import
+                        # if RuleChecker.is_winning_play(board, *opp_play):
+                        #     loses = True
 
                         # opposition play
-                        board.move(opp_worker, opp_move_dir)
-                        board.build(opp_worker, opp_build_dir)
+                        board.make_play_code(opp_code)
 
-                        loses = NLooksAheadStrategy._loses_in_n_moves(board, color, n - 1)  # recurse
+                        loses = NLooksAheadStrategy._loses_in_n_moves(board, color, n - 1, table, clock)  # recurse
 
                         # undoing opposition play
-                        board.undo_build(opp_worker, opp_build_dir)
-                        board.move(opp_worker, board.get_opposite_direction(opp_move_dir))
+                        board.unmake()
 
                         if loses:
                             break
 
             # undoing player play
-            board.undo_build(worker, build_dir)
-            board.move(worker, board.get_opposite_direction(move_dir))
+            board.unmake()
 
             if loses:
                 break
 
+        if table is not None:
+            table.store(key, n, TranspositionTable.EXACT, 1.0 if loses else 0.0)
         return loses
 
 
 class SmartStrategy(BaseStrategy):
-    def __init__(self, num_looks_ahead=1):
+
+    WIN_SCORE = 161
+
+    def __init__(self, num_looks_ahead=1, table_size=TranspositionTable.DEFAULT_MAX_BYTES, table_name=None,
+                 endgame_solver=None):
         if not isinstance(num_looks_ahead, int) or num_looks_ahead < 1:
             raise ContractViolation("num_looks_ahead must be a positive integer! Given: {}".format(num_looks_ahead))
         self.num_looks_ahead = num_looks_ahead
+        self.table = self._create_table(table_size, table_name)  # kept between plays, see _score_look_ahead()
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
 
     def get_placements(self, board, color):
+        placements = self._get_book_placements(board)
+        if placements is not None:
+            return placements
+
         opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
         opp_workers = [opp_color + "1", opp_color + "2"]
 
@@ -369,154 +614,163 @@ class SmartStrategy(BaseStrategy):
             return self._get_placements_helper(board, opp_workers)
 
     def _get_placements_helper(self, board, opp_workers):
-        distances = {}
+        distances = []
 
         rows, cols = board.get_dimensions()
         for row in range(rows):
             for col in range(cols):
-                distances[str(row) + str(col)] = SmartStrategy._get_worker_distance(board, row, col, opp_workers[0]) + \
-                                                 SmartStrategy._get_worker_distance(board, row, col, opp_workers[1])
-
-        distances_list = [(coor, distances[coor]) for coor in distances]
-        distances_list.sort(key=lambda x: x[1], reverse=True)
-
-        placements = []
-
-        # for i in range(2):
-        #     coor_str = distances_list[i][0]
-        #     coor_len = len(coor_str)
-        #
-        #     placement_row = int(coor_str[0:coor_len//2])
-        #     placement_col = int(coor_str[coor_len//2:coor_len])
-        #
-        #     placements.append([placement_row, placement_col])
+                distances.append(([row, col], SmartStrategy._get_worker_distance(board, row, col, opp_workers[0]) +
+                                  SmartStrategy._get_worker_distance(board, row, col, opp_workers[1])))
 
-        far_coor_str = distances_list[0][0]
-        far_coor_len = len(far_coor_str)
-        clo_coor_str = distances_list[len(distances_list) - 3][0]
-        clo_coor_len = len(clo_coor_str)
+        distances.sort(key=lambda x: x[1], reverse=True)
 
-        far_placement_row = int(far_coor_str[0:far_coor_len // 2])
-        far_placement_col = int(far_coor_str[far_coor_len // 2:far_coor_len])
-        clo_placement_row = int(clo_coor_str[0:clo_coor_len // 2])
-        clo_placement_col = int(clo_coor_str[clo_coor_len // 2:clo_coor_len])
+        # the cell furthest from the opponent's workers, and the third closest
+        return [distances[0][0], distances[len(distances) - 3][0]]
 
-        placements.append([far_placement_row, far_placement_col])
-        placements.append([clo_placement_row, clo_placement_col])
-
-        return placements
+    def get_play(self, board, color, deadline=None):
+        """
+        Returns a winning play if there is one, else the play `self.endgame_solver` finds if it solves the board, else
+        the play with the best `_score_look_ahead()`. If the deadline passes or `self.stop_event` is set first, the best
+        play scored so far is returned.
 
-    def get_play(self, board, color):
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :param float deadline: see `BaseStrategy.get_play`.
+        :return: a legal play (as defined above)
+        :rtype: list
+        """
         print("strategizing...")  # debug
-        plays = self.get_legal_plays(board, color)
-        if not plays:
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
             return []
+        clock = self._start_clock(deadline, None)
+        if not any(code & PlayCode.WIN_FLAG for code in codes):
+            solved = self._solve_endgame(board, color, codes, clock)
+            if solved is not None:
+                return PlayCode.decode(solved[0])
 
-        play_data = {}
+        board.set_side_to_move(color)  # the board's hash keys the table
         play_scores = {}
-        play_win_pcts = {}
-        play_loss_pcts = {}
+        num_plays = len(board.undo_stack)
 
-        for play in plays:
-            worker, directions = play
+        try:
+            for code in codes:
+                if code & PlayCode.WIN_FLAG:
+                    return PlayCode.decode(code)
 
-            if len(directions) == 1:
-                return play
+                board.make_play_code(code)
+                play_scores[code] = self._score_look_ahead(board, color, False, self.num_looks_ahead, clock)
+                board.unmake()
+        except SearchTimeout:
+            self._rewind(board, num_plays)
+            if not play_scores:
+                return PlayCode.decode(codes[0])
 
-            move_dir, build_dir = directions
+        return PlayCode.decode(max(play_scores, key=play_scores.get))
 
-            board.move(worker, move_dir)
-            board.build(worker, build_dir)
-
-            play_str = worker + move_dir + build_dir
-
-            play_data[play_str] = play
-            play_scores[play_str] = 0
-            play_win_pcts[play_str] = 0
-            play_loss_pcts[play_str] = 0
-
-            self._score_look_ahead(board, play_str, play_scores, play_win_pcts, play_loss_pcts, color, False, 1, self.num_looks_ahead)
-
-            win_score = play_win_pcts[play_str] * 161
-            loss_score = play_loss_pcts[play_str] * -161
-            play_scores[play_str] += win_score + loss_score
-
-            board.undo_build(worker, build_dir)
-            board.move(worker, board.get_opposite_direction(move_dir))
+    def _score_look_ahead(self, board, color, is_turn, num_looks_ahead, clock=None):
+        """
+        Scores a board for the player of the given color by looking `num_looks_ahead` turns ahead. A turn that can win
+        scores `WIN_SCORE` for the player making it, and a turn with no plays `WIN_SCORE` for the other player. Other
+        turns score the average of their plays' scores, or, on the last turn looked at, the `_score_board()` of the best
+        play for the player making it.
 
-        results = [(play, play_scores[play]) for play in play_scores]
-        results.sort(key=lambda x: x[1], reverse=True)
-        return play_data[results[0][0]]
+        Scores only depend on the board, the side to move and `num_looks_ahead`, so they are cached in `self.table`,
+        from the point of view of the side to move.
 
-    def _score_look_ahead(self, board, play, play_scores, play_win_pcts, play_loss_pcts, color, is_turn, prop, num_looks_ahead):
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to score the board for.
+        :param bool is_turn: `True` if it is the turn of `color`, else `False`.
+        :param int num_looks_ahead: number of turns to look ahead by.
+        :param SearchClock clock: the clock of the search, or `None`. Raises `SearchTimeout` once it runs out.
+        :return: the score of the board for `color`.
+        :rtype: float
+        """
+        if clock is not None:
+            clock.tick()
         if is_turn:
             turn_color = color
+            sign = 1
         else:
             turn_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+            sign = -1
 
-        turn_plays = self.get_legal_plays(board, turn_color)
-        if not turn_plays:
-            if is_turn:
-                play_loss_pcts[play] += prop
-            else:
-                play_win_pcts[play] += prop
-            return
-
-        for turn_play in turn_plays:
-            turn_worker, turn_directions = turn_play
-            if len(turn_directions) == 1:
-                if is_turn:
-                    play_win_pcts[play] += prop
-                else:
-                    play_loss_pcts[play] += prop
-                return
-
-        # prop /= len(turn_plays)
+        if RuleChecker.has_winning_move(board, turn_color):
+            return sign * SmartStrategy.WIN_SCORE
 
-        best_score = None
-
-        for turn_play in turn_plays:
-            turn_worker, turn_directions = turn_play
-            turn_move_dir, turn_build_dir = turn_directions
+        key = board.hash()
+        entry = self.table.probe(key)
+        if entry is not None and entry[0] == num_looks_ahead:
+            return sign * entry[2]
 
-            board.move(turn_worker, turn_move_dir)
-            board.build(turn_worker, turn_build_dir)
+        turn_codes = self.get_legal_play_codes(board, turn_color)
+        if not turn_codes:
+            return -sign * SmartStrategy.WIN_SCORE
 
-            if num_looks_ahead > 1:
-                # self._score_look_ahead(board, play, play_scores, play_win_pcts, play_loss_pcts, color, (not is_turn), prop, num_looks_ahead-1)
-                self._score_look_ahead(board, play, play_scores, play_win_pcts, play_loss_pcts, color, (not is_turn),
-                                       (prop / len(turn_plays)), num_looks_ahead - 1)
-            else:
-                # play_scores[play] += self._score_board(board, color) * prop
-                turn_score = self._score_board(board, color)
-                if best_score is None:
-                    best_score = turn_score
-                elif (is_turn and turn_score > best_score) or (not is_turn and turn_score < best_score):
+        best_score = None
+        best_code = TranspositionTable.NO_MOVE
+        total_score = 0
+
+        if num_looks_ahead > 1:
+            for turn_code in turn_codes:
+                board.make_play_code(turn_code)
+                total_score += self._score_look_ahead(board, color, (not is_turn), num_looks_ahead - 1, clock)
+                board.unmake()
+        else:
+            for turn_code, turn_score in zip(turn_codes, self._score_children(board, color, turn_codes)):
+                if best_score is None or (is_turn and turn_score > best_score) or (not is_turn and turn_score < best_score):
                     best_score = turn_score
+                    best_code = turn_code
 
-            board.undo_build(turn_worker, turn_build_dir)
-            board.move(turn_worker, board.get_opposite_direction(turn_move_dir))
-
-        if best_score is not None:
-            play_scores[play] += best_score * prop
+        score = best_score if best_score is not None else total_score / len(turn_codes)
+        self.table.store(key, num_looks_ahead, TranspositionTable.EXACT, sign * score, best_code)
+        return score
 
     def _score_board(self, board, color):
         opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
         return self._score_board_helper(board, color) - self._score_board_helper(board, opp_color)
 
+    def _score_children(self, board, color, codes):
+        """
+        Returns the `_score_board()` of the board after each of the given plays. With NumPy installed, every child is
+        scored at once (see `BatchEvaluator`), else each play is made, scored and unmade in turn.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to score the boards for.
+        :param list codes: play codes (as defined in the documentation of `PlayCode`) of legal plays on the board.
+        :return: the scores, in the order of the plays.
+        :rtype: list
+        """
+        if BatchEvaluator.is_available():
+            scores = BatchEvaluator.get_smart_scores(*BatchEvaluator.get_children(board, codes), board.get_dimensions())
+            color_index = RuleChecker.COLORS.index(color)
+            return (scores[:, color_index] - scores[:, 1 - color_index]).tolist()
+
+        scores = []
+        for code in codes:
+            board.make_play_code(code)
+            scores.append(self._score_board(board, color))
+            board.unmake()
+        return scores
+
     @staticmethod
     def _score_board_helper(board, color):
+        """
+        Scores the workers of the given color: 16 points per level a worker stands on, and for each cell adjacent to
+        it, 3 points per level of a building that isn't domed, less the worker's height, and -1 if the cell has a
+        worker on it. The sums over the adjacent cells are kept by the board (see `Board.get_neighbor_sums`).
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :return: the score of the workers.
+        :rtype: int
+        """
         score = 0
-        workers = [color + "1", color + "2"]
-        for worker in workers:
-            row, col, height = board.get_worker_position(worker)
-            score += height * 16
-            for direction in RuleChecker.DIRECTIONS:
-                adj_height = board.get_height(worker, direction)
-                if adj_height and adj_height < 4:
-                    score += adj_height * 2 + adj_height - height
-                if board.is_occupied(worker, direction):
-                    score -= 1
+        for worker in (color + "1", color + "2"):
+            height, neighbor_sums, num_workers = board.get_neighbor_sums(worker)
+            building_sum = neighbor_sums >> Board.BUILDING_SUM_SHIFT & Board.SUM_MASK
+            building_count = neighbor_sums >> Board.BUILDING_COUNT_SHIFT
+            score += height * 16 + building_sum * 3 - height * building_count - num_workers
         return score
 
     @staticmethod
@@ -530,6 +784,412 @@ class SmartStrategy(BaseStrategy):
         return distance
 
 
+class AlphaBetaStrategy(SmartStrategy):
+    """
+    Strategy implementation that searches `depth` plies ahead with negamax, alpha-beta pruning and principal variation
+    search, scoring the boards at the leaves with the `SmartStrategy` heuristic.
+
+    Search results are cached in a transposition table (see `TranspositionTable`), and the plays of every node are
+    ordered by a `MoveOrderer`, starting with the table's best play, so that the pruning cuts off as early as possible.
+    `self.orderer.get_stats()` reports how often that worked.
+    """
+
+    WIN_SCORE = 1000000
+    WIN_THRESHOLD = WIN_SCORE // 2  # scores beyond this are wins or losses, at a distance of WIN_SCORE - |score| plies
+
+    def __init__(self, depth=4, table_size=TranspositionTable.DEFAULT_MAX_BYTES, time_per_move=None, table_name=None,
+                 endgame_solver=None):
+        if not isinstance(depth, int) or depth < 1:
+            raise ContractViolation("depth must be a positive integer! Given: {}".format(depth))
+        if time_per_move is not None and (not isinstance(time_per_move, (int, float)) or time_per_move <= 0):
+            raise ContractViolation("time_per_move must be a positive number! Given: {}".format(time_per_move))
+        super().__init__(table_size=table_size, table_name=table_name, endgame_solver=endgame_solver)
+        self.depth = depth
+        self.time_per_move = time_per_move
+        self.orderer = MoveOrderer()
+
+    def get_play(self, board, color, deadline=None):
+        """
+        Returns a winning play if there is one, else the play with the best negamax score `self.depth` plies ahead.
+        See `search()`.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :param float deadline: see `BaseStrategy.get_play`.
+        :return: a legal play (as defined above)
+        :rtype: list
+        """
+        best_code, score = self.search(board, color, deadline)
+        return PlayCode.decode(best_code) if best_code is not None else []
+
+    def search(self, board, color, deadline=None):
+        """
+        Searches for the play with the best negamax score `self.depth` plies ahead, or a winning play.
+
+        The search deepens 1, 2, ... plies at a time. If there is a deadline (or `self.time_per_move`), the best play
+        of the deepest search that finished in time is returned. The 1-ply search always finishes.
+
+        Endgames that `self.endgame_solver` solves aren't searched: the play it finds scores as a win or loss that far
+        away.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :param float deadline: see `BaseStrategy.get_play`.
+        :return: the play code (as defined in the documentation of `PlayCode`) of the play and its score for `color`,
+        or `None` and -`WIN_SCORE` if `color` has no legal plays.
+        :rtype: tuple
+        """
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
+            return None, -AlphaBetaStrategy.WIN_SCORE
+        for code in codes:
+            if code & PlayCode.WIN_FLAG:
+                return code, AlphaBetaStrategy.WIN_SCORE
+
+        clock = self._start_clock(deadline, self.time_per_move)
+        solved = self._solve_endgame(board, color, codes, clock)
+        if solved is not None:
+            code, won, num_plies = solved
+            return code, AlphaBetaStrategy.WIN_SCORE - num_plies if won else num_plies - AlphaBetaStrategy.WIN_SCORE
+
+        board.set_side_to_move(color)  # the board's hash keys the table
+        self.orderer.new_search()
+        num_plays = len(board.undo_stack)
+        # searching 1, 2, ... plies first fills the table with the best plays to search first at the next depth, which
+        # makes the pruning at `self.depth` cut off much earlier than searching it straight away
+        best_code, score = self._search_root(board, color, codes, 1)
+        for depth in range(2, self.depth + 1):
+            if abs(score) > AlphaBetaStrategy.WIN_THRESHOLD:  # a forced win or loss, deeper searches won't change it
+                break
+            try:
+                best_code, score = self._search_root(board, color, codes, depth, clock)
+            except SearchTimeout:
+                self._rewind(board, num_plays)
+                break
+        return best_code, score
+
+    def _search_root(self, board, color, codes, depth, clock=None):
+        """
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :param list codes: the play codes of the legal plays of `color`.
+        :param int depth: number of plies to search.
+        :param SearchClock clock: the deadline of the search, or `None`. Raises `SearchTimeout` once it passes.
+        :return: the play code of the best play, and its score.
+        :rtype: tuple
+        """
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        entry = self.table.probe(board.hash())
+        codes = self.orderer.order(board, codes, 0, entry[3] if entry is not None else TranspositionTable.NO_MOVE)
+        alpha, beta = -AlphaBetaStrategy.WIN_SCORE - 1, AlphaBetaStrategy.WIN_SCORE + 1
+        ply = 0
+        best_code = codes[0]
+        for count, code in enumerate(codes):
+            board.make_play_code(code)
+            if count == 0:
+                score = -self._negamax(board, opp_color, depth - 1, ply + 1, -beta, -alpha, clock)
+            else:
+                score = -self._negamax(board, opp_color, depth - 1, ply + 1, -alpha - 1, -alpha, clock)
+                if score > alpha:
+                    score = -self._negamax(board, opp_color, depth - 1, ply + 1, -beta, -score, clock)
+            board.unmake()
+            if score > alpha:
+                alpha = score
+                best_code = code
+        self.table.store(board.hash(), depth, TranspositionTable.EXACT, alpha, best_code)
+        return best_code, alpha
+
+    def _negamax(self, board, color, depth, ply, alpha, beta, clock=None):
+        """
+        Scores a board for the player of the given color, who is to move, with a principal variation search of `depth`
+        plies. Only the first play of a node is searched with the full window, the others with a null window that is
+        re-opened if they turn out to be better.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :param int depth: number of plies left to search.
+        :param int ply: number of plies made since the root of the search.
+        :param int alpha: the score `color` is already guaranteed elsewhere in the tree.
+        :param int beta: the score the opponent is already guaranteed elsewhere in the tree.
+        :param SearchClock clock: the deadline of the search, or `None`. Raises `SearchTimeout` once it passes.
+        :return: the score of the board for `color` if it is within (alpha, beta), else a bound beyond that window.
+        :rtype: int
+        """
+        if clock is not None:
+            clock.tick()
+        if RuleChecker.has_winning_move(board, color):
+            return AlphaBetaStrategy.WIN_SCORE
+        if depth == 0:
+            return self._score_board(board, color)
+
+        key = board.hash()
+        entry = self.table.probe(key)
+        tt_code = TranspositionTable.NO_MOVE
+        if entry is not None:
+            entry_depth, flag, value, tt_code = entry
+            if entry_depth >= depth:
+                if flag == TranspositionTable.EXACT:
+                    return value
+                elif flag == TranspositionTable.LOWER_BOUND:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value
+
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
+            return -AlphaBetaStrategy.WIN_SCORE
+        codes = self.orderer.order(board, codes, ply, tt_code)
+
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        original_alpha = alpha
+        best_score = -AlphaBetaStrategy.WIN_SCORE - 1
+        best_code = TranspositionTable.NO_MOVE
+        for count, code in enumerate(codes):
+            board.make_play_code(code)
+            if count == 0:
+                score = -self._negamax(board, opp_color, depth - 1, ply + 1, -beta, -alpha, clock)
+            else:
+                score = -self._negamax(board, opp_color, depth - 1, ply + 1, -alpha - 1, -alpha, clock)
+                if alpha < score < beta:
+                    score = -self._negamax(board, opp_color, depth - 1, ply + 1, -beta, -score, clock)
+            board.unmake()
+            # wins and losses further away score closer to 0, so that the quickest win is preferred
+            if score > AlphaBetaStrategy.WIN_THRESHOLD:
+                score -= 1
+            elif score < -AlphaBetaStrategy.WIN_THRESHOLD:
+                score += 1
+            if score > best_score:
+                best_score = score
+                best_code = code
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.orderer.record_cutoff(board, code, ply, depth, count, tt_code)
+                        break
+
+        if best_score <= original_alpha:
+            flag = TranspositionTable.UPPER_BOUND
+        elif best_score >= beta:
+            flag = TranspositionTable.LOWER_BOUND
+        else:
+            flag = TranspositionTable.EXACT
+        self.table.store(key, depth, flag, best_score, best_code)
+        return best_score
+
+
+class MCTSNode:
+    """
+    A node of the tree grown by `MCTSStrategy`: the board after one more play than its parent's.
+
+    Definitions:
+
+    mover
+        `str`. The color (as defined in the documentation of `BaseStrategy`) that made the node's play, whose wins the
+        node counts.
+
+    winner
+        `str`. The color that wins from the node, if the game is decided there, else `None`.
+    """
+
+    __slots__ = ("code", "parent", "mover", "untried", "children", "visits", "wins", "winner")
+
+    def __init__(self, code, parent, mover, untried, winner=None):
+        """
+        :param int code: the play code (as defined in the documentation of `PlayCode`) of the node's play, or `None`
+        at the root.
+        :param MCTSNode parent: the parent node, or `None` at the root.
+        :param str mover: the mover (as defined above).
+        :param list untried: the play codes of the legal plays from the node that don't have a child yet.
+        :param str winner: the winner (as defined above), or `None`.
+        """
+        self.code = code
+        self.parent = parent
+        self.mover = mover
+        self.untried = untried
+        self.children = []
+        self.visits = 0
+        self.wins = 0
+        self.winner = winner
+
+    def select_child(self, exploration):
+        """
+        :param float exploration: the weight of the exploration term of the UCT formula.
+        :return: the child with the highest UCT score, i.e. win rate plus exploration bonus for rarely visited children.
+        :rtype: MCTSNode
+        """
+        log_visits = math.log(self.visits)
+        return max(self.children,
+                   key=lambda child: child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits))
+
+
+class MCTSStrategy(BaseStrategy):
+    """
+    Strategy implementation that runs a Monte Carlo tree search: each iteration walks down the tree picking children by
+    UCT, adds one child for an untried play, plays random plays from there until a player wins, and counts the result
+    in every node on the way back up. The most visited play at the root is played.
+
+    Playouts make and unmake plays on the board itself, using `has_winning_move()` and `random_play_code()` rather than
+    generating every legal play each turn. Every play that doesn't win builds, so a playout always ends.
+
+    The search runs for `iterations` playouts, or until a deadline (or `time_per_move`) if one is given, whichever comes
+    first. `get_stats()` reports how many playouts the last search ran, and how fast.
+    """
+
+    DEFAULT_ITERATIONS = 2000
+    EXPLORATION = math.sqrt(2)
+
+    def __init__(self, iterations=DEFAULT_ITERATIONS, time_per_move=None, exploration=EXPLORATION, endgame_solver=None):
+        if iterations is not None and (not isinstance(iterations, int) or iterations < 1):
+            raise ContractViolation("iterations must be a positive integer! Given: {}".format(iterations))
+        if time_per_move is not None and (not isinstance(time_per_move, (int, float)) or time_per_move <= 0):
+            raise ContractViolation("time_per_move must be a positive number! Given: {}".format(time_per_move))
+        self.iterations = iterations
+        self.time_per_move = time_per_move
+        self.exploration = exploration
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+        self.stats = {"playouts": 0, "seconds": 0.0, "playouts_per_second": 0.0}
+
+    def get_placements(self, board, color):
+        """
+        Returns worker placements from the opening book (see `OpeningBook`), or random placements, as `RandomStrategy`
+        does, if the board isn't in the book.
+        See `BaseStrategy.get_placements`.
+        """
+        placements = self._get_book_placements(board)
+        if placements is not None:
+            return placements
+        return RandomStrategy().get_placements(board, color)
+
+    def get_play(self, board, color, deadline=None):
+        """
+        Returns a winning play if there is one, else the play `self.endgame_solver` finds if it solves the board, else
+        the most visited play at the root of the search.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above)
+        :param float deadline: see `BaseStrategy.get_play`. With neither a deadline, a time per move nor a number of
+        iterations, the search would never stop, so `DEFAULT_ITERATIONS` are run.
+        :return: a legal play (as defined above)
+        :rtype: list
+        """
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
+            return []
+        for code in codes:
+            if code & PlayCode.WIN_FLAG:
+                return PlayCode.decode(code)
+        if len(codes) == 1:
+            return PlayCode.decode(codes[0])
+
+        if deadline is None and self.time_per_move is not None:
+            deadline = time.monotonic() + self.time_per_move
+        solved = self._solve_endgame(board, color, codes, self._start_clock(deadline, None))
+        if solved is not None:
+            return PlayCode.decode(solved[0])
+        iterations = self.iterations
+        if iterations is None and deadline is None:
+            iterations = MCTSStrategy.DEFAULT_ITERATIONS
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        root = MCTSNode(None, None, opp_color, list(codes))
+        start = time.monotonic()
+        playouts = 0
+        while iterations is None or playouts < iterations:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            if self.stop_event is not None and self.stop_event.is_set():
+                break
+            self._run_iteration(board, root)
+            playouts += 1
+
+        seconds = time.monotonic() - start
+        self.stats = {"playouts": playouts, "seconds": seconds,
+                      "playouts_per_second": playouts / seconds if seconds else 0.0}
+        if not root.children:  # the deadline passed before the first playout
+            return PlayCode.decode(random.choice(codes))
+        return PlayCode.decode(max(root.children, key=lambda child: child.visits).code)
+
+    def get_stats(self):
+        """
+        :return: the number of playouts the last search ran, how many seconds it took, and the playouts per second.
+        :rtype: dict
+        """
+        return dict(self.stats)
+
+    def _run_iteration(self, board, root):
+        """
+        Runs one selection, expansion, playout and backpropagation from the root, leaving the board as it was.
+
+        :param Board board: the board of the root (refer to documentation of Board class).
+        :param MCTSNode root: the root of the tree.
+        :rtype: void
+        """
+        num_plays = len(board.undo_stack)
+        node = root
+        while node.winner is None and not node.untried and node.children:
+            node = node.select_child(self.exploration)
+            board.make_play_code(node.code)
+        if node.winner is None and node.untried:
+            code = node.untried.pop(random.randrange(len(node.untried)))
+            board.make_play_code(code)
+            node = self._expand(board, node, code)
+        winner = node.winner
+        if winner is None:
+            winner = self._playout(board, RuleChecker.COLORS[0] if node.mover == RuleChecker.COLORS[1]
+                                   else RuleChecker.COLORS[1])
+        self._rewind(board, num_plays)
+
+        while node is not None:
+            node.visits += 1
+            if node.mover == winner:
+                node.wins += 1
+            node = node.parent
+
+    @staticmethod
+    def _expand(board, parent, code):
+        """
+        Adds the child of the given node for the given play, which has been made on the board.
+
+        :param Board board: the board after the play (refer to documentation of Board class).
+        :param MCTSNode parent: the node the play was made from.
+        :param int code: the play code of the play.
+        :return: the new child.
+        :rtype: MCTSNode
+        """
+        mover = RuleChecker.COLORS[0] if parent.mover == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        opp_color = parent.mover
+        # plays are only expanded from nodes where the mover had no win, so the play doesn't win
+        if board.has_winning_move(opp_color):  # the opponent will take the win, no need to search it
+            child = MCTSNode(code, parent, mover, [], opp_color)
+        else:
+            untried = board.generate_play_codes(opp_color)
+            child = MCTSNode(code, parent, mover, untried, None if untried else mover)
+        parent.children.append(child)
+        return child
+
+    @staticmethod
+    def _playout(board, color):
+        """
+        Plays random plays on the board, taking a win whenever there is one, until a player wins. The plays are left
+        on the board.
+
+        :param Board board: an instance of Board (refer to documentation of Board class).
+        :param str color: color (as defined above) to move.
+        :return: the color of the winner.
+        :rtype: str
+        """
+        opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+        while True:
+            if board.has_winning_move(color):
+                return color
+            code = board.random_play_code(color)
+            if code is None:  # a player who can't play loses
+                return opp_color
+            board.make_play_code(code)
+            color, opp_color = opp_color, color
+
+
 class GreedyStrategy(BaseStrategy):
     """
     Implementation of strategy that greedily chooses a play based on scoring a board using a heuristic.
@@ -538,9 +1198,17 @@ class GreedyStrategy(BaseStrategy):
     different types of heuristics. Make _score_board() an abstract method.
     """
 
+    def __init__(self, endgame_solver=None):
+        """
+        :param EndgameSolver endgame_solver: the solver to try before scoring the plays (see `EndgameSolver`), or
+        `None` for one with the default thresholds.
+        """
+        self.endgame_solver = endgame_solver if endgame_solver is not None else EndgameSolver()
+
     def get_placements(self, board, color):
         """
-        # TODO - create heuristic for placements too, returns random worker placements of given color right now.
+        Returns worker placements of given color from the opening book (see `OpeningBook`), or random placements if
+        the board isn't in the book.
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
@@ -548,6 +1216,10 @@ class GreedyStrategy(BaseStrategy):
         worker respectively. See `worker` and `position` in Board.py documentation.
         :rtype: list
         """
+        placements = self._get_book_placements(board)
+        if placements is not None:
+            return placements
+
         num_rows, num_cols = board.get_dimensions()
         placements = []
         while len(placements) != 2:
@@ -559,41 +1231,53 @@ class GreedyStrategy(BaseStrategy):
         # may as well
         return placements
 
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         """
-        Returns the best play given a list of plays, using a heuristic function. Winning plays are returned immediately.
+        Returns the best play given a list of plays, using a heuristic function. Winning plays are returned immediately,
+        and endgames that `self.endgame_solver` solves are played as it says.
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
+        :param float deadline: the time by which to give up solving an endgame, see `BaseStrategy.get_play`.
         :return: a legal play (as defined above)
         :rtype: list
         """
-        plays = self.get_legal_plays(board, color)
-        if not plays:
+        codes = self.get_legal_play_codes(board, color)
+        if not codes:
             return []
+        if not any(code & PlayCode.WIN_FLAG for code in codes):
+            solved = self._solve_endgame(board, color, codes, self._start_clock(deadline, None))
+            if solved is not None:
+                return PlayCode.decode(solved[0])
+
+        for code in codes:
+            if code & PlayCode.WIN_FLAG:
+                return PlayCode.decode(code)
+
+        if BatchEvaluator.is_available():
+            scores = BatchEvaluator.get_greedy_scores(*BatchEvaluator.get_children(board, codes), board.get_dimensions())
+            scores = scores[:, RuleChecker.COLORS.index(color)].tolist()
+        else:
+            scores = []
+            for code in codes:
+                board.make_play_code(code)
+                scores.append(self._score_board(board, color))
+                board.unmake()
 
         best_score = 0
-        best_play = None
-        for play in plays:
-            worker, directions = play
-            if len(directions) == 1:
-                return play
-            move_dir, build_dir = directions
-            board.move(worker, move_dir)
-            board.build(worker, build_dir)
-            score = self._score_board(board, color)
+        best_code = None
+        for code, score in zip(codes, scores):
             if score > best_score:
                 best_score = score
-                best_play = play
-            board.undo_build(worker, build_dir)
-            board.move(worker, board.get_opposite_direction(move_dir))
-        return best_play
+                best_code = code
+        return PlayCode.decode(best_code) if best_code is not None else None
 
     @staticmethod
     def _score_board(board, color):
         """
         A heuristic function used to score a given board for a player of a given color. It assigns points for the height
-        of cells under and adjacent to the player's workers.
+        of cells under and adjacent to the player's workers. The heights of the adjacent cells are summed by the board
+        (see `Board.get_neighbor_sums`).
 
         :param Board board: an instance of Board (refer to documentation of Board class).
         :param str color: color (as defined above)
@@ -601,17 +1285,83 @@ class GreedyStrategy(BaseStrategy):
         :rtype: float
         """
         score = 0
-        workers = [color + "1", color + "2"]
-        for worker in workers:
-            row, col, height = board.get_worker_position(worker)
-            score += height * 5
-            for direction in RuleChecker.DIRECTIONS:
-                adj_height = board.get_height(worker, direction)
-                if adj_height:
-                    score += adj_height
+        for worker in (color + "1", color + "2"):
+            height, neighbor_sums, num_workers = board.get_neighbor_sums(worker)
+            score += height * 5 + (neighbor_sums & Board.SUM_MASK)
         return score
 
 
+class OffloadedStrategy(BaseStrategy):
+    """
+    Runs another strategy's `get_play()` in a worker process of the search pool (see `SearchPool`), so that the search
+    holds neither the caller's thread nor the interpreter lock of its process, and the searches of several players
+    spread across cores. The caller's thread waits for the play. Placements are cheap, and are made in this process.
+
+    The strategy is shipped to the worker processes once pickled, without its transposition table. Each worker process
+    keeps a copy of every strategy it has seen, keyed by the pickle, with a table of the same size as the strategy's
+    own (or the same shared table, see `SharedTranspositionTable`), so it reuses the table between plays like the
+    strategy would. Strategies with the same pickle share one copy. Boards are shipped encoded (see `Board.encode`)
+    and plays come back as play codes (see `PlayCode`).
+    """
+
+    _worker_strategies = {}  # key-value pair of pickled strategy : strategy, in the search pool's worker processes
+
+    def __init__(self, strategy, num_processes):
+        """
+        :param BaseStrategy strategy: the strategy to run in the worker processes.
+        :param int num_processes: the number of worker processes of the search pool.
+        """
+        if not isinstance(strategy, BaseStrategy):
+            raise ContractViolation("Strategy must implement BaseStrategy interface!")
+        if not isinstance(num_processes, int) or num_processes < 1:
+            raise ContractViolation("num_processes must be a positive integer! Given: {}".format(num_processes))
+        self.strategy = strategy
+        self.num_processes = num_processes
+        shipped = copy.copy(strategy)
+        shipped.table = None
+        self.strategy_data = pickle.dumps(shipped)
+        if strategy.table is None:
+            self.table_spec = None
+        else:  # enough bytes for the same number of buckets, see `TranspositionTable`
+            self.table_spec = (strategy.table.size * TranspositionTable.ENTRY_BYTES,
+                               getattr(strategy.table, "name", None))
+
+    def get_placements(self, board, color):
+        return self.strategy.get_placements(board, color)
+
+    def get_play(self, board, color, deadline=None):
+        pool = SearchPool.get_pool(self.num_processes)
+        code = pool.submit(OffloadedStrategy._get_play_in_worker, self.strategy_data, self.table_spec, board.encode(),
+                           color, deadline).result()
+        return PlayCode.decode(code) if code is not None else []
+
+    @staticmethod
+    def _get_play_in_worker(strategy_data, table_spec, encoded_board, color, deadline):
+        """
+        Runs in a worker process of the search pool: plays the shipped strategy on the board.
+
+        :param bytes strategy_data: the pickled strategy, without its table.
+        :param tuple table_spec: the (max_bytes, name) of the strategy's table (see `BaseStrategy._create_table`), or
+        `None` if it has none.
+        :param bytes encoded_board: the encoded board (see `Board.encode`).
+        :param str color: color (as defined above) to move.
+        :param float deadline: the `time.monotonic()` time by which to return a play, or `None`.
+        :return: the play code of the strategy's play, or `None` if it has no play.
+        :rtype: int, None
+        """
+        strategy = OffloadedStrategy._worker_strategies.get(strategy_data)
+        if strategy is None:
+            strategy = pickle.loads(strategy_data)
+            if table_spec is not None:
+                strategy.table = BaseStrategy._create_table(*table_spec)
+            OffloadedStrategy._worker_strategies[strategy_data] = strategy
+        board = BitBoard()
+        board.set_board(Board.decode(encoded_board))
+        board.set_side_to_move(color)
+        play = strategy.get_play(board, color, deadline)
+        return PlayCode.encode(play) if play else None
+
+
 class InteractiveStrategy(BaseStrategy):
     """
     Implementation of strategy that allows manual selections to be made for plays and placements from the console.
@@ -633,7 +1383,7 @@ class InteractiveStrategy(BaseStrategy):
 
         return placements
 
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         InteractiveStrategy._display_board_state(board)
 
         worker = input("Please select {} worker to play with: ".format(color))
@@ -658,7 +1408,7 @@ class CheatingStrategy(BaseStrategy):
             placements.append([row, col])
         return placements
 
-    def get_play(self, board, color):
+    def get_play(self, board, color, deadline=None):
         workers = [color + "1", color + "2"]
         worker = random.choice(workers)
         directions = [random.choice(RuleChecker.DIRECTIONS)]
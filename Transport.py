@@ -0,0 +1,94 @@
+import json
+import socket
+
+
+class Transport:
+    """
+    Sends and receives messages over a connected socket, one JSON value per line. Whatever is received after the end
+    of a message is kept for the next one, so messages split across several reads, or read together, come out whole and
+    one at a time.
+
+    Received bytes go straight into a growable buffer through `memoryview`s (see `socket.recv_into`), which is only
+    searched for newlines past what was already searched, so reading a message is linear in its length. The buffer
+    doubles when a message doesn't fit, and the unread bytes are moved to its front when they sit behind a read one.
+
+    `TCP_NODELAY` is set on the socket: messages are small and each is waited on by the other side, so they are sent at
+    once rather than held back to be merged with the next (Nagle's algorithm).
+
+    Definitions:
+
+    message
+        `any` object that can be converted to json via json.dumps(), other than `None`.
+    """
+
+    INITIAL_BUFFER_SIZE = 4096
+
+    def __init__(self, conn):
+        """
+        :param socket.socket conn: a connected stream socket.
+        """
+        self.s = conn
+        try:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError:  # not a TCP socket, e.g. one end of a `socket.socketpair()`
+            pass
+        self.buffer = bytearray(Transport.INITIAL_BUFFER_SIZE)
+        self.start = 0  # start of the bytes received but not yet read
+        self.end = 0  # end of the bytes received
+        self.searched = 0  # the bytes in [start, searched) hold no newline
+
+    def send(self, message):
+        """
+        :param any message: a message (as defined above).
+        :rtype: void
+        """
+        self.s.sendall(bytes(json.dumps(message) + "\n", "utf-8"))
+
+    def recv(self):
+        """
+        Waits for the next message. Blank lines are skipped.
+
+        :return: the next message (as defined above), or `None` if the other side closed the connection first.
+        :rtype: any
+        :raises ValueError: if the next line isn't JSON.
+        """
+        while True:
+            newline = self.buffer.find(b"\n", self.searched, self.end)
+            if newline == -1:
+                self.searched = self.end
+                if not self._fill():
+                    return None
+                continue
+            with memoryview(self.buffer) as view:
+                line = bytes(view[self.start:newline])
+            self.start = self.searched = newline + 1
+            if self.start == self.end:  # everything received was read, so the next message starts the buffer
+                self.start = self.end = self.searched = 0
+            if line.strip():
+                return json.loads(line)
+
+    def close(self):
+        """
+        :rtype: void
+        """
+        self.s.close()
+
+    def _fill(self):
+        """
+        Receives more bytes into the buffer, making room for them first if it is full.
+
+        :return: `False` if the other side closed the connection, else `True`.
+        :rtype: bool
+        """
+        if self.end == len(self.buffer):
+            if self.start > 0:
+                num_unread = self.end - self.start
+                self.buffer[:num_unread] = self.buffer[self.start:self.end]
+                self.searched -= self.start
+                self.start, self.end = 0, num_unread
+            else:
+                self.buffer.extend(bytes(len(self.buffer)))
+        with memoryview(self.buffer) as view:
+            num_received = self.s.recv_into(view[self.end:])
+        self.end += num_received
+        return num_received > 0
@@ -0,0 +1,114 @@
+from array import array
+from CustomExceptions import ContractViolation
+
+
+class TranspositionTable:
+    """
+    A fixed-size cache of search results, keyed by the hash of a board (see `Board.hash`, which includes the side to
+    move), so a search can reuse the result of a position it reaches again through a different order of plays.
+
+    The table is a set of buckets of two entries, stored in flat `array`s rather than Python objects so that its memory
+    use is fixed up front:
+     - the first entry of a bucket is depth-preferred: it is only replaced by a result searched at least as deep, since
+       deep results cost the most to recompute.
+     - the second entry of a bucket is always replaced, so recent shallow results still get cached.
+
+    Definitions:
+
+    key
+        `int`. A 64-bit board hash (see `Board.hash`).
+
+    depth
+        `int` in range [0, 127]. The number of plies below the position that were searched to get the value.
+
+    flag
+        `int`. `EXACT` if the value is the exact result of the search, `LOWER_BOUND` or `UPPER_BOUND` if the search was
+        cut off (e.g. by alpha-beta pruning) and the value is only a bound on the exact result.
+
+    entry
+        `tuple` of (depth, flag, value, move), where value is a `float` and move is the play code (as defined in the
+        documentation of `PlayCode`) of the best play found, or `NO_MOVE`.
+    """
+
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+    NO_MOVE = -1
+    ENTRY_BYTES = 8 + 1 + 1 + 8 + 2  # key, depth, flag, value, move
+    DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        """
+        Constructor. Allocates the largest power-of-two number of buckets that fits in `max_bytes`.
+
+        :param int max_bytes: the memory cap of the table, in bytes.
+        """
+        if not isinstance(max_bytes, int) or max_bytes < 2 * TranspositionTable.ENTRY_BYTES:
+            raise ContractViolation("max_bytes must be an int of at least {}! Given: {}".format(
+                2 * TranspositionTable.ENTRY_BYTES, max_bytes))
+        num_buckets = 1 << ((max_bytes // (2 * TranspositionTable.ENTRY_BYTES)).bit_length() - 1)
+        self.mask = num_buckets - 1
+        self.size = 2 * num_buckets
+        self.keys = array("Q", bytes(8 * self.size))
+        self.depths = array("b", [-1]) * self.size  # depth -1 marks an empty entry
+        self.flags = array("B", bytes(self.size))
+        self.values = array("d", bytes(8 * self.size))
+        self.moves = array("h", [TranspositionTable.NO_MOVE]) * self.size
+
+    def probe(self, key):
+        """
+        :param int key: a key (as defined above).
+        :return: the entry (as defined above) stored for the key, or `None` if there is none.
+        :rtype: tuple, None
+        """
+        index = (key & self.mask) << 1
+        if self.keys[index] == key and self.depths[index] >= 0:
+            return self.depths[index], self.flags[index], self.values[index], self.moves[index]
+        index += 1
+        if self.keys[index] == key and self.depths[index] >= 0:
+            return self.depths[index], self.flags[index], self.values[index], self.moves[index]
+        return None
+
+    def store(self, key, depth, flag, value, move=NO_MOVE):
+        """
+        Stores a search result in the depth-preferred entry of the key's bucket if it was searched at least as deep as
+        the result already there, and in the always-replace entry otherwise. A result pushed out of the depth-preferred
+        entry by a different position moves to the always-replace entry.
+
+        :param int key: a key (as defined above).
+        :param int depth: a depth (as defined above).
+        :param int flag: a flag (as defined above).
+        :param float value: the value found by the search.
+        :param int move: the play code of the best play found, or `NO_MOVE`.
+        :rtype: void
+        """
+        index = (key & self.mask) << 1
+        if depth >= self.depths[index]:
+            if self.keys[index] != key and self.depths[index] >= 0:
+                self._write(index + 1, self.keys[index], self.depths[index], self.flags[index], self.values[index],
+                            self.moves[index])
+            self._write(index, key, depth, flag, value, move)
+        else:
+            self._write(index + 1, key, depth, flag, value, move)
+
+    def clear(self):
+        """
+        Empties the table.
+
+        :rtype: void
+        """
+        self.depths = array("b", [-1]) * self.size
+
+    def __len__(self):
+        """
+        :return: the number of entries in use.
+        :rtype: int
+        """
+        return self.size - self.depths.count(-1)
+
+    def _write(self, index, key, depth, flag, value, move):
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.flags[index] = flag
+        self.values[index] = value
+        self.moves[index] = move
@@ -0,0 +1,114 @@
+import argparse
+import itertools
+import os
+import time
+import Strategies
+import SearchPool
+from BitBoard import BitBoard
+from OpeningBook import OpeningBook
+from RuleChecker import RuleChecker
+from ProductionMode import set_production_mode
+
+# Builds the placement opening book (see `OpeningBook`) for an empty board.
+#
+# Every placement of the player who places first, and every reply to it, is scored with an `AlphaBetaStrategy` search
+# of the position after both placements, from the first player's side, since the player who places first also moves
+# first. Placements that are the same up to a symmetry of the board are only scored once. The replies are first
+# screened with a shallow search, and only the best `--candidates` replies to each placement are searched to `--depth`.
+# The first player's best placement is the one whose best reply scores highest for it.
+#
+# usage: python build_opening_book.py [--depth 4] [--screen-depth 2] [--candidates 6] [--processes N] [--output path]
+
+_strategies = {}  # key-value pair of depth : strategy, in each worker process
+
+
+def score_position(task):
+    """
+    :param tuple task: (num_rows, num_cols, the cell indices of the first player's workers, the cell indices of the
+    second player's workers, depth).
+    :return: the score of the position for the first player, who is to move.
+    :rtype: int
+    """
+    num_rows, num_cols, first_cells, second_cells, depth = task
+    if depth not in _strategies:
+        _strategies[depth] = Strategies.AlphaBetaStrategy(depth, 1 << 20)
+    board = BitBoard()
+    board.set_board([[0] * num_cols for _ in range(num_rows)])
+    for color, cells in zip(RuleChecker.COLORS, (first_cells, second_cells)):
+        for worker_num, cell in enumerate(cells, 1):
+            board.place_worker(cell // num_cols, cell % num_cols, color + str(worker_num))
+    return _strategies[depth].search(board, RuleChecker.COLORS[0])[1]
+
+
+def get_canonical_pairs(cells, symmetries):
+    """
+    :param list cells: the cell indices to pick pairs from.
+    :param list symmetries: the symmetries (as defined in the documentation of `OpeningBook`) to reduce the pairs by.
+    :return: one pair of cell indices for every class of pairs that are the same up to the symmetries.
+    :rtype: list
+    """
+    pairs = {}
+    for pair in itertools.combinations(cells, 2):
+        pairs.setdefault(OpeningBook.get_key(pair, symmetries)[0], pair)
+    return list(pairs.values())
+
+
+def build(num_rows, num_cols, depth, screen_depth, num_candidates, num_processes, path):
+    """
+    Builds the book and writes it to the given path.
+
+    :rtype: void
+    """
+    start = time.monotonic()
+    pool = SearchPool.get_pool(num_processes)
+    symmetries = OpeningBook.get_symmetries(num_rows, num_cols)
+    cells = list(range(num_rows * num_cols))
+
+    firsts = []
+    for pair in get_canonical_pairs(cells, symmetries):
+        key, symmetry = OpeningBook.get_key(pair, symmetries)
+        firsts.append(tuple(sorted(symmetry[cell] for cell in pair)))  # in the symmetry of its key
+    replies = {}
+    for first in firsts:
+        # only the symmetries that leave the first placement where it is keep the replies' scores the same
+        key = OpeningBook.get_key(first, symmetries)[0]
+        stabilizer = [symmetry for symmetry in symmetries if sum(1 << symmetry[cell] for cell in first) == key]
+        replies[first] = get_canonical_pairs([cell for cell in cells if cell not in first], stabilizer)
+    print("{} first placements, {} replies".format(len(firsts), sum(map(len, replies.values()))))  # debug
+
+    tasks = [(num_rows, num_cols, first, reply, screen_depth) for first in firsts for reply in replies[first]]
+    scores = pool.map(score_position, tasks, chunksize=16)
+    screened = {first: [] for first in firsts}
+    for task, score in zip(tasks, scores):
+        screened[task[2]].append((score, task[3]))
+    print("screened at depth {} in {:.0f}s".format(screen_depth, time.monotonic() - start))  # debug
+
+    tasks = [(num_rows, num_cols, first, reply, depth) for first in firsts
+             for score, reply in sorted(screened[first])[:num_candidates]]
+    scores = pool.map(score_position, tasks, chunksize=1)
+    best_replies = {}
+    for task, score in zip(tasks, scores):
+        first, reply = task[2], task[3]
+        if first not in best_replies or score < best_replies[first][0]:
+            best_replies[first] = (score, reply)
+    print("searched at depth {} in {:.0f}s".format(depth, time.monotonic() - start))  # debug
+
+    records = []
+    for first, (score, reply) in best_replies.items():
+        records.append((OpeningBook.get_key(first, symmetries)[0], reply[0], reply[1], -score))
+    best_score, best_first = max((score, first) for first, (score, reply) in best_replies.items())
+    records.append((0, best_first[0], best_first[1], best_score))
+    OpeningBook.write(path, num_rows, num_cols, records)
+    print("wrote {} records to {}".format(len(records), path))  # debug
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Builds the placement opening book.")
+    parser.add_argument("--depth", type=int, default=4, help="plies to search the candidate replies")
+    parser.add_argument("--screen-depth", type=int, default=2, help="plies to search every reply")
+    parser.add_argument("--candidates", type=int, default=6, help="replies per placement to search to --depth")
+    parser.add_argument("--processes", type=int, default=os.cpu_count(), help="worker processes to search on")
+    parser.add_argument("--output", default=OpeningBook.DEFAULT_PATH, help="path of the book file")
+    args = parser.parse_args()
+    set_production_mode(True)
+    build(5, 5, args.depth, args.screen_depth, args.candidates, args.processes, args.output)
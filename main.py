@@ -1,17 +1,23 @@
 import sys
 from importlib.machinery import SourceFileLoader
 from JsonParser import parse_json
-from Admin import RoundRobinAdmin, SingleEliminationAdmin
+from Admin import BaseAdmin, RoundRobinAdmin, SingleEliminationAdmin
+from ProductionMode import set_production_mode
 
 
-def main(tournament, num_remote_players, host, port, default_player):
+def main(tournament, num_remote_players, host, port, default_player, max_concurrent_games=None,
+         registration_timeout=BaseAdmin.DEFAULT_REGISTRATION_TIMEOUT, offload_processes=None):
     if num_remote_players < 0 or not isinstance(port, int):
         raise ValueError()
 
     if tournament == "cup":
-        admin = SingleEliminationAdmin(host, port, num_remote_players, fallback_player=default_player)
+        admin = SingleEliminationAdmin(host, port, num_remote_players, fallback_player=default_player,
+                                       max_concurrent_games=max_concurrent_games,
+                                       registration_timeout=registration_timeout, offload_processes=offload_processes)
     elif tournament == "league":
-        admin = RoundRobinAdmin(host, port, num_remote_players, fallback_player=default_player)
+        admin = RoundRobinAdmin(host, port, num_remote_players, fallback_player=default_player,
+                                max_concurrent_games=max_concurrent_games, registration_timeout=registration_timeout,
+                                offload_processes=offload_processes)
     else:
         raise ValueError()
 
@@ -20,7 +26,7 @@ def main(tournament, num_remote_players, host, port, default_player):
         admin.print_rankings()
     except Exception as e:
         print(e)
-        admin.s.close()
+        admin.close()
 
 
 if __name__ == "__main__":
@@ -30,12 +36,17 @@ if __name__ == "__main__":
         with open("santorini.config") as f:
             data = parse_json(f.read())[0]["value"]
             ip, port = data["IP"], data["port"]
+            set_production_mode(data.get("production-mode", False))
             default_player_path = data["default-player"]
+            max_concurrent_games = data.get("max-concurrent-games")
+            registration_timeout = data.get("registration-timeout", BaseAdmin.DEFAULT_REGISTRATION_TIMEOUT)
+            offload_processes = data.get("offload-processes")
 
         DefaultPlayerModule = SourceFileLoader("DefaultPlayerModule", default_player_path).load_module()
         DefaultPlayer = DefaultPlayerModule.Player
 
-        main(tournament_type[1:], int(n), ip, port, DefaultPlayer)
+        main(tournament_type[1:], int(n), ip, port, DefaultPlayer, max_concurrent_games, registration_timeout,
+             offload_processes)
     except ValueError:
         print("usage: ./santorini.sh [option] ... [-cup n | -league n]")
         print("n must be integer >= 0.")
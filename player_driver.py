@@ -3,9 +3,13 @@ import sys
 import Strategies
 from Player import Player
 from SmartPlayer import SmartPlayer
+from BitBoard import BitBoard
+from EndgameSolver import EndgameSolver
 from RuleChecker import RuleChecker
 from CustomExceptions import InvalidCommand, ContractViolation, IllegalPlay
 from JsonParser import parse_json
+from ProductionMode import set_production_mode
+from Transport import Transport
 import socket
 
 
@@ -74,9 +78,24 @@ def is_valid_game_over_command(command):
     return isinstance(command, list) and len(command) == 2 and command[0] == "Game Over" and isinstance(command[1], str)
 
 
-class PlayerDriver:
+def create_endgame_solver(config):
+    """
+    :param dict config: the strategy config.
+    :return: an `EndgameSolver` with the thresholds given in the config, or the default ones.
+    :rtype: EndgameSolver
     """
+    return EndgameSolver(config.get("endgame-open-cells", EndgameSolver.DEFAULT_MAX_OPEN_CELLS),
+                         config.get("endgame-plays", EndgameSolver.DEFAULT_MAX_PLAYS),
+                         config.get("endgame-max-nodes", EndgameSolver.DEFAULT_MAX_NODES),
+                         max_plays_open_cells=config.get("endgame-plays-open-cells",
+                                                         EndgameSolver.DEFAULT_MAX_PLAYS_OPEN_CELLS),
+                         max_seconds=config.get("endgame-max-seconds", EndgameSolver.DEFAULT_MAX_SECONDS))
+
 
+class PlayerDriver:
+    """
+    Connects a player to the Admin and answers its commands. A `SmartPlayer` that ponders searches ahead while the
+    driver waits for the Admin (see `SmartPlayer.ponder`).
     """
     def __init__(self, player, host, port):
         """
@@ -89,38 +108,39 @@ class PlayerDriver:
         self.player = player
         self.s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.s.connect((host, port))
+        self.transport = Transport(self.s)
 
     def start_driver(self):
         while True:
-            # self.s is the TCP socket connected to the referee
-            data = self.s.recv(1024)
-            if not data:
-                print("Admin terminated connection.")
-                break
-            data = data.strip().decode('utf-8')
-            # print("player driver received: ", data)  # debug
-            # print("--------------------------------")  # debug
-            json_values = parse_json(data)  # TODO: should only be one element array - what behaviour when not?
             try:
-                for json_val in json_values:
-                    command = json_val["value"]
-                    if is_valid_register_command(command):
-                        name = self.player.register()  # should raise error since player is already registered
-                        self._send_response(name)
-                    elif is_valid_place_command(command):
-                        color, board_list = command[1:]
-                        placements = self.player.place(board_list, color)
-                        self._send_response(placements)
-                    elif is_valid_play_command(command):
-                        board_list = command[1]
-                        plays = self.player.play(board_list)
-                        self._send_response(plays)
-                    elif is_valid_game_over_command(command):
-                        name = command[1]
-                        acknowledgement = self.player.notify(name)
-                        self._send_response(acknowledgement)
-                    else:
-                        raise InvalidCommand("Invalid command passed to Player! Given:".format(command))
+                # self.transport reads the TCP socket connected to the referee, one command at a time
+                command = self._recv_command()
+                if isinstance(self.player, SmartPlayer):
+                    self.player.stop_pondering()  # the strategy is needed again, and the CPU with it
+                if command is None:
+                    print("Admin terminated connection.")
+                    break
+                # print("player driver received: ", command)  # debug
+                # print("--------------------------------")  # debug
+                if is_valid_register_command(command):
+                    name = self.player.register()  # should raise error since player is already registered
+                    self._send_response(name)
+                elif is_valid_place_command(command):
+                    color, board_list = command[1:]
+                    placements = self.player.place(board_list, color)
+                    self._send_response(placements)
+                elif is_valid_play_command(command):
+                    board_list = command[1]
+                    plays = self.player.play(board_list)
+                    self._send_response(plays)
+                    if isinstance(self.player, SmartPlayer):
+                        self.player.ponder()
+                elif is_valid_game_over_command(command):
+                    name = command[1]
+                    acknowledgement = self.player.notify(name)
+                    self._send_response(acknowledgement)
+                else:
+                    raise InvalidCommand("Invalid command passed to Player! Given:".format(command))
             # TODO - refactor - making assumption about admin accepting these responses
             except (InvalidCommand, IllegalPlay) as e:
                 print(e)  # debug
@@ -132,9 +152,34 @@ class PlayerDriver:
                 print(e)  # debug
                 self._send_response("ContractViolation")
 
+    def _recv_command(self):
+        """
+        :return: the next command from the admin, or `None` if the admin closed the connection.
+        :rtype: any
+        """
+        try:
+            return self.transport.recv()
+        except ValueError as e:
+            raise InvalidCommand("Command passed to Player isn't JSON! {}".format(e))
+
     def _send_response(self, message):
-        data = bytes(json.dumps(message) + "\n", "utf-8")
-        self.s.sendall(data)
+        self.transport.send(message)
+
+
+def is_pondering(strategy_type):
+    """
+    :param str strategy_type: the strategy option given on the command line.
+    :return: `True` if the strategy plays on its own and `"ponder"` is set in strategy.config, else `False`.
+    :rtype: bool
+    """
+    if strategy_type not in ("look-ahead", "smart", "alpha-beta", "mcts", "greedy"):
+        return False
+    try:
+        with open("strategy.config", "r") as f:
+            config = parse_json(f.read())[0]["value"]
+    except FileNotFoundError:
+        return False
+    return bool(config.get("ponder", False))
 
 
 def main(strategy_type, admin_host, admin_port):
@@ -146,13 +191,38 @@ def main(strategy_type, admin_host, admin_port):
     elif strategy_type == "look-ahead":
         try:
             with open("strategy.config", "r") as f:
-                num_looks_ahead = parse_json(f.read())[0]["value"]["look-ahead"]
-            strategy = Strategies.NLooksAheadStrategy(num_looks_ahead)
+                config = parse_json(f.read())[0]["value"]
+            num_looks_ahead = config["look-ahead"]
+            table_size = config.get("transposition-table-mb", 8) * 1024 * 1024
+            strategy = Strategies.NLooksAheadStrategy(num_looks_ahead, table_size, config.get("time-per-move"),
+                                                      config.get("look-ahead-processes"),
+                                                      config.get("shared-table-name"), create_endgame_solver(config))
         except FileNotFoundError:
             print("strategy.config for look-ahead strategy file not found in directory!")
             sys.exit(1)
     elif strategy_type == "smart":
         strategy = Strategies.SmartStrategy()
+    elif strategy_type == "alpha-beta":
+        try:
+            with open("strategy.config", "r") as f:
+                config = parse_json(f.read())[0]["value"]
+            table_size = config.get("transposition-table-mb", 8) * 1024 * 1024
+            strategy = Strategies.AlphaBetaStrategy(config.get("alpha-beta-depth", 4), table_size,
+                                                    config.get("time-per-move"), config.get("shared-table-name"),
+                                                    create_endgame_solver(config))
+        except FileNotFoundError:
+            print("strategy.config for alpha-beta strategy file not found in directory!")
+            sys.exit(1)
+    elif strategy_type == "mcts":
+        try:
+            with open("strategy.config", "r") as f:
+                config = parse_json(f.read())[0]["value"]
+            iterations = config.get("mcts-iterations", Strategies.MCTSStrategy.DEFAULT_ITERATIONS)
+            strategy = Strategies.MCTSStrategy(iterations, config.get("time-per-move"),
+                                               endgame_solver=create_endgame_solver(config))
+        except FileNotFoundError:
+            print("strategy.config for mcts strategy file not found in directory!")
+            sys.exit(1)
     elif strategy_type == "greedy":
         strategy = Strategies.GreedyStrategy()
     elif strategy_type == "interactive":
@@ -162,7 +232,7 @@ def main(strategy_type, admin_host, admin_port):
     else:
         raise ValueError("Unsupported strategy type!")
 
-    player = SmartPlayer(input("Type your player's name: "), strategy)
+    player = SmartPlayer(input("Type your player's name: "), strategy, BitBoard, is_pondering(strategy_type))
 
     player_driver = PlayerDriver(player, admin_host, admin_port)
     player_driver.start_driver()
@@ -175,9 +245,11 @@ if __name__ == "__main__":
         with open("santorini.config") as f:
             data = parse_json(f.read())[0]["value"]
             ip, port = data["IP"], data["port"]
+            set_production_mode(data.get("production-mode", False))
 
         main(strategy_option, ip, port)
     except ValueError:
-        print("usage: ./player_driver.sh [strategy] ... [random | look-ahead | interactive | greedy | cheating]")
+        print("usage: ./player_driver.sh [strategy] ... "
+              "[random | look-ahead | smart | alpha-beta | mcts | interactive | greedy | cheating]")
         sys.exit(1)
 
@@ -0,0 +1,224 @@
+import itertools
+import json
+import socket
+import threading
+import time
+import pytest
+from Admin import SingleEliminationAdmin, RoundRobinAdmin
+from AsyncProxyPlayer import AsyncProxyPlayer
+from Player import Player
+from player_driver import PlayerDriver
+from Referee import Referee
+from Strategies import RandomStrategy, GreedyStrategy, OffloadedStrategy
+from CustomExceptions import ContractViolation
+
+
+class SleepingReferee(Referee):
+    # a referee whose game takes a fixed time, as if it waited on remote players, and is won by the first player
+
+    def play_game(self):
+        time.sleep(0.2)
+        return self.players[0], False
+
+
+class IllegalStrategy(RandomStrategy):
+    # a strategy whose plays are never valid, which gets its player caught cheating in its first game
+
+    def get_play(self, board, color, deadline=None):
+        return [color + "1", ["UP"]]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def connect(port, timeout=10):
+    # a socket connected to the admin on `port`, once the admin is accepting
+    end = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection(("localhost", port))
+        except ConnectionRefusedError:
+            if time.monotonic() > end:
+                raise
+            time.sleep(0.01)
+
+
+def start_bots(port, responses):
+    # starts a remote player for each response, which connects and answers ["Register"] with the raw response, stays
+    # silent if it's None, or hangs up if it's empty. Returns the list their sockets are added to.
+    conns = []
+
+    def bot(response):
+        conn = connect(port)
+        conns.append(conn)
+        if response is not None:
+            conn.recv(1024)
+            if response:
+                conn.sendall(response)
+            else:
+                conn.shutdown(socket.SHUT_WR)
+
+    for response in responses:
+        threading.Thread(target=bot, args=(response,), daemon=True).start()
+    return conns
+
+
+def make_admin(num_players, max_concurrent_games=None, admin_cls=SingleEliminationAdmin, cheaters=()):
+    # an admin with no remote players, whose players are replaced by `num_players` local ones, those whose index is in
+    # `cheaters` playing illegal plays
+    admin = admin_cls("localhost", 0, 0, fallback_player=Player, max_concurrent_games=max_concurrent_games)
+    admin.players = {}
+    for count in range(num_players):
+        player = Player("P{}".format(count), IllegalStrategy() if count in cheaters else RandomStrategy())
+        player.register()
+        admin.players[player] = None if admin_cls is SingleEliminationAdmin else []
+    return admin
+
+
+@pytest.mark.parametrize("max_concurrent_games, max_seconds", [(None, 0.35), (4, 0.55)])
+def test_play_games_concurrently(max_concurrent_games, max_seconds):
+    admin = make_admin(16, max_concurrent_games)
+    players = list(admin.players)
+    referees = [SleepingReferee(players[i], players[i + 1]) for i in range(0, 16, 2)]
+    start = time.monotonic()
+    results = admin._play_games(referees)
+    assert time.monotonic() - start < max_seconds  # 8 games of 0.2s each
+    assert [(players[i], False) for i in range(0, 16, 2)] == results
+    assert [] == admin._play_games([])
+    admin.close()
+
+
+@pytest.mark.parametrize("max_concurrent_games", [None, 1, 3])
+def test_run_tournament(max_concurrent_games):
+    admin = make_admin(8, max_concurrent_games)
+    admin.run_tournament()
+    ranks = sorted(admin.players.values())
+    assert [1, 1, 1, 1, 2, 2, 3, 4] == ranks
+    assert 4 == admin.stage
+
+
+@pytest.mark.parametrize("max_concurrent_games", [0, -1, 1.5, "2"])
+def test_invalid_max_concurrent_games(max_concurrent_games):
+    with pytest.raises(ContractViolation):
+        SingleEliminationAdmin("localhost", 0, 0, max_concurrent_games=max_concurrent_games)
+
+
+def test_offloaded_fallback_players():
+    admin = SingleEliminationAdmin("localhost", 0, 0, fallback_player=lambda: Player(strategy=GreedyStrategy()),
+                                   offload_processes=1)
+    admin.players = {}
+    for _ in range(4):
+        player = admin._create_fallback_player()
+        assert isinstance(player.strategy, OffloadedStrategy)
+        admin.players[player] = None
+    admin.run_tournament()
+    assert [1, 1, 2, 3] == sorted(admin.players.values())
+
+
+@pytest.mark.parametrize("offload_processes", [0, -1, 1.5, "2"])
+def test_invalid_offload_processes(offload_processes):
+    with pytest.raises(ContractViolation):
+        SingleEliminationAdmin("localhost", 0, 0, offload_processes=offload_processes)
+
+
+@pytest.mark.parametrize("registration_timeout", [0, -1, "1", True, None])
+def test_invalid_registration_timeout(registration_timeout):
+    with pytest.raises(ContractViolation):
+        SingleEliminationAdmin("localhost", 0, 0, registration_timeout=registration_timeout)
+
+
+def test_registers_concurrently():
+    # silent players hold up neither each other nor the players who connect after them
+    port = free_port()
+    responses = [None] * 4 + [bytes(json.dumps("bot{}".format(i)) + "\n", "utf-8") for i in range(196)]
+    conns = start_bots(port, responses)
+    start = time.monotonic()
+    admin = SingleEliminationAdmin("localhost", port, 200, fallback_player=Player, registration_timeout=0.5)
+    assert time.monotonic() - start < 3
+    remote_players = [player for player in admin.players if isinstance(player, AsyncProxyPlayer)]
+    assert sorted("bot{}".format(i) for i in range(196)) == sorted(player.get_name() for player in remote_players)
+    assert 256 == len(admin.players)  # 4 fallbacks for the silent players, and 56 to make a power of 2
+    admin.close()
+    for conn in conns:
+        conn.settimeout(5)
+        while conn.recv(1024):  # until the admin hangs up
+            pass
+        conn.close()
+    admin.close()  # closing again does nothing
+
+
+@pytest.mark.parametrize("response", [b"5\n", b'["bot"]\n', b"bot\n", b'"InvalidCommand"\n', b"\xff\n", b""])
+def test_falls_back_on_invalid_name(response):
+    port = free_port()
+    conns = start_bots(port, [response, b'"bot"\n'])
+    admin = RoundRobinAdmin("localhost", port, 2, fallback_player=Player, registration_timeout=0.5)
+    names = sorted(player.get_name() for player in admin.players if isinstance(player, AsyncProxyPlayer))
+    assert ["bot"] == names
+    assert 2 == len(admin.players)
+    admin.close()
+    for conn in conns:
+        conn.close()
+
+
+def test_tournament_with_remote_players():
+    port = free_port()
+    drivers = []
+
+    def run_driver(name):
+        while True:
+            try:
+                driver = PlayerDriver(Player(name, RandomStrategy()), "localhost", port)
+                break
+            except ConnectionRefusedError:
+                time.sleep(0.01)
+        drivers.append(driver)
+        driver.start_driver()
+
+    threads = [threading.Thread(target=run_driver, args=("R{}".format(i),), daemon=True) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    admin = SingleEliminationAdmin("localhost", port, 4, fallback_player=Player)
+    assert ["R0", "R1", "R2", "R3"] == sorted(player.get_name() for player in admin.players)
+    admin.run_tournament()
+    assert [1, 1, 2, 3] == sorted(admin.players.values())
+    for thread in threads:
+        thread.join(5)
+        assert not thread.is_alive()  # the admin hung up
+
+
+@pytest.mark.parametrize("num_players", range(0, 10))
+def test_schedule_rounds(num_players):
+    rounds = RoundRobinAdmin._schedule_rounds(num_players)
+    assert max(num_players - 1 if num_players % 2 == 0 else num_players, 0) == len(rounds)
+    for round_pairs in rounds:
+        players = [player for pair in round_pairs for player in pair]
+        assert len(players) == len(set(players))  # nobody plays twice in a round
+        assert num_players // 2 == len(round_pairs)
+    games = sorted(pair for round_pairs in rounds for pair in round_pairs)
+    assert list(itertools.combinations(range(num_players), 2)) == games  # every pair meets once
+
+
+def test_round_robin_rounds_are_concurrent():
+    admin = make_admin(8, admin_cls=RoundRobinAdmin)
+    played = []
+    admin._play_games = lambda referees: played.append(len(referees)) or [(referee.players[0], False)
+                                                                          for referee in referees]
+    admin.run_tournament()
+    assert [4] * 7 == played
+    assert 28 == sum(len(beaten) for beaten in admin.players.values())
+
+
+# with 4 players, the first round is (0, 3) and (1, 2): cheaters 0 and 1 are caught in the same round, and of cheaters
+# 0 and 3, the one who wins their game is caught in the next round, losing that win
+@pytest.mark.parametrize("cheaters, num_wins", [((0,), 6), ((0, 1), 6), ((0, 3), 5)])
+def test_round_robin_cheaters(cheaters, num_wins):
+    admin = make_admin(4, admin_cls=RoundRobinAdmin, cheaters=cheaters)
+    cheating_players = [player for count, player in enumerate(admin.players) if count in cheaters]
+    admin.run_tournament()
+    for player in cheating_players:
+        assert [] == admin.players[player]
+    assert 4 + len(cheaters) == len(admin.players)  # a substitute for each
+    assert num_wins == sum(len(beaten) for beaten in admin.players.values())
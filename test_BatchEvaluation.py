@@ -0,0 +1,111 @@
+import random
+import pytest
+from Board import Board
+from BitBoard import BitBoard
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+import Strategies
+import BatchEvaluation
+from BatchEvaluation import BatchEvaluator
+
+np = pytest.importorskip("numpy")
+
+
+LEGAL_BOARD = [[0, [2, "blue2"], 1, 2, 3],
+               [3, 2, 1, 0, 4],
+               [1, 0, [1, "white2"], 2, 4],
+               [0, 0, 0, 0, [2, "white1"]],
+               [1, [0, "blue1"], 0, 2, 3]]
+
+MINI_BOARD = [[0, 1, 1, 0],
+              [[1, "white1"], 2, 1, [2, "blue2"]],
+              [[1, "white2"], 1, 0, 1],
+              [0, 1, 2, [1, "blue1"]]]
+
+WIN_BOARD = [[0, 0, 0, 0, 0],
+             [0, [2, "blue1"], 3, 0, 0],
+             [0, 0, 0, 0, 0],
+             [[0, "blue2"], 0, 0, [0, "white1"], 0],
+             [0, 0, 0, 0, [0, "white2"]]]
+
+
+def make_board(board_cls, board):
+    board_obj = board_cls()
+    board_obj.set_board(board)
+    return board_obj
+
+
+def random_board(board_cls, seed):
+    rng = random.Random(seed)
+    board = make_board(board_cls, [[0] * 5 for _ in range(5)])
+    for worker, cell in zip(RuleChecker.WORKERS, rng.sample(range(25), 4)):
+        board.place_worker(cell // 5, cell % 5, worker)
+    color = "blue"
+    for _ in range(rng.randint(0, 30)):
+        codes = [code for code in board.generate_play_codes(color) if not code & PlayCode.WIN_FLAG]
+        if not codes:
+            break
+        board.make_play_code(rng.choice(codes))
+        color = "white" if color == "blue" else "blue"
+    return board, color
+
+
+def child_scores(board, color, codes):
+    scores = []
+    for code in codes:
+        board.make_play_code(code)
+        scores.append([(Strategies.SmartStrategy._score_board_helper(board, each_color),
+                        Strategies.GreedyStrategy._score_board(board, each_color))
+                       for each_color in RuleChecker.COLORS])
+        board.unmake()
+    return scores
+
+
+@pytest.mark.parametrize("board_cls", [Board, BitBoard])
+@pytest.mark.parametrize("board, color", [(LEGAL_BOARD, "blue"), (LEGAL_BOARD, "white"), (MINI_BOARD, "blue"),
+                                          (WIN_BOARD, "blue")])
+def test_scores_match_score_board(board_cls, board, color):
+    board = make_board(board_cls, board)
+    codes = board.generate_play_codes(color)
+    heights, worker_cells = BatchEvaluator.get_children(board, codes)
+    smart_scores = BatchEvaluator.get_smart_scores(heights, worker_cells, board.get_dimensions())
+    greedy_scores = BatchEvaluator.get_greedy_scores(heights, worker_cells, board.get_dimensions())
+    assert (len(codes), 2) == smart_scores.shape == greedy_scores.shape
+    for code_scores, smart, greedy in zip(child_scores(board, color, codes), smart_scores, greedy_scores):
+        assert [score[0] for score in code_scores] == smart.tolist()
+        assert [score[1] for score in code_scores] == greedy.tolist()
+    assert [] == board.undo_stack
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_scores_match_random_boards(seed):
+    board, color = random_board(BitBoard, seed)
+    codes = board.generate_play_codes(color)
+    if not codes:
+        return
+    heights, worker_cells = BatchEvaluator.get_children(board, codes)
+    smart_scores = BatchEvaluator.get_smart_scores(heights, worker_cells, (5, 5)).tolist()
+    greedy_scores = BatchEvaluator.get_greedy_scores(heights, worker_cells, (5, 5)).tolist()
+    assert child_scores(board, color, codes) == [list(zip(smart, greedy))
+                                                 for smart, greedy in zip(smart_scores, greedy_scores)]
+
+
+def test_get_children():
+    board = make_board(Board, WIN_BOARD)
+    codes = [PlayCode.encode(["blue1", ["E"]]), PlayCode.encode(["white2", ["N", "NW"]])]
+    heights, worker_cells = BatchEvaluator.get_children(board, codes)
+    assert [[7, 15, 18, 24], [6, 15, 18, 19]] == worker_cells.tolist()
+    assert 3 == heights[0, 7]  # winning plays don't build
+    assert 1 == heights[1, 13] and 0 == heights[0, 13]
+    assert [] == board.undo_stack
+
+
+@pytest.mark.parametrize("strategy_fn", [lambda: Strategies.SmartStrategy(1), lambda: Strategies.SmartStrategy(2),
+                                         Strategies.GreedyStrategy])
+@pytest.mark.parametrize("seed", range(3))
+def test_strategies_play_the_same_without_numpy(strategy_fn, seed, monkeypatch):
+    board, color = random_board(BitBoard, seed)
+    play = strategy_fn().get_play(board, color)
+    monkeypatch.setattr(BatchEvaluation, "np", None)
+    assert not BatchEvaluator.is_available()
+    assert play == strategy_fn().get_play(board, color)
@@ -0,0 +1,156 @@
+import pytest
+from Board import Board
+from BitBoard import BitBoard
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+import Strategies
+
+
+def legal_board():
+    return [[0, [2, "blue2"], 1, 2, 3],
+            [3, 2, 1, 0, 4],
+            [1, 0, [1, "white2"], 2, 4],
+            [0, 0, 0, 0, [2, "white1"]],
+            [[0, "blue1"], 1, 0, 2, 3]]
+
+
+def congested_board():
+    return [[0, 2, 1, 2, 3],
+            [3, 2, 1, 0, 4],
+            [1, [2, "blue2"], [1, "white2"], 2, 4],
+            [0, 0, 0, [2, "white1"], 0],
+            [1, 0, [0, "blue1"], 2, 3]]
+
+
+def mini_board():
+    return [[0, 1, 1, 0],
+            [[1, "white1"], 2, 1, [2, "blue2"]],
+            [[1, "white2"], 1, 0, 1],
+            [0, 1, 2, [1, "blue1"]]]
+
+
+def make_boards(board_list):
+    board = Board()
+    board.set_board(board_list)
+    bit_board = BitBoard()
+    bit_board.set_board(board_list)
+    return board, bit_board
+
+
+@pytest.mark.parametrize("board_list", [legal_board(), congested_board(), mini_board()])
+def test_extract_board(board_list):
+    board, bit_board = make_boards(board_list)
+    assert board.extract_board() == bit_board.extract_board()
+    assert board.extract_json_board() == bit_board.extract_json_board()
+    assert board.get_dimensions() == bit_board.get_dimensions()
+    assert str(board) == str(bit_board)
+
+
+@pytest.mark.parametrize("board_list", [legal_board(), congested_board(), mini_board()])
+def test_queries(board_list):
+    board, bit_board = make_boards(board_list)
+    for worker in RuleChecker.WORKERS:
+        assert board.get_worker_position(worker) == bit_board.get_worker_position(worker)
+        assert board.get_neighbor_sums(worker) == bit_board.get_neighbor_sums(worker)
+        for direction in RuleChecker.DIRECTIONS:
+            assert board.neighboring_cell_exists(worker, direction) == \
+                bit_board.neighboring_cell_exists(worker, direction)
+            assert board.get_height(worker, direction) == bit_board.get_height(worker, direction)
+            assert board.is_occupied(worker, direction) == bit_board.is_occupied(worker, direction)
+    rows, cols = board.get_dimensions()
+    for row in range(rows):
+        for col in range(cols):
+            assert board.has_worker(row, col) == bit_board.has_worker(row, col)
+            assert board.get_cell_height(row, col) == bit_board.get_cell_height(row, col)
+            assert board.get_cell_worker(row, col) == bit_board.get_cell_worker(row, col)
+
+
+@pytest.mark.parametrize("worker, move_dir, build_dir", [
+    ("blue1", "NE", "N"),
+    ("blue2", "S", "SW"),
+    ("white1", "NW", "N"),
+    ("white2", "N", "S")
+])
+def test_move_build_undo(worker, move_dir, build_dir):
+    board, bit_board = make_boards(legal_board())
+    for b in (board, bit_board):
+        b.move(worker, move_dir)
+        b.build(worker, build_dir)
+    assert board.extract_board() == bit_board.extract_board()
+    for b in (board, bit_board):
+        b.undo_build(worker, build_dir)
+        b.move(worker, b.get_opposite_direction(move_dir))
+    assert legal_board() == bit_board.extract_board()
+
+
+def test_place_worker():
+    bit_board = BitBoard()
+    bit_board.place_worker(1, 1, "blue1")
+    assert (1, 1, 0) == bit_board.get_worker_position("blue1")
+    assert bit_board.worker_exists("blue1")
+    assert not bit_board.worker_exists("blue2")
+
+
+@pytest.mark.parametrize("board_list, color", [
+    (legal_board(), "blue"),
+    (legal_board(), "white"),
+    (congested_board(), "blue"),
+    (congested_board(), "white")
+])
+def test_legal_plays(board_list, color):
+    board, bit_board = make_boards(board_list)
+    assert Strategies.BaseStrategy.get_legal_plays(board, color) == \
+        Strategies.BaseStrategy.get_legal_plays(bit_board, color)
+
+
+@pytest.mark.parametrize("worker, move_dir, build_dir", [
+    ("blue1", "NE", "N"),
+    ("white2", "N", "S")
+])
+def test_hash(worker, move_dir, build_dir):
+    board, bit_board = make_boards(legal_board())
+    assert board.hash() == bit_board.hash()
+    for b in (board, bit_board):
+        b.move(worker, move_dir)
+        b.build(worker, build_dir)
+    assert board.hash() == bit_board.hash()
+    bit_board.undo_build(worker, build_dir)
+    bit_board.move(worker, bit_board.get_opposite_direction(move_dir))
+    assert make_boards(legal_board())[1].hash() == bit_board.hash()
+
+
+@pytest.mark.parametrize("play", [
+    ["blue1", ["NE", "N"]],
+    ["blue2", ["S", "N"]],
+    ["white1", ["NW", "SE"]],
+    ["white2", ["N"]]
+])
+def test_make_play_unmake(play):
+    board, bit_board = make_boards(legal_board())
+    for b in (board, bit_board):
+        b.make_play(play)
+    assert board.extract_board() == bit_board.extract_board()
+    assert board.hash() == bit_board.hash()
+    assert board.neighbor_sums == bit_board.neighbor_sums
+    bit_board.unmake()
+    assert legal_board() == bit_board.extract_board()
+    assert make_boards(legal_board())[1].hash() == bit_board.hash()
+    assert make_boards(legal_board())[1].neighbor_sums == bit_board.neighbor_sums
+
+
+@pytest.mark.parametrize("board_list", [legal_board(), congested_board(), mini_board()])
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_iter_play_codes(board_list, color):
+    board, bit_board = make_boards(board_list)
+    assert list(board.iter_play_codes(color)) == list(bit_board.iter_play_codes(color))
+    assert board.has_winning_move(color) == bit_board.has_winning_move(color)
+
+
+@pytest.mark.parametrize("board_list", [legal_board(), congested_board(), mini_board()])
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_random_play_code(board_list, color):
+    for b in make_boards(board_list):
+        codes = {code for code in b.generate_play_codes(color) if not PlayCode.is_winning(code)}
+        picked = {b.random_play_code(color) for _ in range(200)}
+        assert picked <= codes
+        assert len(picked) > 1
@@ -1,6 +1,9 @@
+import json
 import pytest
-from Board import Board
+from Board import Board, BoardSnapshot
 from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from CustomExceptions import ContractViolation
 
 
 @pytest.fixture()
@@ -204,3 +207,188 @@ def test_get_cell_height(board, row, col, expected):
 ])
 def test_get_cell_worker(board, row, col, expected):
     assert expected == board.get_cell_worker(row, col)
+
+
+@pytest.mark.parametrize("worker, move_dir, build_dir", [
+    ("blue1", "NE", "N"),
+    ("blue2", "S", "SW"),
+    ("white1", "NW", "N"),
+    ("white2", "N", "S")
+])
+def test_hash_incremental(legal_board, worker, move_dir, build_dir):
+    initial_hash = legal_board.hash()
+    legal_board.move(worker, move_dir)
+    legal_board.build(worker, build_dir)
+    assert initial_hash != legal_board.hash()
+
+    recomputed = Board()
+    recomputed.set_board(legal_board.extract_board())
+    recomputed.set_side_to_move(RuleChecker.COLORS[1])
+    assert recomputed.hash() == legal_board.hash()
+
+    legal_board.undo_build(worker, build_dir)
+    legal_board.move(worker, Board.get_opposite_direction(move_dir))
+    assert initial_hash == legal_board.hash()
+
+
+def test_hash_side_to_move(legal_board):
+    blue_hash = legal_board.hash()
+    legal_board.set_side_to_move(RuleChecker.COLORS[1])
+    assert blue_hash != legal_board.hash()
+    legal_board.set_side_to_move(RuleChecker.COLORS[0])
+    assert blue_hash == legal_board.hash()
+
+
+def test_hash_place_worker(empty_board):
+    empty_hash = empty_board.hash()
+    empty_board.place_worker(1, 1, "blue1")
+    placed = Board()
+    placed.set_board(empty_board.extract_board())
+    assert empty_hash != empty_board.hash()
+    assert placed.hash() == empty_board.hash()
+
+
+@pytest.mark.parametrize("play, expected_position", [
+    (["blue1", ["NE", "N"]], (3, 1, 0)),
+    (["blue2", ["S", "N"]], (1, 1, 2)),
+    (["white1", ["NW", "SE"]], (2, 3, 2)),
+    (["white2", ["N"]], (1, 2, 1))
+])
+def test_make_play_unmake(legal_board, play, expected_position):
+    worker = play[0]
+    initial_board = legal_board.extract_board()
+    initial_hash = legal_board.hash()
+    initial_position = legal_board.get_worker_position(worker)
+    expected = Board()
+    expected.set_board(legal_board.extract_board())
+    legal_board.make_play(play)
+    assert expected_position == legal_board.get_worker_position(worker)
+
+    expected.move(worker, play[1][0])
+    if len(play[1]) == 2:
+        expected.build(worker, play[1][1])
+    assert expected.extract_board() == legal_board.extract_board()
+    assert expected.hash() == legal_board.hash()
+
+    legal_board.unmake()
+    assert initial_board == legal_board.extract_board()
+    assert initial_hash == legal_board.hash()
+    assert initial_position == legal_board.get_worker_position(worker)
+
+
+def test_unmake_without_play(legal_board):
+    with pytest.raises(ContractViolation):
+        legal_board.unmake()
+
+
+def test_get_snapshot(legal_board):
+    snapshot = legal_board.get_snapshot()
+    assert snapshot is legal_board.get_snapshot()  # cached until the board changes
+    assert legal_board.extract_json_board() == json.dumps(snapshot)
+    assert hash(snapshot) == hash(BoardSnapshot.from_board(legal_board.extract_board()))
+    with pytest.raises(TypeError):
+        snapshot[0][0] = 1
+
+    legal_board.make_play(["blue1", ["NE", "N"]])
+    assert snapshot != legal_board.get_snapshot()
+    legal_board.unmake()
+    assert snapshot == legal_board.get_snapshot()
+
+
+def test_set_board_snapshot(legal_board):
+    snapshot = legal_board.get_snapshot()
+    board = Board()
+    board.set_board(snapshot)
+    board.make_play(["white1", ["NW", "N"]])
+    assert snapshot == legal_board.get_snapshot()
+    assert snapshot.to_list() == legal_board.board
+
+
+@pytest.mark.parametrize("color, expected", [
+    ("blue", True),
+    ("white", True)
+])
+def test_has_winning_move(legal_board, color, expected):
+    assert expected == legal_board.has_winning_move(color)
+
+
+@pytest.mark.parametrize("color, expected", [
+    ("blue", False),
+    ("white", False)
+])
+def test_has_winning_move_mini(mini_board, color, expected):
+    assert expected == mini_board.has_winning_move(color)
+
+
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_iter_play_codes(legal_board, color):
+    codes = list(legal_board.iter_play_codes(color))
+    assert sorted(legal_board.generate_play_codes(color)) == sorted(codes)
+    assert PlayCode.is_winning(codes[0])
+    assert sorted(codes, key=lambda code: not PlayCode.is_winning(code)) == codes
+
+
+def test_random_play_code_stuck():
+    board = Board()
+    board.set_board([[[0, "blue1"], 4, 0],
+                     [4, [0, "white1"], [0, "white2"]],
+                     [[0, "blue2"], 2, 4]])
+    assert board.random_play_code("blue") is None
+    assert board.random_play_code("white") in board.generate_play_codes("white")
+
+
+@pytest.mark.parametrize("board_list", [
+    [[0, [2, "blue2"], 1, 2, 3],
+     [3, 2, 1, 0, 4],
+     [1, 0, [1, "white2"], 2, 4],
+     [0, 0, 0, 0, [2, "white1"]],
+     [[0, "blue1"], 1, 0, 2, 3]],
+    [[0, 1, 1, 0],
+     [[1, "white1"], 2, 1, [2, "blue2"]],
+     [[1, "white2"], 1, 0, 1],
+     [0, 1, 2, [1, "blue1"]]]
+])
+def test_encode_decode(board_list):
+    board = Board()
+    board.set_board(board_list)
+    data = board.encode()
+    assert 2 + len(board_list) * len(board_list[0]) == len(data)
+    assert board_list == Board.decode(data)
+
+
+def test_decode_invalid():
+    with pytest.raises(ContractViolation):
+        Board.decode(bytes((5, 5, 0)))
+
+
+@pytest.mark.parametrize("worker, expected", [
+    ("blue1", (0, 1, 1, 1, 0)),
+    ("blue2", (2, 7, 7, 4, 0)),
+    ("white1", (2, 11, 7, 3, 0)),
+    ("white2", (1, 5, 5, 3, 0))
+])
+def test_get_neighbor_sums(legal_board, worker, expected):
+    height, neighbor_sums, num_workers = legal_board.get_neighbor_sums(worker)
+    assert expected == (height, neighbor_sums & Board.SUM_MASK,
+                        neighbor_sums >> Board.BUILDING_SUM_SHIFT & Board.SUM_MASK,
+                        neighbor_sums >> Board.BUILDING_COUNT_SHIFT, num_workers)
+
+
+@pytest.mark.parametrize("play", [
+    ["blue1", ["N", "W"]],
+    ["blue2", ["S", "E"]],
+    ["white1", ["N", "N"]],
+    ["white2", ["N", "E"]]
+])
+def test_neighbor_sums_incremental(congested_board, play):
+    initial_sums = congested_board.neighbor_sums
+    congested_board.make_play(play)
+    congested_board.build(play[0], play[1][1])
+    recomputed = Board()
+    recomputed.set_board(congested_board.extract_board())
+    assert recomputed.neighbor_sums == congested_board.neighbor_sums
+    for worker in RuleChecker.WORKERS:
+        assert recomputed.get_neighbor_sums(worker) == congested_board.get_neighbor_sums(worker)
+    congested_board.undo_build(play[0], play[1][1])
+    congested_board.unmake()
+    assert initial_sums == congested_board.neighbor_sums
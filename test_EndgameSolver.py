@@ -0,0 +1,148 @@
+import time
+import pytest
+from Board import Board
+from BitBoard import BitBoard
+from EndgameSolver import EndgameSolver
+from PlayCode import PlayCode
+import Strategies
+from CustomExceptions import ContractViolation
+
+
+WON_BOARD = [[4, 4, 4, 4, 4],
+             [4, 4, [1, "blue1"], 4, 4],
+             [4, 4, [0, "white2"], 1, [1, "blue2"]],
+             [1, 3, 1, 4, 4],
+             [4, 4, [0, "white1"], 4, 4]]
+
+LOST_BOARD = [[4, 4, [1, "white1"], 4, 4],
+              [4, 0, 1, 2, 4],
+              [[0, "blue1"], 4, [0, "blue2"], 4, 4],
+              [[2, "white2"], 0, 4, 4, 4],
+              [4, 4, 4, 4, 4]]
+
+# blue has 3 plays, but 14 cells can still be built on: too many to solve
+OPEN_FEW_PLAYS_BOARD = [[0, 3, 3, 4, 2],
+                        [0, 1, 2, 3, 4],
+                        [0, 4, 4, [1, "white2"], [1, "blue1"]],
+                        [[0, "white1"], 0, 4, 4, 3],
+                        [2, 4, 1, 1, [1, "blue2"]]]
+
+
+def make_board(board_cls, board):
+    board_obj = board_cls()
+    board_obj.set_board(board)
+    return board_obj
+
+
+def brute_force_wins(board, color, opp_color):
+    if board.has_winning_move(color):
+        return True
+    for code in board.generate_play_codes(color):
+        board.make_play_code(code)
+        opp_wins = brute_force_wins(board, opp_color, color)
+        board.unmake()
+        if not opp_wins:
+            return True
+    return False
+
+
+@pytest.mark.parametrize("board_cls", [Board, BitBoard])
+def test_get_play_won(board_cls):
+    board = make_board(board_cls, WON_BOARD)
+    codes = board.generate_play_codes("white")
+    code, won, num_plies = EndgameSolver().get_play(board, "white", codes)
+    assert won
+    assert ["white2", ["E", "W"]] == PlayCode.decode(code)  # the only play that wins
+    assert 5 == num_plies
+    assert [] == board.undo_stack
+
+
+@pytest.mark.parametrize("board_cls", [Board, BitBoard])
+def test_get_play_lost(board_cls):
+    board = make_board(board_cls, LOST_BOARD)
+    codes = board.generate_play_codes("blue")
+    solver = EndgameSolver()
+    code, won, num_plies = solver.get_play(board, "blue", codes)
+    assert not won
+    assert 18 == num_plies
+    for other_code in codes:
+        board.make_play_code(other_code)
+        assert brute_force_wins(board, "white", "blue")
+        board.unmake()
+    # no other play holds out longer against the wins the solver proved for white
+    board.set_side_to_move("white")
+    for other_code in codes:
+        board.make_play_code(other_code)
+        assert solver.memo.get(board.hash(), (True, 1))[1] + 1 <= num_plies
+        board.unmake()
+
+
+def test_is_endgame():
+    board = make_board(Board, WON_BOARD)
+    codes = board.generate_play_codes("white")
+    assert 4 == EndgameSolver.count_open_cells(board)
+    assert EndgameSolver(4, 0).is_endgame(board, codes)
+    assert not EndgameSolver(3, 0).is_endgame(board, codes)
+    assert EndgameSolver(3, len(codes)).is_endgame(board, codes)
+    assert EndgameSolver().get_play(Board(), "blue", []) is None
+
+
+def test_memo_stats_give_up():
+    board = make_board(BitBoard, WON_BOARD)
+    codes = board.generate_play_codes("white")
+    solver = EndgameSolver(max_nodes=1)
+    assert solver.get_play(board, "white", codes) is None
+    assert [] == board.undo_stack
+    assert {"solved": 0, "gave_up": 1, "nodes": 2} == solver.get_stats()
+    solver.max_nodes = EndgameSolver.DEFAULT_MAX_NODES
+    assert solver.get_play(board, "white", codes)[1]
+    nodes = solver.get_stats()["nodes"]
+    assert solver.get_play(board, "white", codes)[1]
+    assert solver.get_stats()["nodes"] < nodes  # memoized
+    assert 2 == solver.get_stats()["solved"]
+
+
+@pytest.mark.parametrize("strategy", [Strategies.GreedyStrategy(), Strategies.SmartStrategy(),
+                                      Strategies.AlphaBetaStrategy(2), Strategies.NLooksAheadStrategy(1),
+                                      Strategies.MCTSStrategy(50)])
+def test_strategies_play_solved_endgame(strategy):
+    board = make_board(BitBoard, WON_BOARD)
+    assert ["white2", ["E", "W"]] == strategy.get_play(board, "white")
+
+
+def test_strategy_without_endgame():
+    board = make_board(BitBoard, WON_BOARD)
+    strategy = Strategies.GreedyStrategy(EndgameSolver(0, 0))
+    assert ["white1", ["N", "NE"]] == strategy.get_play(board, "white")
+
+
+@pytest.mark.parametrize("strategy", [Strategies.GreedyStrategy(), Strategies.SmartStrategy()])
+def test_few_plays_open_board_not_solved(strategy):
+    board = make_board(BitBoard, OPEN_FEW_PLAYS_BOARD)
+    codes = board.generate_play_codes("blue")
+    assert len(codes) <= EndgameSolver.DEFAULT_MAX_PLAYS
+    assert 14 == EndgameSolver.count_open_cells(board)
+    assert not strategy.endgame_solver.is_endgame(board, codes)
+    start = time.monotonic()
+    strategy.get_play(board, "blue")
+    assert time.monotonic() - start < 0.1
+    assert {"solved": 0, "gave_up": 0, "nodes": 0} == strategy.endgame_solver.get_stats()
+
+
+def test_max_seconds():
+    board = make_board(BitBoard, OPEN_FEW_PLAYS_BOARD)
+    codes = board.generate_play_codes("blue")
+    solver = EndgameSolver(max_plays_open_cells=25, max_seconds=0.05)
+    assert solver.is_endgame(board, codes)
+    start = time.monotonic()
+    assert solver.get_play(board, "blue", codes) is None
+    assert time.monotonic() - start < 0.15
+    assert 1 == solver.get_stats()["gave_up"]
+    assert [] == board.undo_stack
+
+
+@pytest.mark.parametrize("args", [(-1, 4), (6, "4"), (6, 4, 0), (6, 4, 10, 0), (6, 4, 10, 10, -1),
+                                  (6, 4, 10, 10, 12, 0), (6, 4, 10, 10, 12, "1")])
+def test_invalid_thresholds(args):
+    with pytest.raises(ContractViolation):
+        EndgameSolver(*args)
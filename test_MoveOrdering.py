@@ -0,0 +1,61 @@
+import pytest
+from Board import Board
+from MoveOrdering import MoveOrderer
+from PlayCode import PlayCode
+
+
+@pytest.fixture()
+def mid_game_board():
+    board = [[0, 0, 1, 2, 0],
+             [1, 2, 1, 0, 0],
+             [1, 0, [1, "white2"], 2, 0],
+             [0, [0, "blue2"], 0, 0, [2, "white1"]],
+             [[0, "blue1"], 1, 0, 2, 3]]
+    board_obj = Board()
+    board_obj.set_board(board)
+    return board_obj
+
+
+def test_order_tt_win_climb(mid_game_board):
+    orderer = MoveOrderer()
+    codes = mid_game_board.generate_play_codes("white")
+    tt_code = codes[-1]
+    ordered = orderer.order(mid_game_board, codes, 0, tt_code)
+    assert sorted(codes) == sorted(ordered)
+    assert tt_code == ordered[0]
+    assert PlayCode.is_winning(ordered[1])  # white1 can climb from 2 to 3
+    num_wins = sum(map(PlayCode.is_winning, codes))
+    assert all(map(PlayCode.is_winning, ordered[1:1 + num_wins]))
+    climbs = MoveOrderer._get_climbs(mid_game_board, codes)
+    heights = [climbs[code >> PlayCode.MOVE_SHIFT] for code in ordered[1 + num_wins:]]
+    assert any(heights)
+    assert sorted(heights, reverse=True) == heights  # highest climbs first, then the rest
+
+
+def test_killers_history(mid_game_board):
+    orderer = MoveOrderer()
+    codes = [code for code in mid_game_board.generate_play_codes("blue")
+             if not MoveOrderer._get_climbs(mid_game_board, [code])[code >> PlayCode.MOVE_SHIFT]]
+    killer, other = codes[-1], codes[-2]
+    orderer.record_cutoff(mid_game_board, other, 2, 1, 3)
+    orderer.record_cutoff(mid_game_board, killer, 2, 3, 0)
+    assert [killer, other] == orderer.order(mid_game_board, codes, 2)[:2]
+    assert 9 == orderer.history[killer]
+    # killers are kept per ply, so at another ply only the history counts
+    assert killer == orderer.order(mid_game_board, codes, 1)[0]
+    orderer.new_search()
+    assert [] == orderer.killers
+    assert 4 == orderer.history[killer]
+
+
+def test_get_stats(mid_game_board):
+    orderer = MoveOrderer()
+    codes = mid_game_board.generate_play_codes("blue")
+    orderer.order(mid_game_board, codes, 0, codes[0])
+    orderer.record_cutoff(mid_game_board, codes[0], 0, 1, 0, codes[0])
+    orderer.record_cutoff(mid_game_board, codes[1], 1, 1, 4)
+    stats = orderer.get_stats()
+    assert 1 == stats["nodes"]
+    assert 2 == stats["cutoffs"]
+    assert 0.5 == stats["first_play_cutoff_rate"]
+    assert 1 == stats["cutoffs_by_source"]["tt"]
@@ -0,0 +1,80 @@
+import pytest
+from Board import Board
+from OpeningBook import OpeningBook
+
+
+def board_with_workers(cells, num_rows=5, num_cols=5):
+    board = Board()
+    board.set_board([[0] * num_cols for _ in range(num_rows)])
+    for worker, cell in zip(["blue1", "blue2", "white1", "white2"], cells):
+        board.place_worker(cell // num_cols, cell % num_cols, worker)
+    return board
+
+
+@pytest.fixture()
+def book(tmp_path):
+    # the first player places on (2, 2) and (3, 2), and replies to (0, 0) and (1, 2) with (2, 0) and (4, 4)
+    symmetries = OpeningBook.get_symmetries(5, 5)
+    key, symmetry = OpeningBook.get_key([0, 7], symmetries)
+    path = str(tmp_path / "book.bin")
+    OpeningBook.write(path, 5, 5, [(key, symmetry[10], symmetry[24], -3), (0, 12, 17, 5)])
+    return OpeningBook.load(path)
+
+
+@pytest.mark.parametrize("num_rows, num_cols, num_symmetries", [(5, 5, 8), (3, 4, 4), (1, 1, 8)])
+def test_get_symmetries(num_rows, num_cols, num_symmetries):
+    symmetries = OpeningBook.get_symmetries(num_rows, num_cols)
+    assert num_symmetries == len(symmetries)
+    assert tuple(range(num_rows * num_cols)) == symmetries[0]
+    for symmetry in symmetries:
+        assert sorted(symmetry) == list(range(num_rows * num_cols))
+
+
+def test_find(book):
+    assert 2 == len(book)
+    assert (0, 12, 17, 5) == book.find(0)
+    assert book.find(1) is None
+
+
+def test_get_placements(book):
+    assert [[2, 2], [3, 2]] == book.get_placements(board_with_workers([]))
+    # every symmetry of the first player's placement gets the same symmetry of the reply
+    for symmetry in book.symmetries:
+        placements = book.get_placements(board_with_workers([symmetry[0], symmetry[7]]))
+        assert sorted([[symmetry[cell] // 5, symmetry[cell] % 5] for cell in (10, 24)]) == sorted(placements)
+
+
+@pytest.mark.parametrize("board", [
+    board_with_workers([0, 1]),
+    board_with_workers([0, 7, 8]),
+    board_with_workers([], 4, 4)
+])
+def test_get_placements_missing(book, board):
+    assert book.get_placements(board) is None
+
+
+def test_get_placements_buildings(book):
+    board = board_with_workers([])
+    board.board[0][0] = 1
+    assert book.get_placements(board) is None
+
+
+def test_load_invalid(tmp_path):
+    assert OpeningBook.load(str(tmp_path / "missing.bin")) is None
+    for data in (b"", b"SPBK", b"XXXX\x01\x05\x05\x00\x00", b"SPBK\x01\x05\x05\x01\x00"):
+        path = tmp_path / "invalid.bin"
+        path.write_bytes(data)
+        assert OpeningBook.load(str(path)) is None
+        OpeningBook._books.clear()
+
+
+def test_default_book():
+    book = OpeningBook.load()
+    if book is None:
+        pytest.skip("no opening book built")
+    placements = book.get_placements(board_with_workers([]))
+    assert 2 == len(placements) and placements[0] != placements[1]
+    for first in ([0, 1], [12, 6], [24, 3]):
+        placements = book.get_placements(board_with_workers(first))
+        cells = [row * 5 + col for row, col in placements]
+        assert 2 == len(set(cells)) and not set(cells) & set(first)
@@ -0,0 +1,49 @@
+import pytest
+from Board import Board
+from BitBoard import BitBoard
+from PlayCode import PlayCode
+from CustomExceptions import ContractViolation
+
+
+def legal_board():
+    return [[0, [2, "blue2"], 1, 2, 3],
+            [3, 2, 1, 0, 4],
+            [1, 0, [1, "white2"], 2, 4],
+            [0, 0, 0, 0, [2, "white1"]],
+            [[0, "blue1"], 1, 0, 2, 3]]
+
+
+@pytest.mark.parametrize("play, code", [
+    (["blue1", ["N", "N"]], 0),
+    (["blue2", ["NE", "S"]], 64 + 8 + 4),
+    (["white2", ["NW", "NW"]], 255),
+    (["white1", ["SW"]], 256 + 128 + 40)
+])
+def test_encode_decode(play, code):
+    assert code == PlayCode.encode(play)
+    assert play == PlayCode.decode(code)
+    assert (len(play[1]) == 1) == PlayCode.is_winning(code)
+    assert play[0] == PlayCode.get_worker(code)
+
+
+@pytest.mark.parametrize("play", [[], ["blue3", ["N", "S"]], ["blue1", ["N", "S", "E"]], ["white1", ["NNE"]]])
+def test_encode_invalid(play):
+    with pytest.raises(ContractViolation):
+        PlayCode.encode(play)
+
+
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_generate_play_codes(board_type, color):
+    board = board_type()
+    board.set_board(legal_board())
+    for code in board.generate_play_codes(color):
+        play = PlayCode.decode(code)
+        expected = board_type()
+        expected.set_board(legal_board())
+        expected.make_play(play)
+        board.make_play_code(code)
+        assert expected.extract_board() == board.extract_board()
+        assert expected.hash() == board.hash()
+        board.unmake()
+    assert legal_board() == board.extract_board()
@@ -0,0 +1,160 @@
+import threading
+import time
+import pytest
+from Board import Board, BoardSnapshot
+from BitBoard import BitBoard
+from RuleChecker import RuleChecker
+from PlayCode import PlayCode
+from Ponderer import Ponderer
+from SmartPlayer import SmartPlayer
+from EndgameSolver import EndgameSolver
+import Strategies
+
+
+MID_GAME_BOARD = [[0, 0, 1, 2, 0],
+                  [1, 2, 1, 0, 0],
+                  [1, 0, [1, "white2"], 2, 0],
+                  [0, [0, "blue2"], 0, 0, [2, "white1"]],
+                  [[0, "blue1"], 1, 0, 2, 1]]
+
+BLUE_PLAY = ["blue2", ["N", "N"]]
+
+# blue has 3 plays and 14 open cells: the endgame solver can't finish, so it runs until stopped
+OPEN_FEW_PLAYS_BOARD = [[0, 3, 3, 4, 2],
+                        [0, 1, 2, 3, 4],
+                        [0, 4, 4, [1, "white2"], [1, "blue1"]],
+                        [[0, "white1"], 0, 4, 4, 3],
+                        [2, 4, 1, 1, [1, "blue2"]]]
+
+STOPPABLE_STRATEGIES = [
+    lambda solver: Strategies.AlphaBetaStrategy(20, endgame_solver=solver),
+    lambda solver: Strategies.SmartStrategy(3, endgame_solver=solver),
+    lambda solver: Strategies.GreedyStrategy(solver),
+    lambda solver: Strategies.MCTSStrategy(20000, endgame_solver=solver),
+]
+
+
+def make_board(board_cls, board):
+    board_obj = board_cls()
+    board_obj.set_board(board)
+    return board_obj
+
+
+def wait_for(condition, timeout=10):
+    end = time.monotonic() + timeout
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.01)
+    assert condition()
+
+
+def reply_boards(board, play, color):
+    # the boards after each reply of the opponent of `color` to `play`, as snapshots
+    board = make_board(BitBoard, board)
+    board.make_play_code(PlayCode.encode(play))
+    opp_color = RuleChecker.COLORS[0] if color == RuleChecker.COLORS[1] else RuleChecker.COLORS[1]
+    boards = []
+    for code in board.generate_play_codes(opp_color):
+        board.make_play_code(code)
+        boards.append(board.get_snapshot())
+        board.unmake()
+    return boards
+
+
+@pytest.mark.parametrize("board_cls", [Board, BitBoard])
+def test_ponders_every_reply(board_cls):
+    strategy = Strategies.GreedyStrategy()
+    ponderer = Ponderer(strategy, board_cls)
+    board = make_board(board_cls, MID_GAME_BOARD)
+    ponderer.start(board, "blue", BLUE_PLAY)
+    assert strategy.stop_event is not None
+    boards = reply_boards(MID_GAME_BOARD, BLUE_PLAY, "blue")
+    wait_for(lambda: ponderer.get_stats()["pondered"] == len(boards))
+    ponderer.stop()
+    assert strategy.stop_event is None
+    assert make_board(board_cls, MID_GAME_BOARD).get_snapshot() == board.get_snapshot()  # the board is copied
+    for reply_board in boards:
+        expected = strategy.get_play(make_board(BitBoard, reply_board), "blue")
+        assert expected == ponderer.get_play(reply_board.to_list())
+    assert ponderer.get_play(MID_GAME_BOARD) is None
+    assert {"pondered": len(boards), "hits": len(boards), "misses": 1} == ponderer.get_stats()
+
+
+@pytest.mark.parametrize("strategy_fn", STOPPABLE_STRATEGIES)
+@pytest.mark.parametrize("solver", [lambda: EndgameSolver(0, 0), lambda: EndgameSolver(25, max_seconds=60)])
+def test_stop_interrupts_search(strategy_fn, solver):
+    # without the endgame solver, or with it solving every board
+    strategy = strategy_fn(solver())
+    ponderer = Ponderer(strategy, BitBoard)
+    ponderer.start(make_board(BitBoard, MID_GAME_BOARD), "blue", BLUE_PLAY)
+    time.sleep(0.1)
+    start = time.monotonic()
+    ponderer.stop()
+    assert time.monotonic() - start < 1
+    assert ponderer.thread is None and strategy.stop_event is None
+    assert len(ponderer.plays) == ponderer.get_stats()["pondered"]  # only finished searches are kept
+    ponderer.stop()  # stopping again does nothing
+
+
+@pytest.mark.parametrize("strategy_fn", STOPPABLE_STRATEGIES)
+def test_stopped_strategy_skips_endgame_solver(strategy_fn):
+    strategy = strategy_fn(EndgameSolver(max_plays_open_cells=25, max_seconds=60))
+    strategy.stop_event = threading.Event()
+    strategy.stop_event.set()
+    board = make_board(BitBoard, OPEN_FEW_PLAYS_BOARD)
+    start = time.monotonic()
+    play = strategy.get_play(board, "blue")
+    assert time.monotonic() - start < 0.2
+    assert 1 == strategy.endgame_solver.get_stats()["gave_up"]
+    assert play in Strategies.BaseStrategy.get_legal_plays(board, "blue")
+    assert [] == board.undo_stack
+
+
+@pytest.mark.parametrize("play", [[], ["blue1", ["N"]]])
+def test_nothing_to_ponder(play):
+    ponderer = Ponderer(Strategies.GreedyStrategy(), BitBoard)
+    ponderer.start(make_board(BitBoard, MID_GAME_BOARD), "blue", play)
+    assert ponderer.thread is None
+    assert ponderer.get_play(MID_GAME_BOARD) is None
+
+
+def test_smart_player_plays_pondered_play():
+    player = SmartPlayer("P1", Strategies.GreedyStrategy(), BitBoard, ponder=True)
+    player.register()
+    player.place([[0] * 5 for _ in range(5)], "blue")
+    player.board.set_board(MID_GAME_BOARD)
+    player.board.set_side_to_move("blue")
+    player.last_play = BLUE_PLAY
+    player.ponder()
+    boards = reply_boards(MID_GAME_BOARD, BLUE_PLAY, "blue")
+    wait_for(lambda: player.ponderer.get_stats()["pondered"] == len(boards))
+    reply_board = boards[len(boards) // 2].to_list()
+    play = player.play(reply_board)
+    assert 1 == player.ponderer.get_stats()["hits"]
+    assert play == Strategies.GreedyStrategy().get_play(make_board(BitBoard, reply_board), "blue")
+    assert BoardSnapshot.from_board(reply_board) == player.board.get_snapshot()
+    assert "OK" == player.notify("P1")
+    assert player.ponderer.thread is None
+
+
+def test_smart_player_without_pondering():
+    player = SmartPlayer("P1", Strategies.GreedyStrategy(), BitBoard)
+    assert player.ponderer is None
+    player.last_play = BLUE_PLAY
+    player.ponder()
+    player.stop_pondering()
+
+
+def test_expected_reply_first():
+    strategy = Strategies.AlphaBetaStrategy(3)
+    board = make_board(BitBoard, MID_GAME_BOARD)
+    code, score = strategy.search(board, "blue")
+    board.make_play_code(code)
+    expected_reply = strategy.table.probe(board.hash())[3]
+    codes = board.generate_play_codes("white")
+    assert expected_reply in codes
+    ordered = Ponderer(strategy, BitBoard)._order_replies(board, "blue", "white", codes)
+    assert expected_reply == ordered[0]
+    assert sorted(codes) == sorted(ordered)
+    assert [code for code in ordered if code != expected_reply] == \
+        Ponderer(Strategies.GreedyStrategy(), BitBoard)._order_replies(board, "blue", "white",
+                                                                       [code for code in codes if code != expected_reply])
@@ -0,0 +1,50 @@
+import pytest
+from Board import Board
+from BitBoard import BitBoard
+from RuleChecker import RuleChecker
+from CustomExceptions import ContractViolation
+from ProductionMode import set_production_mode, is_production_mode
+import Strategies
+
+
+def legal_board():
+    return [[0, [2, "blue2"], 1, 2, 3],
+            [3, 2, 1, 0, 4],
+            [1, 0, [1, "white2"], 2, 4],
+            [0, 0, 0, 0, [2, "white1"]],
+            [[0, "blue1"], 1, 0, 2, 3]]
+
+
+def get_results(board):
+    results = []
+    for worker in RuleChecker.WORKERS:
+        results.append(board.get_worker_position(worker))
+        for direction in RuleChecker.DIRECTIONS:
+            results.append(board.get_adjacent_cell(worker, direction))
+            results.append(RuleChecker.is_valid_move(board, worker, direction))
+            results.append(RuleChecker.is_valid_build(board, worker, direction))
+    for color in RuleChecker.COLORS:
+        for play in Strategies.BaseStrategy.get_legal_plays(board, color):
+            results.append(RuleChecker.is_winning_play(board, *play))
+            board.make_play(play)
+            results.append(board.hash())
+            board.unmake()
+    return results
+
+
+@pytest.mark.parametrize("board_type", [Board, BitBoard])
+def test_set_production_mode(board_type):
+    board = board_type()
+    board.set_board(legal_board())
+    expected = get_results(board)
+    try:
+        set_production_mode(True)
+        assert is_production_mode()
+        assert expected == get_results(board)
+    finally:
+        set_production_mode(False)
+    assert not is_production_mode()
+    with pytest.raises(ContractViolation):
+        RuleChecker.is_valid_move(board, "blue3", "N")
+    with pytest.raises(ContractViolation):
+        board.make_play(["blue1", ["NNE"]])
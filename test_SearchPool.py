@@ -0,0 +1,48 @@
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import SearchPool
+
+
+def test_get_pool():
+    try:
+        pool = SearchPool.get_pool(2)
+        assert pool is SearchPool.get_pool(2)
+        assert [4, 9] == list(pool.map(pow, [2, 3], [2, 2]))
+        assert pool is not SearchPool.get_pool(1)
+    finally:
+        SearchPool.shutdown_pool()
+    assert SearchPool._pool is None
+
+
+def test_get_pool_concurrent_callers(monkeypatch):
+    created = []
+
+    class SlowPool(ProcessPoolExecutor):
+        # a pool that takes a while to create, as if its creation were interrupted by another thread
+
+        def __init__(self, *args, **kwargs):
+            created.append(self)
+            time.sleep(0.05)
+            super().__init__(*args, **kwargs)
+
+    monkeypatch.setattr(SearchPool, "ProcessPoolExecutor", SlowPool)
+    SearchPool.shutdown_pool()
+    barrier = threading.Barrier(8)
+    pools = []
+
+    def get_pool():
+        barrier.wait()
+        pools.append(SearchPool.get_pool(2))
+
+    threads = [threading.Thread(target=get_pool) for _ in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert 1 == len(created)
+        assert [created[0]] * 8 == pools
+        assert [4] == list(pools[0].map(pow, [2], [2]))
+    finally:
+        SearchPool.shutdown_pool()
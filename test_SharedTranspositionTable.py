@@ -0,0 +1,79 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from TranspositionTable import TranspositionTable
+from SharedTranspositionTable import SharedTranspositionTable
+from CustomExceptions import ContractViolation
+
+
+@pytest.fixture()
+def table():
+    table = SharedTranspositionTable("test_tt_{}".format(os.getpid()), 1024)
+    yield table
+    table.close()
+    table.unlink()
+
+
+def store_in_child(name, key):
+    table = SharedTranspositionTable(name, 1024)
+    table.store(key, 5, TranspositionTable.LOWER_BOUND, 0.25, 17)
+    table.close()
+
+
+@pytest.mark.parametrize("max_bytes, size", [
+    (48, 2),
+    (1024, 32),
+    (1 << 20, 32768)
+])
+def test_size(max_bytes, size):
+    table = SharedTranspositionTable("test_tt_size_{}".format(os.getpid()), max_bytes)
+    try:
+        assert size == table.size
+        assert size * SharedTranspositionTable.ENTRY_BYTES <= max_bytes
+    finally:
+        table.close()
+        table.unlink()
+
+
+@pytest.mark.parametrize("name, max_bytes", [("", 1024), (None, 1024), ("test_tt", 47), ("test_tt", "1024")])
+def test_invalid(name, max_bytes):
+    with pytest.raises(ContractViolation):
+        SharedTranspositionTable(name, max_bytes)
+
+
+def test_store_probe(table):
+    assert table.probe(12345) is None
+    table.store(12345, 2, TranspositionTable.EXACT, -1.5, 300)
+    assert (2, TranspositionTable.EXACT, -1.5, 300) == table.probe(12345)
+    table.store(2 ** 64 - 1, 0, TranspositionTable.UPPER_BOUND, 1000000)
+    assert (0, TranspositionTable.UPPER_BOUND, 1000000, TranspositionTable.NO_MOVE) == table.probe(2 ** 64 - 1)
+    assert table.probe(12345 + table.mask + 1) is None
+    assert 2 == len(table)
+
+
+def test_replacement(table):
+    # same scheme as TranspositionTable
+    local_table = TranspositionTable(SharedTranspositionTable.ENTRY_BYTES * table.size)
+    assert local_table.size == table.size
+    for n, depth in enumerate([3, 1, 2, 4, 0, 4]):
+        key = 7 + n * (table.mask + 1)
+        for t in (table, local_table):
+            t.store(key, depth, TranspositionTable.EXACT, float(n), n)
+    for n in range(6):
+        key = 7 + n * (table.mask + 1)
+        assert local_table.probe(key) == table.probe(key)
+
+
+def test_torn_entry(table):
+    table.store(99, 3, TranspositionTable.EXACT, 2.0, 5)
+    offset = SharedTranspositionTable._get_offset((99 & table.mask) << 1)
+    table.words[offset + 2] ^= 1  # as if another process were halfway through writing the value
+    assert table.probe(99) is None
+
+
+def test_shared_between_processes(table):
+    with ProcessPoolExecutor(1) as pool:
+        pool.submit(store_in_child, table.name, 424242).result()
+    assert (5, TranspositionTable.LOWER_BOUND, 0.25, 17) == table.probe(424242)
+    table.clear()
+    assert 0 == len(table)
@@ -1,7 +1,14 @@
+import os
+import random
+import threading
+import time
 import pytest
 from Board import Board
+from BitBoard import BitBoard
 from RuleChecker import RuleChecker
 import Strategies
+from OpeningBook import OpeningBook
+from CustomExceptions import ContractViolation, SearchTimeout
 
 # TODO: modify tests to reflect that the strategy component no longer does a check for a valid (initial) board
 
@@ -70,3 +77,264 @@ def test_get_legal_plays(legal_board, color):
     # pain by hand, so this will do for now
     for play in Strategies.BaseStrategy.get_legal_plays(legal_board, color):
         assert RuleChecker.is_legal_play(legal_board, *play)
+
+
+@pytest.mark.parametrize("color, num_look_ahead", [("blue", 2), ("white", 2), ("white", 1)])
+def test_get_plays_transposition_table(legal_board, color, num_look_ahead):
+    table = Strategies.TranspositionTable(1 << 16)
+    expected = Strategies.NLooksAheadStrategy.get_plays(legal_board, color, num_look_ahead)
+    assert expected == Strategies.NLooksAheadStrategy.get_plays(legal_board, color, num_look_ahead, table)
+    assert expected == Strategies.NLooksAheadStrategy.get_plays(legal_board, color, num_look_ahead, table)
+
+
+def mid_game_board():
+    test_board = [[0, 0, 1, 2, 0],
+                  [1, 2, 1, 0, 0],
+                  [1, 0, [1, "white2"], 2, 0],
+                  [0, [0, "blue2"], 0, 0, [2, "white1"]],
+                  [[0, "blue1"], 1, 0, 2, 1]]
+    board = Board()
+    board.set_board(test_board)
+    return board
+
+
+def negamax(strategy, board, color, depth):
+    # plain negamax without pruning or transposition table, to check AlphaBetaStrategy against
+    if RuleChecker.has_winning_move(board, color):
+        return strategy.WIN_SCORE
+    if depth == 0:
+        return strategy._score_board(board, color)
+    opp_color = "white" if color == "blue" else "blue"
+    best_score = -strategy.WIN_SCORE
+    for code in board.generate_play_codes(color):
+        board.make_play_code(code)
+        score = -negamax(strategy, board, opp_color, depth - 1)
+        board.unmake()
+        if score > strategy.WIN_THRESHOLD:
+            score -= 1
+        elif score < -strategy.WIN_THRESHOLD:
+            score += 1
+        best_score = max(best_score, score)
+    return best_score
+
+
+def mini_board():
+    test_board = [[0, 1, 1, 0],
+                  [[1, "white1"], 2, 1, [2, "blue2"]],
+                  [[1, "white2"], 1, 0, 1],
+                  [0, 1, 2, [1, "blue1"]]]
+    board = Board()
+    board.set_board(test_board)
+    return board
+
+
+def legal_board_fn():
+    test_board = [[0, [2, "blue2"], 1, 2, 3],
+                  [3, 2, 1, 0, 4],
+                  [1, 0, [1, "white2"], 2, 4],
+                  [0, 0, 0, 0, [2, "white1"]],
+                  [1, [0, "blue1"], 0, 2, 3]]
+    board = BitBoard()
+    board.set_board(test_board)
+    return board
+
+
+# the scores of the heuristics before they used `Board.get_neighbor_sums`
+@pytest.mark.parametrize("board_fn, color, smart_score, greedy_score", [
+    (legal_board_fn, "blue", 48, 18),
+    (legal_board_fn, "white", 75, 31),
+    (mini_board, "blue", 58, 21),
+    (mini_board, "white", 52, 20)
+])
+def test_score_board_helpers(board_fn, color, smart_score, greedy_score):
+    board = board_fn()
+    assert smart_score == Strategies.SmartStrategy._score_board_helper(board, color)
+    assert greedy_score == Strategies.GreedyStrategy._score_board(board, color)
+
+
+@pytest.mark.parametrize("board_fn, color, depth", [
+    (mid_game_board, "blue", 1),
+    (mid_game_board, "blue", 2),
+    (mid_game_board, "white", 2),
+    (mini_board, "white", 3)
+])
+def test_alpha_beta_get_play(board_fn, color, depth):
+    board = board_fn()
+    strategy = Strategies.AlphaBetaStrategy(depth)
+    play = strategy.get_play(board, color)
+    assert board_fn().extract_board() == board.extract_board()
+    opp_color = "white" if color == "blue" else "blue"
+    scores = []
+    for legal_play in Strategies.BaseStrategy.get_legal_plays(board, color):
+        board.make_play(legal_play)
+        scores.append((-negamax(strategy, board, opp_color, depth - 1), legal_play))
+        board.unmake()
+    assert max(scores)[0] == max(score for score, legal_play in scores if legal_play == play)
+
+
+def test_alpha_beta_winning_play(legal_board):
+    assert 1 == len(Strategies.AlphaBetaStrategy(2).get_play(legal_board, "blue")[1])
+
+
+def test_search_clock():
+    clock = Strategies.SearchClock(time.monotonic() - 1)
+    with pytest.raises(SearchTimeout):
+        for _ in range(Strategies.SearchClock.CHECK_INTERVAL):
+            clock.tick()
+    assert Strategies.SearchClock.CHECK_INTERVAL == clock.nodes
+
+
+def test_search_clock_stop_event():
+    stop_event = threading.Event()
+    clock = Strategies.SearchClock(None, stop_event)
+    for _ in range(2 * Strategies.SearchClock.CHECK_INTERVAL):
+        clock.tick()
+    stop_event.set()
+    with pytest.raises(SearchTimeout):
+        for _ in range(Strategies.SearchClock.CHECK_INTERVAL):
+            clock.tick()
+
+
+@pytest.mark.parametrize("strategy", [
+    Strategies.AlphaBetaStrategy(20),
+    Strategies.NLooksAheadStrategy(6),
+    Strategies.MCTSStrategy(None)
+])
+def test_get_play_stop_event(strategy):
+    board = mid_game_board()
+    strategy.stop_event = threading.Event()
+    strategy.stop_event.set()
+    start = time.monotonic()
+    play = strategy.get_play(board, "blue")
+    assert time.monotonic() - start < 1
+    assert mid_game_board().extract_board() == board.extract_board()
+    assert play in Strategies.BaseStrategy.get_legal_plays(board, "blue")
+
+
+@pytest.mark.parametrize("strategy", [
+    Strategies.AlphaBetaStrategy(20),
+    Strategies.AlphaBetaStrategy(20, time_per_move=0.05),
+    Strategies.NLooksAheadStrategy(6, time_per_move=0.05),
+    Strategies.MCTSStrategy(None)
+])
+def test_get_play_deadline(strategy):
+    board = mid_game_board()
+    start = time.monotonic()
+    play = strategy.get_play(board, "blue", deadline=start + 0.05)
+    assert time.monotonic() - start < 1
+    assert mid_game_board().extract_board() == board.extract_board()
+    assert play in Strategies.BaseStrategy.get_legal_plays(board, "blue")
+
+
+def test_mcts_winning_play(legal_board):
+    assert 1 == len(Strategies.MCTSStrategy(10).get_play(legal_board, "blue")[1])
+
+
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_mcts_get_play(color):
+    random.seed(0)
+    board = mid_game_board()
+    strategy = Strategies.MCTSStrategy(200)
+    play = strategy.get_play(board, color)
+    assert mid_game_board().extract_board() == board.extract_board()
+    assert play in Strategies.BaseStrategy.get_legal_plays(board, color)
+    assert 200 == strategy.get_stats()["playouts"]
+
+
+def test_mcts_blocks_win():
+    # white1 can climb onto the 3 next to it unless blue2 domes it
+    test_board = [[0, 0, 0, 0, 0],
+                  [0, [0, "blue1"], 0, 0, 0],
+                  [0, 0, 0, 0, 0],
+                  [0, 0, [0, "blue2"], 3, 0],
+                  [0, 0, 0, [2, "white1"], [0, "white2"]]]
+    random.seed(0)
+    board = Board()
+    board.set_board(test_board)
+    play = Strategies.MCTSStrategy(2000).get_play(board, "blue")
+    board.make_play(play)
+    assert not board.has_winning_move("white")
+
+
+@pytest.mark.parametrize("iterations, time_per_move", [(0, None), (1.5, None), (None, 0), (10, "1")])
+def test_mcts_invalid_budget(iterations, time_per_move):
+    with pytest.raises(ContractViolation):
+        Strategies.MCTSStrategy(iterations, time_per_move)
+
+
+@pytest.mark.parametrize("color", ["blue", "white"])
+@pytest.mark.parametrize("num_look_ahead", [1, 2])
+def test_get_plays_parallel(legal_board, color, num_look_ahead):
+    strategy = Strategies.NLooksAheadStrategy(num_look_ahead, num_processes=2)
+    for board in (legal_board, mid_game_board()):
+        expected = Strategies.NLooksAheadStrategy.get_plays(board, color, num_look_ahead)
+        assert expected == strategy._get_plays_parallel(board, color, num_look_ahead)
+
+
+def test_shared_table():
+    name = "test_strategy_tt_{}".format(os.getpid())
+    strategy = Strategies.AlphaBetaStrategy(2, 1 << 16, table_name=name)
+    try:
+        board = mid_game_board()
+        play = strategy.get_play(board, "blue")
+        num_entries = len(strategy.table)
+        assert num_entries > 0
+        # a second strategy opening the same table starts with the first one's results
+        other = Strategies.AlphaBetaStrategy(2, 1 << 16, table_name=name)
+        assert num_entries == len(other.table)
+        assert play == other.get_play(board, "blue")
+        other.table.close()
+
+        parallel = Strategies.NLooksAheadStrategy(2, 1 << 16, num_processes=2, table_name=name + "_look_ahead")
+        assert (Strategies.NLooksAheadStrategy.get_plays(board, "blue", 2)
+                == parallel._get_plays_parallel(board, "blue", 2))
+        parallel.table.close()
+        parallel.table.unlink()
+    finally:
+        strategy.table.close()
+        strategy.table.unlink()
+
+
+@pytest.mark.parametrize("strategy_fn", [Strategies.GreedyStrategy, lambda: Strategies.SmartStrategy(2),
+                                         lambda: Strategies.AlphaBetaStrategy(3, 1 << 16)])
+@pytest.mark.parametrize("color", ["blue", "white"])
+def test_offloaded_strategy(legal_board, color, strategy_fn):
+    strategy = strategy_fn()
+    offloaded = Strategies.OffloadedStrategy(strategy, 2)
+    assert len(offloaded.strategy_data) < 4096  # the table stays behind
+    assert strategy.table is None or strategy.table.size == Strategies.BaseStrategy._create_table(
+        *offloaded.table_spec).size
+    for board in (legal_board, mid_game_board()):
+        assert strategy_fn().get_play(board, color) == offloaded.get_play(board, color)
+    assert [] == board.undo_stack
+
+
+def test_offloaded_strategy_no_play():
+    board = Board()
+    board.set_board([[[0, "blue1"], 4, 0, 4, [0, "blue2"]],
+                     [4, 4, 0, 4, 4],
+                     [0, 0, 0, 0, 0],
+                     [[0, "white1"], 0, 0, 0, [0, "white2"]],
+                     [0, 0, 0, 0, 0]])
+    assert [] == Strategies.OffloadedStrategy(Strategies.RandomStrategy(), 1).get_play(board, "blue")
+
+
+@pytest.mark.parametrize("num_processes", [0, -1, 1.5, None])
+def test_offloaded_strategy_invalid_processes(num_processes):
+    with pytest.raises(ContractViolation):
+        Strategies.OffloadedStrategy(Strategies.GreedyStrategy(), num_processes)
+
+
+@pytest.mark.parametrize("strategy", [
+    Strategies.SmartStrategy(),
+    Strategies.NLooksAheadStrategy(1),
+    Strategies.GreedyStrategy(),
+    Strategies.MCTSStrategy()
+])
+def test_get_placements_book(legal_initial_board, strategy):
+    book = OpeningBook.load()
+    if book is None:
+        pytest.skip("no opening book built")
+    assert book.get_placements(legal_initial_board) == strategy.get_placements(legal_initial_board, "blue")
+    board = legal_initial_board_with_workers("blue")
+    assert book.get_placements(board) == strategy.get_placements(board, "white")
@@ -0,0 +1,127 @@
+import json
+import socket
+import pytest
+from Transport import Transport
+from ProxyPlayer import ProxyPlayer
+from CustomExceptions import IllegalResponse
+
+
+BOARD = [[0, [2, "blue2"], 1, 2, 3],
+         [3, 2, 1, 0, 4],
+         [1, 0, [1, "white2"], 2, 4],
+         [0, 0, 0, 0, [2, "white1"]],
+         [1, [0, "blue1"], 0, 2, 3]]
+
+MESSAGES = [["Register"], "P1", ["Place", "blue", BOARD], [[0, 0], [4, 4]], ["Play", BOARD], ["blue1", ["N", "E"]],
+            ["Game Over", "P1"], "OK"]
+
+
+class ChunkedSocket:
+    # a socket that receives the given chunks of bytes, one at most per recv_into(), then the end of the connection
+
+    def __init__(self, chunks):
+        self.chunks = list(chunks)
+        self.sent = b""
+
+    def setsockopt(self, *args):
+        raise OSError("not a TCP socket")
+
+    def recv_into(self, buffer):
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        count = min(len(chunk), len(buffer))
+        buffer[:count] = chunk[:count]
+        if count < len(chunk):
+            self.chunks.insert(0, chunk[count:])
+        return count
+
+    def sendall(self, data):
+        self.sent += data
+
+
+def encode(messages):
+    return b"".join(bytes(json.dumps(message) + "\n", "utf-8") for message in messages)
+
+
+def recv_all(transport):
+    messages = []
+    message = transport.recv()
+    while message is not None:
+        messages.append(message)
+        message = transport.recv()
+    return messages
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 7, 64, 1 << 20])
+def test_recv_chunks(chunk_size):
+    data = encode(MESSAGES)
+    transport = Transport(ChunkedSocket(data[i:i + chunk_size] for i in range(0, len(data), chunk_size)))
+    assert MESSAGES == recv_all(transport)
+    assert transport.recv() is None
+
+
+def test_recv_grows_buffer():
+    board = [[[3, "blue1"] if (row + col) % 7 == 0 else row % 4 for col in range(100)] for row in range(100)]
+    messages = ["small", ["Play", board], "small", ["Play", board]]
+    transport = Transport(ChunkedSocket([encode(messages)[i:i + 1000] for i in range(0, len(encode(messages)), 1000)]))
+    assert len(encode(messages)) > 2 * Transport.INITIAL_BUFFER_SIZE
+    assert messages == recv_all(transport)
+    assert len(transport.buffer) < 2 * len(encode(messages))
+
+
+def test_recv_moves_unread_bytes():
+    # the buffer is reused rather than grown when what's left of it is taken up by read messages
+    messages = ["x" * 1000] * 20
+    data = encode(messages)
+    transport = Transport(ChunkedSocket(data[i:i + 1500] for i in range(0, len(data), 1500)))
+    assert messages == recv_all(transport)
+    assert Transport.INITIAL_BUFFER_SIZE == len(transport.buffer)
+
+
+@pytest.mark.parametrize("data, expected", [(b"\n\n\"OK\"\n\n", ["OK"]), (b"  \r\n[1, 2]\r\n", [[1, 2]]),
+                                            (b"\"OK\"\n[\"Play\", ", ["OK"]), (b"", [])])
+def test_recv_blank_lines_and_end(data, expected):
+    assert expected == recv_all(Transport(ChunkedSocket([data])))
+
+
+def test_recv_malformed():
+    transport = Transport(ChunkedSocket([b"[\"Play\"}\n\"OK\"\n"]))
+    with pytest.raises(ValueError):
+        transport.recv()
+    assert "OK" == transport.recv()
+
+
+def test_send():
+    conn = ChunkedSocket([])
+    transport = Transport(conn)
+    for message in MESSAGES:
+        transport.send(message)
+    assert encode(MESSAGES) == conn.sent
+
+
+def test_tcp_nodelay():
+    with socket.socket() as server:
+        server.bind(("localhost", 0))
+        server.listen(1)
+        with socket.create_connection(server.getsockname()) as client:
+            transport = Transport(client)
+            assert client.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+            conn, _ = server.accept()
+            with conn:
+                conn.sendall(encode(MESSAGES[:2]))
+                assert MESSAGES[:2] == [transport.recv(), transport.recv()]
+
+
+def test_proxy_player_split_response():
+    admin_end, player_end = socket.socketpair()
+    with admin_end, player_end:
+        player = ProxyPlayer(admin_end)
+        player_end.sendall(b"\"P")
+        player_end.sendall(b"1\"\n[[0, 0], [4")  # the rest of the placements arrive later
+        assert "P1" == player.register()
+        player_end.sendall(b", 4]]\n")
+        assert [[0, 0], [4, 4]] == player.place([[0] * 5 for _ in range(5)], "blue")
+        player_end.close()
+        with pytest.raises(IllegalResponse):
+            player.play(BOARD)
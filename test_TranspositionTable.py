@@ -0,0 +1,56 @@
+import pytest
+from TranspositionTable import TranspositionTable
+from CustomExceptions import ContractViolation
+
+
+@pytest.fixture()
+def table():
+    return TranspositionTable(1024)
+
+
+@pytest.mark.parametrize("max_bytes, size", [
+    (40, 2),
+    (1024, 32),
+    (1 << 20, 32768)
+])
+def test_size(max_bytes, size):
+    table = TranspositionTable(max_bytes)
+    assert size == table.size
+    assert size * TranspositionTable.ENTRY_BYTES <= max_bytes
+
+
+@pytest.mark.parametrize("max_bytes", [0, 39, 1024.0, "1024"])
+def test_size_invalid(max_bytes):
+    with pytest.raises(ContractViolation):
+        TranspositionTable(max_bytes)
+
+
+def test_store_probe(table):
+    assert table.probe(12345) is None
+    table.store(12345, 2, TranspositionTable.EXACT, -1.5, 300)
+    assert (2, TranspositionTable.EXACT, -1.5, 300) == table.probe(12345)
+    assert table.probe(12345 + table.mask + 1) is None
+    assert 1 == len(table)
+
+
+def test_replacement(table):
+    bucket_keys = [7 + n * (table.mask + 1) for n in range(4)]
+    table.store(bucket_keys[0], 3, TranspositionTable.EXACT, 1.0)
+    # shallower results go into the always-replace entry
+    table.store(bucket_keys[1], 1, TranspositionTable.LOWER_BOUND, 2.0)
+    table.store(bucket_keys[2], 2, TranspositionTable.UPPER_BOUND, 3.0)
+    assert table.probe(bucket_keys[0]) is not None
+    assert table.probe(bucket_keys[1]) is None
+    assert (2, TranspositionTable.UPPER_BOUND, 3.0, TranspositionTable.NO_MOVE) == table.probe(bucket_keys[2])
+    # deeper results take the depth-preferred entry and push its result into the always-replace entry
+    table.store(bucket_keys[3], 4, TranspositionTable.EXACT, 4.0)
+    assert (4, TranspositionTable.EXACT, 4.0, TranspositionTable.NO_MOVE) == table.probe(bucket_keys[3])
+    assert (3, TranspositionTable.EXACT, 1.0, TranspositionTable.NO_MOVE) == table.probe(bucket_keys[0])
+    assert table.probe(bucket_keys[2]) is None
+
+
+def test_clear(table):
+    table.store(1, 1, TranspositionTable.EXACT, 1.0)
+    table.clear()
+    assert table.probe(1) is None
+    assert 0 == len(table)